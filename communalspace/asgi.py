@@ -2,6 +2,8 @@
 ASGI config for communalspace project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+It only serves the live forum streams (see communalspace/stream_urls.py), the
+rest of the API being served by the WSGI application.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -12,5 +14,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'communalspace.settings')
+os.environ.setdefault('ROOT_URLCONF', 'communalspace.stream_urls')
 
 application = get_asgi_application()
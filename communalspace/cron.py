@@ -1,5 +1,13 @@
 from apscheduler.schedulers.background import BackgroundScheduler
+import datetime
 
 scheduler = BackgroundScheduler()
 
 
+def run_job_now(job_id):
+    """
+    Bring the next run of a scheduled job forward to now.
+    """
+    job = scheduler.get_job(job_id)
+    if job is not None:
+        job.modify(next_run_time=datetime.datetime.now(scheduler.timezone))
@@ -1,21 +1,29 @@
-from firebase_admin import auth, exceptions as firebase_exceptions
+from firebase_admin import exceptions as firebase_exceptions
 from .exceptions import UnauthorizedException, InvalidRequestException
+from .firebase_admin.authentication import verified_id_token_cache
 from .utils import get_id_token_from_authorization_header
-from users.services import utils as users_utils
+from users.services.user_cache import user_cache
+
+
+def authenticate_request(request):
+    """
+    Verify the Firebase ID token of the request and set the authenticated user as request.user.
+    """
+    try:
+        id_token = get_id_token_from_authorization_header(request.headers.get('Authorization'))
+        decoded_token = verified_id_token_cache.verify_id_token(id_token)
+        request.user = user_cache.get_or_create_user_by_id(decoded_token.get('user_id'))
+        return request.user
+
+    except firebase_exceptions.InvalidArgumentError:
+        raise UnauthorizedException('Invalid token provided')
 
 
 def firebase_authenticated():
     def decorator(view_function_to_decorate):
         def decorated_view_function(*args, **kwargs):
-            try:
-                request = args[0]
-                id_token = get_id_token_from_authorization_header(request.headers.get('Authorization'))
-                decoded_token = auth.verify_id_token(id_token)
-                request.user = users_utils.get_or_create_user_by_id(decoded_token.get('user_id'))
-                return view_function_to_decorate(*args, **kwargs)
-
-            except firebase_exceptions.InvalidArgumentError:
-                raise UnauthorizedException('Invalid token provided')
+            authenticate_request(args[0])
+            return view_function_to_decorate(*args, **kwargs)
 
         return decorated_view_function
 
@@ -0,0 +1,73 @@
+class DirtyFieldsMixin:
+    """
+    Model mixin keeping track of the concrete fields changed since the instance was
+    loaded or last saved. save_dirty_fields writes only those fields, with one UPDATE
+    per table holding a changed field, and no query at all when nothing changed.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._reset_loaded_field_values()
+        return instance
+
+    def _get_loaded_fields(self, field_names=None):
+        # Deferred fields are not loaded, hence neither tracked nor written
+        return [
+            field for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname in self.__dict__
+            and (field_names is None or field.name in field_names)
+        ]
+
+    def _reset_loaded_field_values(self, field_names=None):
+        # Rebuilt rather than updated in place, as the shallow copies of an instance share it
+        loaded_field_values = {} if field_names is None else {**getattr(self, '_loaded_field_values', {})}
+        for field in self._get_loaded_fields(field_names):
+            loaded_field_values[field.name] = getattr(self, field.attname)
+
+        self._loaded_field_values = loaded_field_values
+
+    def get_dirty_fields(self):
+        """
+        Return the changed fields, mapped to their value when loaded (None for
+        the fields that were not loaded).
+        """
+        return {
+            field.name: self._loaded_field_values.get(field.name)
+            for field in self._get_loaded_fields()
+            if field.name not in self._loaded_field_values
+            or self._loaded_field_values[field.name] != getattr(self, field.attname)
+        }
+
+    def save_dirty_fields(self):
+        if self._state.adding or not hasattr(self, '_loaded_field_values'):
+            self.save()
+            return
+
+        dirty_fields = self.get_dirty_fields()
+        if len(dirty_fields) > 0:
+            self.save(update_fields=list(dirty_fields))
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        saved_field_names = (
+            None if update_fields is None
+            else {self._meta.get_field(field_name).name for field_name in update_fields}
+        )
+
+        # Fields saved from an expression, e.g. F('points') + 1, are read back with their new value
+        expression_field_names = [
+            field.name for field in self._get_loaded_fields(saved_field_names)
+            if hasattr(getattr(self, field.attname), 'resolve_expression')
+        ]
+        if len(expression_field_names) > 0:
+            super().refresh_from_db(fields=expression_field_names)
+
+        self._reset_loaded_field_values(saved_field_names)
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        self._reset_loaded_field_values(
+            None if fields is None
+            else {self._meta.get_field(field_name).name for field_name in fields}
+        )
@@ -12,3 +12,11 @@ class InvalidRequestException(Exception):
 
 class ImproperNetworkAccessException(Exception):
     pass
+
+
+class InferenceUnavailableException(Exception):
+    pass
+
+
+class InferenceRequestRejectedException(InferenceUnavailableException):
+    pass
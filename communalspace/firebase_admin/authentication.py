@@ -0,0 +1,51 @@
+from cachetools import TLRUCache
+from communalspace.metrics import CacheStatistics, register_statistics
+from communalspace.settings import ID_TOKEN_CACHE_MAXSIZE
+from firebase_admin import auth
+import hashlib
+import threading
+import time
+
+
+class VerifiedIdTokenCache:
+    """
+    Per-process cache of the decoded Firebase ID tokens that passed verification,
+    keyed by the SHA-256 hash of the token. Every entry expires at the expiry
+    time (exp claim) of its token, so a token is never accepted past its expiry.
+    """
+    def __init__(self, maxsize):
+        self._lock = threading.Lock()
+        self._decoded_tokens = TLRUCache(
+            maxsize=maxsize,
+            ttu=lambda _, decoded_token, now: decoded_token.get('exp', now),
+            timer=time.time
+        )
+        self.statistics = CacheStatistics()
+
+    @staticmethod
+    def _get_key(id_token):
+        return hashlib.sha256(id_token.encode('utf-8')).hexdigest()
+
+    def verify_id_token(self, id_token):
+        key = self._get_key(id_token)
+        with self._lock:
+            decoded_token = self._decoded_tokens.get(key)
+
+        if decoded_token is not None:
+            self.statistics.record_hit()
+            return decoded_token
+
+        self.statistics.record_miss()
+        decoded_token = auth.verify_id_token(id_token)
+        with self._lock:
+            self._decoded_tokens[key] = decoded_token
+
+        return decoded_token
+
+    def clear(self):
+        with self._lock:
+            self._decoded_tokens.clear()
+
+
+verified_id_token_cache = VerifiedIdTokenCache(ID_TOKEN_CACHE_MAXSIZE)
+register_statistics('id_token_cache', verified_id_token_cache.statistics.get_statistics)
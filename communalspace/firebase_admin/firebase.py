@@ -1,5 +1,6 @@
 from django.core.exceptions import ObjectDoesNotExist
 from firebase_admin import auth, exceptions as firebase_exceptions
+from .identity import identity_gateway
 
 
 def get_user_id_from_email(email):
@@ -26,19 +27,37 @@ def get_user_id_from_email_or_phone_number(email_or_phone_number):
         return get_user_id_from_phone_number(email_or_phone_number)
 
 
+def _get_identity_from_id(user_id):
+    identity = identity_gateway.get_identity(user_id)
+    if identity is None:
+        raise ObjectDoesNotExist(f'User with id {user_id} does not exist')
+
+    return identity
+
+
 def get_email_or_phone_number_from_id(user_id):
-    firebase_user = auth.get_user(user_id)
-    return firebase_user.email if firebase_user.email is not None else firebase_user.phone_number
+    return _get_identity_from_id(user_id).get_email_or_phone_number()
 
 
 def get_email_from_id(user_id):
-    firebase_user = auth.get_user(user_id)
-    return firebase_user.email
+    return _get_identity_from_id(user_id).email
+
+
+def get_emails_or_phone_numbers_from_ids(user_ids):
+    """
+    Batched version of get_email_or_phone_number_from_id.
+    Users that do not exist are mapped to None.
+    """
+    return {
+        user_id: identity.get_email_or_phone_number() if identity is not None else None
+        for user_id, identity in identity_gateway.get_identities(user_ids).items()
+    }
 
 
 def embed_emails_to_user_data(user_data):
+    identities = identity_gateway.get_identities([user_datum.get('user_id') for user_datum in user_data])
     for user_datum in user_data:
-        user_datum['email'] = get_email_from_id(user_datum.get('user_id'))
+        identity = identities[user_datum.get('user_id')]
+        user_datum['email'] = identity.email if identity is not None else None
 
     return user_data
-
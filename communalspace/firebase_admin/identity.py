@@ -0,0 +1,125 @@
+from cachetools import TTLCache
+from communalspace.settings import (
+    FIREBASE_GET_USERS_BATCH_SIZE,
+    FIREBASE_USER_CACHE_MAXSIZE,
+    FIREBASE_USER_CACHE_TIMEOUT,
+    FIREBASE_USER_NEGATIVE_CACHE_TIMEOUT
+)
+from firebase_admin import auth
+import threading
+import time
+
+
+class FirebaseIdentity:
+    def __init__(self, user_id, email, phone_number):
+        self.user_id = user_id
+        self.email = email
+        self.phone_number = phone_number
+
+    def get_email_or_phone_number(self):
+        return self.email if self.email is not None else self.phone_number
+
+
+class FirebaseAuthBackend:
+    """
+    Backend fetching the users from Firebase Authentication,
+    up to FIREBASE_GET_USERS_BATCH_SIZE users per call.
+    """
+    def get_users(self, user_ids):
+        result = auth.get_users([auth.UidIdentifier(user_id) for user_id in user_ids])
+        return [
+            FirebaseIdentity(firebase_user.uid, firebase_user.email, firebase_user.phone_number)
+            for firebase_user in result.users
+        ]
+
+
+class FakeAuthBackend:
+    """
+    In-memory backend to run the gateway without Firebase, e.g. in tests.
+    Every call is recorded in get_users_calls.
+    """
+    def __init__(self, identities=()):
+        self.identities = {identity.user_id: identity for identity in identities}
+        self.get_users_calls = []
+
+    def get_users(self, user_ids):
+        self.get_users_calls.append(list(user_ids))
+        return [self.identities[user_id] for user_id in user_ids if user_id in self.identities]
+
+
+class FirebaseIdentityGateway:
+    """
+    Resolves user ids to their Firebase identity, batching the lookups of
+    uncached users and caching the results. Users missing from Firebase are
+    cached as well (for a shorter time), so they are not looked up on every call.
+    """
+    def __init__(self, backend, maxsize, timeout, negative_timeout, batch_size, timer=time.monotonic):
+        self.backend = backend
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._identities = TTLCache(maxsize=maxsize, ttl=timeout, timer=timer)
+        self._missing_user_ids = TTLCache(maxsize=maxsize, ttl=negative_timeout, timer=timer)
+
+    def use_backend(self, backend):
+        with self._lock:
+            self.backend = backend
+            self._identities.clear()
+            self._missing_user_ids.clear()
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._identities.pop(user_id, None)
+            self._missing_user_ids.pop(user_id, None)
+
+    def _get_cached_identities(self, user_ids):
+        cached_identities = {}
+        with self._lock:
+            for user_id in user_ids:
+                if user_id in self._identities:
+                    cached_identities[user_id] = self._identities[user_id]
+
+                elif user_id in self._missing_user_ids:
+                    cached_identities[user_id] = None
+
+        return cached_identities
+
+    def _fetch_identities(self, user_ids):
+        fetched_identities = {}
+        for batch_start in range(0, len(user_ids), self.batch_size):
+            batch_user_ids = user_ids[batch_start:batch_start + self.batch_size]
+            batch_identities = {identity.user_id: identity for identity in self.backend.get_users(batch_user_ids)}
+
+            with self._lock:
+                for user_id in batch_user_ids:
+                    identity = batch_identities.get(user_id)
+                    if identity is not None:
+                        self._identities[user_id] = identity
+                    else:
+                        self._missing_user_ids[user_id] = True
+
+                    fetched_identities[user_id] = identity
+
+        return fetched_identities
+
+    def get_identities(self, user_ids):
+        """
+        Return a dictionary mapping every given user id to its FirebaseIdentity,
+        or to None if the user does not exist in Firebase.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        identities = self._get_cached_identities(user_ids)
+        uncached_user_ids = [user_id for user_id in user_ids if user_id not in identities]
+        identities.update(self._fetch_identities(uncached_user_ids))
+        return identities
+
+    def get_identity(self, user_id):
+        return self.get_identities([user_id])[user_id]
+
+
+identity_gateway = FirebaseIdentityGateway(
+    FirebaseAuthBackend(),
+    FIREBASE_USER_CACHE_MAXSIZE,
+    FIREBASE_USER_CACHE_TIMEOUT,
+    FIREBASE_USER_NEGATIVE_CACHE_TIMEOUT,
+    FIREBASE_GET_USERS_BATCH_SIZE
+)
@@ -0,0 +1,222 @@
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+from .exceptions import InferenceRequestRejectedException, InferenceUnavailableException
+from .metrics import LatencyHistogram, register_statistics
+from .settings import (
+    HUGGING_FACE_ACCESS_TOKEN,
+    INFERENCE_BACKEND,
+    INFERENCE_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    INFERENCE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+    INFERENCE_CONNECT_TIMEOUT,
+    INFERENCE_CONNECTION_POOL_SIZE,
+    INFERENCE_DEADLINE,
+    INFERENCE_LATENCY_BUCKETS,
+    INFERENCE_MAX_RETRIES,
+    INFERENCE_READ_TIMEOUT,
+    INFERENCE_RETRY_BACKOFF
+)
+import json
+import random
+import requests
+import threading
+import time
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a degraded endpoint after failure_threshold consecutive failures.
+    Once recovery_timeout has passed, a single trial call is let through:
+    a success closes the circuit again, a failure keeps it open.
+    """
+    def __init__(self, failure_threshold, recovery_timeout, timer=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._number_of_consecutive_failures = 0
+        self._opened_at = None
+
+    def allow_request(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+
+            if self._timer() - self._opened_at >= self.recovery_timeout:
+                # Let one trial call through, the others wait for its outcome
+                self._opened_at = self._timer()
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._number_of_consecutive_failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._number_of_consecutive_failures += 1
+            if self._number_of_consecutive_failures >= self.failure_threshold:
+                self._opened_at = self._timer()
+
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+
+class HuggingFaceInferenceBackend:
+    """
+    Backend sending the inference requests to the HuggingFace Inference API.
+    A list of inputs is answered with one result per input.
+
+    Requests share a keep-alive connection pool, every attempt has a timeout,
+    failed attempts are retried with jittered exponential backoff within the
+    deadline, and every endpoint has a circuit breaker. Requests that cannot
+    be answered raise InferenceUnavailableException, and requests rejected
+    with a non-retryable error status raise InferenceRequestRejectedException
+    without being retried.
+    """
+    def __init__(self):
+        self._session = requests.Session()
+        self._session.headers.update({"Authorization": f"Bearer {HUGGING_FACE_ACCESS_TOKEN}"})
+        adapter = HTTPAdapter(pool_connections=INFERENCE_CONNECTION_POOL_SIZE, pool_maxsize=INFERENCE_CONNECTION_POOL_SIZE)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._circuit_breakers = {}
+        self._latency_histograms = {}
+
+    def _get_circuit_breaker(self, endpoint):
+        with self._lock:
+            return self._circuit_breakers.setdefault(
+                endpoint,
+                CircuitBreaker(INFERENCE_CIRCUIT_BREAKER_FAILURE_THRESHOLD, INFERENCE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT)
+            )
+
+    def _get_latency_histogram(self, endpoint):
+        with self._lock:
+            return self._latency_histograms.setdefault(endpoint, LatencyHistogram(INFERENCE_LATENCY_BUCKETS))
+
+    def _send_request(self, endpoint, data, deadline):
+        start = time.monotonic()
+        read_timeout = max(min(INFERENCE_READ_TIMEOUT, deadline - start), 0.001)
+        try:
+            response = self._session.post(
+                endpoint,
+                data=data,
+                timeout=(INFERENCE_CONNECT_TIMEOUT, read_timeout)
+            )
+        finally:
+            self._get_latency_histogram(endpoint).observe(time.monotonic() - start)
+
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise InferenceUnavailableException(f'Inference endpoint responded with status {response.status_code}')
+
+        if response.status_code >= 400:
+            raise InferenceRequestRejectedException(f'Inference endpoint rejected the request: {response.status_code}')
+
+        try:
+            return json.loads(response.content.decode("utf-8"))
+
+        except ValueError:
+            raise InferenceUnavailableException('Inference endpoint responded with a non-JSON body')
+
+    def infer(self, endpoint, inputs):
+        circuit_breaker = self._get_circuit_breaker(endpoint)
+        if not circuit_breaker.allow_request():
+            raise InferenceUnavailableException(f'Circuit breaker of {endpoint} is open')
+
+        data = json.dumps({"inputs": inputs, "options": {"wait_for_model": True}})
+        deadline = time.monotonic() + INFERENCE_DEADLINE
+        attempt = 0
+        while True:
+            try:
+                result = self._send_request(endpoint, data, deadline)
+                circuit_breaker.record_success()
+                return result
+
+            except InferenceRequestRejectedException:
+                # The endpoint is available, only the request is wrong
+                circuit_breaker.record_success()
+                raise
+
+            except (requests.ConnectionError, requests.Timeout, InferenceUnavailableException) as exception:
+                backoff = INFERENCE_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5)
+                attempt += 1
+
+                if attempt > INFERENCE_MAX_RETRIES or time.monotonic() + backoff >= deadline:
+                    circuit_breaker.record_failure()
+                    raise InferenceUnavailableException(f'Inference request to {endpoint} failed: {exception}')
+
+                time.sleep(backoff)
+
+    def get_statistics(self):
+        with self._lock:
+            endpoints = set(self._latency_histograms) | set(self._circuit_breakers)
+
+        return {
+            endpoint: {
+                'latency': self._get_latency_histogram(endpoint).get_statistics(),
+                'circuit_open': self._get_circuit_breaker(endpoint).is_open(),
+            } for endpoint in endpoints
+        }
+
+
+def infer_one_by_one_if_rejected(infer, inputs, rejected_result):
+    """
+    Return infer(inputs) for a batch of pending inputs. When the batch is rejected,
+    e.g. for an over-long input, the inputs are inferred one by one and the rejected
+    ones get rejected_result, so that they do not stay pending forever.
+    InferenceUnavailableException is raised as by infer.
+    """
+    try:
+        return infer(inputs)
+
+    except InferenceRequestRejectedException:
+        pass
+
+    results = []
+    for single_input in inputs:
+        try:
+            results.append(infer([single_input])[0])
+
+        except InferenceRequestRejectedException:
+            results.append(rejected_result)
+
+    return results
+
+
+class StubInferenceBackend:
+    """
+    Backend answering every inference request locally with responder(endpoint, inputs),
+    to run the inference pipelines without the HuggingFace Inference API, e.g. in tests.
+    Every request is recorded in infer_calls.
+    """
+    def __init__(self, responder):
+        self.responder = responder
+        self.infer_calls = []
+
+    def infer(self, endpoint, inputs):
+        self.infer_calls.append((endpoint, inputs))
+        return self.responder(endpoint, inputs)
+
+    def get_statistics(self):
+        return {}
+
+
+_inference_backend = import_string(INFERENCE_BACKEND)()
+
+
+def get_inference_backend():
+    return _inference_backend
+
+
+def set_inference_backend(inference_backend):
+    global _inference_backend
+    _inference_backend = inference_backend
+
+
+register_statistics('inference', lambda: get_inference_backend().get_statistics())
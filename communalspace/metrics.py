@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+import threading
+
+METRICS_REPORT_JOB_ID = 'metrics_report'
+
+logger = logging.getLogger(__name__)
+
+_statistics_sources = {}
+_statistics_sources_lock = threading.Lock()
+
+
+class CacheStatistics:
+    """
+    Thread-safe hit and miss counters of a per-process cache.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def get_statistics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+            }
+
+
+class LatencyHistogram:
+    """
+    Thread-safe histogram of latencies (in seconds), counting every observation
+    in the first bucket whose upper bound is not exceeded.
+    """
+    def __init__(self, bucket_upper_bounds):
+        self._lock = threading.Lock()
+        self.bucket_upper_bounds = sorted(bucket_upper_bounds)
+        self.bucket_counts = [0] * (len(self.bucket_upper_bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, latency):
+        bucket_index = len(self.bucket_upper_bounds)
+        for index, upper_bound in enumerate(self.bucket_upper_bounds):
+            if latency <= upper_bound:
+                bucket_index = index
+                break
+
+        with self._lock:
+            self.bucket_counts[bucket_index] += 1
+            self.count += 1
+            self.sum += latency
+
+    def get_statistics(self):
+        with self._lock:
+            bucket_labels = [f'<={upper_bound}s' for upper_bound in self.bucket_upper_bounds] + ['+Inf']
+            return {
+                'buckets': dict(zip(bucket_labels, self.bucket_counts)),
+                'count': self.count,
+                'average': self.sum / self.count if self.count else None,
+            }
+
+
+def register_statistics(name, get_statistics):
+    """
+    Include the statistics returned by get_statistics() under name in the metrics report.
+    """
+    with _statistics_sources_lock:
+        _statistics_sources[name] = get_statistics
+
+
+def get_registered_statistics():
+    with _statistics_sources_lock:
+        statistics_sources = dict(_statistics_sources)
+
+    return {name: get_statistics() for name, get_statistics in sorted(statistics_sources.items())}
+
+
+def report_statistics():
+    """
+    Log the registered statistics of the current process. As the caches are
+    per process, every process reports its own statistics.
+    """
+    logger.info('Metrics of process %s: %s', os.getpid(), json.dumps(get_registered_statistics(), sort_keys=True))
@@ -1,7 +1,50 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from . import request_scope
+
+
 class CorsOriginPresenceMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)
+
         response = self.get_response(request)
         return response
+
+
+class RequestScopeMiddleware:
+    """
+    Opens the request scope used by get_request_memo for every request.
+    Supports both WSGI and ASGI, so that async views are not run in a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = request_scope.start_request_scope()
+        try:
+            return self.get_response(request)
+        finally:
+            request_scope.end_request_scope(token)
+
+    async def __acall__(self, request):
+        token = request_scope.start_request_scope()
+        try:
+            return await self.get_response(request)
+        finally:
+            request_scope.end_request_scope(token)
@@ -1,5 +1,13 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.paginator import Paginator
-from .settings import DEFAULT_PAGE_LIMIT
+from django.db.models import F, Q
+from .exceptions import InvalidRequestException
+from .settings import DEFAULT_PAGE_LIMIT, CURSOR_PAGINATION_TOTAL_COUNT_LIMIT
+import base64
+import binascii
+import datetime
+import json
+import uuid
 
 
 def paginate_result(results, limit=DEFAULT_PAGE_LIMIT, page_number=1):
@@ -11,3 +19,209 @@ def paginate_result(results, limit=DEFAULT_PAGE_LIMIT, page_number=1):
         page_number = 1
 
     return paginator.page(page_number), paginator.num_pages
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor, previous_cursor, approximate_total=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.approximate_total = approximate_total
+
+
+def _get_keyset_ordering(results):
+    """
+    Return the ordering of the results as a list of (field name, is descending) pairs,
+    with the primary key appended as tie-breaker so that every row has a unique position.
+    """
+    ordering = []
+    for order in results.query.order_by or results.model._meta.ordering:
+        if not isinstance(order, str):
+            raise ValueError('Cursor pagination only supports orderings by field or annotation names')
+
+        ordering.append((order.lstrip('-'), order.startswith('-')))
+
+    if not any(field_name in ('pk', results.model._meta.pk.name) for field_name, _ in ordering):
+        ordering.append(('pk', False))
+
+    return ordering
+
+
+def _get_ordering_value(result, field_name):
+    value = result
+    for attribute_name in field_name.split('__'):
+        value = getattr(value, attribute_name)
+
+    return value
+
+
+def _serialize_cursor_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+
+    if isinstance(value, uuid.UUID):
+        return str(value)
+
+    return value
+
+
+def _encode_cursor(result, ordering, is_backward):
+    position = {
+        'values': [_serialize_cursor_value(_get_ordering_value(result, field_name)) for field_name, _ in ordering],
+        'backward': is_backward,
+    }
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor, ordering):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        values, is_backward = position['values'], position['backward']
+
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise InvalidRequestException('Cursor is invalid')
+
+    if not isinstance(values, list) or len(values) != len(ordering) or not isinstance(is_backward, bool):
+        raise InvalidRequestException('Cursor is invalid')
+
+    return values, is_backward
+
+
+def _is_nullable_ordering_field(model, field_name):
+    if field_name == 'pk':
+        return False
+
+    field = None
+    try:
+        for attribute_name in field_name.split('__'):
+            field = model._meta.get_field(attribute_name)
+            if field.null:
+                return True
+
+            model = field.related_model
+
+    except (FieldDoesNotExist, AttributeError):
+        # Annotations and fields the path cannot be followed through may be NULL
+        return True
+
+    return False
+
+
+def _get_position_after_filter(field_name, value, comparison, is_nullable):
+    """
+    Return the filter of the rows strictly after the value of a field, or None if
+    no row can be. NULLs are ordered after every value (see _get_page_ordering),
+    so they follow any value when moving forward and none when moving backward.
+    """
+    if value is None:
+        return Q(**{f'{field_name}__isnull': False}) if comparison == 'lt' else None
+
+    position_filter = Q(**{f'{field_name}__{comparison}': value})
+    if is_nullable and comparison == 'gt':
+        position_filter |= Q(**{f'{field_name}__isnull': True})
+
+    return position_filter
+
+
+def _get_position_equal_filter(field_name, value):
+    if value is None:
+        return Q(**{f'{field_name}__isnull': True})
+
+    return Q(**{field_name: value})
+
+
+def _build_keyset_filter(ordering, values, is_backward, nullable_field_names=()):
+    """
+    Build the filter selecting the rows positioned after the given values
+    (or before them, when paginating backward) in the given ordering, that is
+    (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ... with the comparison flipped
+    for descending fields.
+    """
+    keyset_filter = Q(pk__in=[])
+    for field_index, (field_name, is_descending) in enumerate(ordering):
+        comparison = 'lt' if is_descending != is_backward else 'gt'
+        position_filter = _get_position_after_filter(
+            field_name,
+            values[field_index],
+            comparison,
+            field_name in nullable_field_names
+        )
+        if position_filter is None:
+            continue
+
+        for previous_field_index in range(field_index):
+            previous_field_name = ordering[previous_field_index][0]
+            position_filter &= _get_position_equal_filter(previous_field_name, values[previous_field_index])
+
+        keyset_filter |= position_filter
+
+    return keyset_filter
+
+
+def _get_page_ordering(ordering, is_backward):
+    # NULLs always come after the values, whatever the direction, as assumed by the keyset filter
+    return [
+        F(field_name).desc(nulls_first=True) if is_descending != is_backward else F(field_name).asc(nulls_last=True)
+        for field_name, is_descending in ordering
+    ]
+
+
+def _filter_results_after_cursor(results, ordering, values, is_backward):
+    try:
+        nullable_field_names = {
+            field_name for field_name, _ in ordering
+            if _is_nullable_ordering_field(results.model, field_name)
+        }
+        return results.filter(_build_keyset_filter(ordering, values, is_backward, nullable_field_names))
+
+    except (ValidationError, ValueError, TypeError):
+        raise InvalidRequestException('Cursor is invalid')
+
+
+def paginate_result_by_cursor(results, limit=DEFAULT_PAGE_LIMIT, cursor=None, include_total=False):
+    """
+    Paginate an ordered queryset with opaque cursors instead of page numbers.
+    Every page is fetched with a keyset filter on the ordering fields,
+    so its cost does not depend on how deep the page is.
+    The total is only counted when requested, up to CURSOR_PAGINATION_TOTAL_COUNT_LIMIT.
+    """
+    if limit <= 1:
+        limit = 1
+
+    ordering = _get_keyset_ordering(results)
+    approximate_total = None
+    if include_total:
+        approximate_total = results.order_by()[:CURSOR_PAGINATION_TOTAL_COUNT_LIMIT].count()
+
+    is_backward = False
+    if cursor:
+        values, is_backward = _decode_cursor(cursor, ordering)
+        results = _filter_results_after_cursor(results, ordering, values, is_backward)
+
+    page_results = list(results.order_by(*_get_page_ordering(ordering, is_backward))[:limit + 1])
+    has_more = len(page_results) > limit
+    page_results = page_results[:limit]
+
+    if is_backward:
+        page_results.reverse()
+
+    has_next = has_more if not is_backward else bool(cursor)
+    has_previous = has_more if is_backward else bool(cursor)
+
+    if len(page_results) == 0:
+        return CursorPage([], None, None, approximate_total)
+
+    return CursorPage(
+        page_results,
+        _encode_cursor(page_results[-1], ordering, is_backward=False) if has_next else None,
+        _encode_cursor(page_results[0], ordering, is_backward=True) if has_previous else None,
+        approximate_total
+    )
+
+
+def get_cursor_after(results, result):
+    """
+    Return the cursor of the page following the given result in the ordering
+    of the results, to resume a cursor pagination from a known result.
+    """
+    return _encode_cursor(result, _get_keyset_ordering(results), is_backward=False)
@@ -0,0 +1,23 @@
+import contextvars
+
+_request_scope = contextvars.ContextVar('request_scope', default=None)
+
+
+def start_request_scope():
+    return _request_scope.set({})
+
+
+def end_request_scope(token):
+    _request_scope.reset(token)
+
+
+def get_request_memo(namespace):
+    """
+    Return the dictionary of the namespace to memoize values for the duration
+    of the current request, or None outside of a request (e.g. in scheduled jobs).
+    """
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+
+    return scope.setdefault(namespace, {})
@@ -1,4 +1,5 @@
 from django.core.paginator import Page
+from .paginators import CursorPage
 
 
 class PaginatorSerializer:
@@ -11,3 +12,12 @@ class PaginatorSerializer:
             'results': model_serializer(page.object_list, many=True).data
         }
 
+
+class CursorPaginatorSerializer:
+    def __init__(self, page: CursorPage, model_serializer, context=None):
+        self.data = {
+            'total': page.approximate_total,
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+            'results': model_serializer(page.object_list, many=True, context=context or {}).data
+        }
@@ -89,9 +89,10 @@ MIDDLEWARE = [
 
     'corsheaders.middleware.CorsMiddleware',
     'communalspace.middleware.CorsOriginPresenceMiddleware',
+    'communalspace.middleware.RequestScopeMiddleware',
 ]
 
-ROOT_URLCONF = 'communalspace.urls'
+ROOT_URLCONF = os.getenv('ROOT_URLCONF', 'communalspace.urls')
 
 TEMPLATES = [
     {
@@ -172,6 +173,38 @@ AUTH_USER_MODEL = 'users.User'
 FIREBASE_CREDENTIAL = credentials.Certificate(r'firebase-credentials.json')
 FIREBASE_APP = initialize_app(credential=FIREBASE_CREDENTIAL)
 
+# Firebase user lookups (timeouts in seconds)
+FIREBASE_GET_USERS_BATCH_SIZE = 100
+FIREBASE_USER_CACHE_MAXSIZE = 10000
+FIREBASE_USER_CACHE_TIMEOUT = 300
+FIREBASE_USER_NEGATIVE_CACHE_TIMEOUT = 60
+
+# Per-process authentication caches (timeout in seconds)
+ID_TOKEN_CACHE_MAXSIZE = 10000
+USER_CACHE_MAXSIZE = 10000
+USER_CACHE_TIMEOUT = 30
+FORUM_ACCESS_CACHE_MAXSIZE = 10000
+FORUM_ACCESS_CACHE_TIMEOUT = 30
+
+# Interval (in seconds) of the log of the per-process cache and inference statistics
+METRICS_REPORT_INTERVAL = 300
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'communalspace.metrics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 # Google Bucket Storage
 GOOGLE_BUCKET_BASE_DIRECTORY = 'event-images'
 GOOGLE_STORAGE_BUCKET_NAME = 'artifacts.mud-koalas-communal-space.appspot.com'
@@ -179,9 +212,13 @@ GOOGLE_STORAGE_BUCKET_NAME = 'artifacts.mud-koalas-communal-space.appspot.com'
 # Pagination Settings
 DEFAULT_PAGE_LIMIT = 10
 
+# Upper bound of the total counted by the cursor paginator, deeper results are reported as this bound
+CURSOR_PAGINATION_TOTAL_COUNT_LIMIT = 1000
+
 # Geofencing setting (in KM)
 AREA_RADIUS = 0.1
 AREA_BUFFER_RADIUS = 0.3
+NEAREST_LOCATION_INITIAL_SEARCH_RADIUS = 1
 
 # Reward Settings
 MINIMUM_SECONDS_FOR_REWARD_ELIGIBILITY = 0
@@ -204,3 +241,45 @@ APSCHEDULER_RUN_NOW_TIMEOUT = 25  # Seconds
 HUGGING_FACE_ACCESS_TOKEN = os.getenv("HUGGING_FACE_ACCESS_TOKEN")
 SENTIMENT_ANALYSIS_ENDPOINT = "https://api-inference.huggingface.co/models/cardiffnlp/twitter-roberta-base-sentiment-latest"
 TOKEN_CLASSIFICATION_ENDPOINT = "https://api-inference.huggingface.co/models/xlm-roberta-large-finetuned-conll03-english"
+INFERENCE_BACKEND = 'communalspace.inference.HuggingFaceInferenceBackend'
+INFERENCE_CACHE_MAXSIZE = 10000
+INFERENCE_CACHE_HIT_COUNT_FLUSH_SIZE = 100
+
+# Inference HTTP client (timeouts in seconds)
+INFERENCE_CONNECTION_POOL_SIZE = 10
+INFERENCE_CONNECT_TIMEOUT = 5
+INFERENCE_READ_TIMEOUT = 30
+INFERENCE_DEADLINE = 60
+INFERENCE_MAX_RETRIES = 3
+INFERENCE_RETRY_BACKOFF = 0.5
+INFERENCE_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+INFERENCE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT = 60
+INFERENCE_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Background sentiment pipeline of reviews and forum posts (interval in seconds)
+SENTIMENT_PIPELINE_INTERVAL = 30
+SENTIMENT_PIPELINE_BATCH_SIZE = 32
+
+# Extraction of the forum top words, either in-process (LocalKeywordExtractionBackend)
+# or with the remote token classification model (NamedEntityRecognitionBackend)
+FORUM_TOP_WORDS_BACKEND = 'forums.services.keyword_extraction.LocalKeywordExtractionBackend'
+# Number of top words reported by the forum analytics
+FORUM_TOP_WORDS_LIMIT = 20
+
+# Number of posts kept in the global trending posts table, which only
+# keeps the posts with at least TRENDING_POSTS_VOTE_THRESHOLD votes
+# A post needs tenfold votes to rank as high as a post made
+# TRENDING_POSTS_DECAY_SECONDS later, the table is rebuilt every
+# TRENDING_POSTS_REFRESH_INTERVAL seconds
+TRENDING_POSTS_SIZE = 100
+TRENDING_POSTS_VOTE_THRESHOLD = 20
+TRENDING_POSTS_DECAY_SECONDS = 45000
+TRENDING_POSTS_REFRESH_INTERVAL = 3600
+
+# Live forum updates (in seconds), a stream is closed after FORUM_STREAM_MAX_DURATION
+# and resumed by the client from its last event id
+FORUM_STREAM_HEARTBEAT_INTERVAL = 15
+FORUM_STREAM_MAX_DURATION = 120
+FORUM_STREAM_RETRY_MILLISECONDS = 3000
+FORUM_STREAM_QUEUE_SIZE = 100
+FORUM_STREAM_CATCH_UP_LIMIT = 50
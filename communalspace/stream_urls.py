@@ -0,0 +1,10 @@
+"""
+URL configuration of the ASGI application, serving the long-lived streams only.
+"""
+from django.urls import path
+from forums.views import stream_forum_updates
+
+
+urlpatterns = [
+    path('forums/<str:event_id>/stream/', stream_forum_updates),
+]
@@ -0,0 +1,38 @@
+from django.utils import timezone
+from event.models import EventCategory, Initiative, Project
+from space.models import Location
+from users.models import User
+import datetime
+
+
+def create_event_data(start_date_time=None, **event_data):
+    """
+    Returns the fields of a two-hour event starting in a day,
+    creating the location, creator and category not given.
+    """
+    if start_date_time is None:
+        start_date_time = timezone.now() + datetime.timedelta(days=1)
+
+    if 'location' not in event_data:
+        event_data['location'] = Location.objects.create(name='Park', latitude=-6.2, longitude=106.8)
+
+    if 'creator' not in event_data:
+        event_data['creator'] = User.objects.get_or_create(user_id='creator')[0]
+
+    if 'category' not in event_data:
+        event_data['category'] = EventCategory.objects.get_or_create(name='Environment')[0]
+
+    return {
+        'start_date_time': start_date_time,
+        'end_date_time': start_date_time + datetime.timedelta(hours=2),
+        **event_data
+    }
+
+
+def create_initiative(name='Park Cleanup', **event_data):
+    return Initiative.objects.create(**create_event_data(name=name, **event_data))
+
+
+def create_project(name='Book Drive', goal=100, measurement_unit='books', **event_data):
+    return Project.objects.create(**create_event_data(name=name, goal=goal, measurement_unit=measurement_unit,
+                                                      **event_data))
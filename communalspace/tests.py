@@ -0,0 +1,224 @@
+from django.test import SimpleTestCase, TestCase
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from review.services import sentiment
+from unittest import mock
+from . import inference, metrics
+from .exceptions import InferenceRequestRejectedException, InferenceUnavailableException
+import json
+import threading
+import time
+
+POSITIVE_SENTIMENTS = [[{'label': 'positive', 'score': 1.0}]]
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class MetricsReportTest(SimpleTestCase):
+    def test_report_logs_the_statistics_of_the_process(self):
+        statistics = metrics.CacheStatistics()
+        statistics.record_hit()
+        statistics.record_miss()
+        metrics.register_statistics('test_cache', statistics.get_statistics)
+        self.addCleanup(metrics._statistics_sources.pop, 'test_cache')
+
+        with self.assertLogs('communalspace.metrics', level='INFO') as logs:
+            metrics.report_statistics()
+
+        self.assertIn('"test_cache": {"hit_rate": 0.5, "hits": 1, "misses": 1}', logs.output[0])
+        self.assertIn('"user_cache"', logs.output[0])
+        self.assertIn('"inference"', logs.output[0])
+
+
+class FakeInferenceServer:
+    """
+    Local HTTP server answering the inference requests with the given responses,
+    as (status, body, delay in seconds) tuples, the last one repeating.
+    """
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._get_request_handler())
+        self._server.daemon_threads = True
+        self.endpoint = f'http://127.0.0.1:{self._server.server_address[1]}/models/sentiment'
+
+    def _get_next_response(self, request_body):
+        with self._lock:
+            self.requests.append(json.loads(request_body))
+            return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+    def _get_request_handler(self):
+        fake_server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                status, body, delay = fake_server._get_next_response(
+                    self.rfile.read(int(self.headers['Content-Length']))
+                )
+                if delay > 0:
+                    time.sleep(delay)
+
+                content = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(content)))
+                    self.end_headers()
+                    self.wfile.write(content)
+
+                # The client may have given up waiting for a delayed response
+                except ConnectionError:
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        return RequestHandler
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    def setUp(self):
+        self.timer = FakeTimer()
+        self.circuit_breaker = inference.CircuitBreaker(failure_threshold=2, recovery_timeout=60, timer=self.timer)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        self.circuit_breaker.record_failure()
+        self.circuit_breaker.record_success()
+        self.circuit_breaker.record_failure()
+        self.assertTrue(self.circuit_breaker.allow_request())
+
+        self.circuit_breaker.record_failure()
+        self.assertTrue(self.circuit_breaker.is_open())
+        self.assertFalse(self.circuit_breaker.allow_request())
+
+    def test_half_open_circuit_lets_a_single_trial_call_through(self):
+        self.circuit_breaker.record_failure()
+        self.circuit_breaker.record_failure()
+
+        self.timer.advance(60)
+        self.assertTrue(self.circuit_breaker.allow_request())
+        self.assertFalse(self.circuit_breaker.allow_request())
+
+        self.circuit_breaker.record_failure()
+        self.timer.advance(59)
+        self.assertFalse(self.circuit_breaker.allow_request())
+
+        self.timer.advance(1)
+        self.assertTrue(self.circuit_breaker.allow_request())
+        self.circuit_breaker.record_success()
+        self.assertFalse(self.circuit_breaker.is_open())
+        self.assertTrue(self.circuit_breaker.allow_request())
+
+
+@mock.patch.multiple(
+    inference,
+    INFERENCE_DEADLINE=5,
+    INFERENCE_MAX_RETRIES=2,
+    INFERENCE_RETRY_BACKOFF=0.01,
+    INFERENCE_CIRCUIT_BREAKER_FAILURE_THRESHOLD=2
+)
+class HuggingFaceInferenceBackendTest(SimpleTestCase):
+    def setUp(self):
+        self.inference_backend = inference.HuggingFaceInferenceBackend()
+
+    def test_retryable_statuses_are_retried_until_success(self):
+        with FakeInferenceServer([(503, {'error': 'Model is currently loading'}, 0),
+                                  (429, {'error': 'Rate limit reached'}, 0),
+                                  (200, POSITIVE_SENTIMENTS, 0)]) as server:
+            result = self.inference_backend.infer(server.endpoint, ['Great event'])
+
+        self.assertEqual(result, POSITIVE_SENTIMENTS)
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(server.requests[0]['inputs'], ['Great event'])
+
+    def test_retries_back_off_exponentially(self):
+        with FakeInferenceServer([(500, {'error': 'Internal error'}, 0)]) as server:
+            with mock.patch.object(inference.random, 'uniform', return_value=1), \
+                    mock.patch.object(inference.time, 'sleep') as sleep:
+                with self.assertRaises(InferenceUnavailableException):
+                    self.inference_backend.infer(server.endpoint, ['Great event'])
+
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [0.01, 0.02])
+
+    def test_non_retryable_statuses_raise_without_retrying(self):
+        with FakeInferenceServer([(400, {'error': 'Invalid inputs'}, 0)]) as server:
+            with self.assertRaises(InferenceRequestRejectedException):
+                self.inference_backend.infer(server.endpoint, ['Great event'])
+
+        self.assertEqual(len(server.requests), 1)
+
+    def test_non_json_bodies_raise_inference_unavailable(self):
+        with FakeInferenceServer([(200, b'<html>Bad Gateway</html>', 0)]) as server:
+            with self.assertRaises(InferenceUnavailableException):
+                self.inference_backend.infer(server.endpoint, ['Great event'])
+
+        self.assertEqual(len(server.requests), 3)
+
+    def test_requests_give_up_at_the_deadline(self):
+        with FakeInferenceServer([(200, POSITIVE_SENTIMENTS, 2)]) as server:
+            with mock.patch.object(inference, 'INFERENCE_DEADLINE', 0.5):
+                start = time.monotonic()
+                with self.assertRaises(InferenceUnavailableException):
+                    self.inference_backend.infer(server.endpoint, ['Great event'])
+
+                duration = time.monotonic() - start
+
+        self.assertLess(duration, 1.5)
+
+    def test_failed_requests_open_the_circuit_of_the_endpoint(self):
+        with FakeInferenceServer([(503, {'error': 'Model is currently loading'}, 0)]) as server:
+            for _ in range(3):
+                with self.assertRaises(InferenceUnavailableException):
+                    self.inference_backend.infer(server.endpoint, ['Great event'])
+
+        self.assertEqual(len(server.requests), 6)
+        statistics = self.inference_backend.get_statistics()[server.endpoint]
+        self.assertTrue(statistics['circuit_open'])
+        self.assertEqual(statistics['latency']['count'], 6)
+
+    def test_rejected_requests_do_not_open_the_circuit_of_the_endpoint(self):
+        with FakeInferenceServer([(503, {'error': 'Model is currently loading'}, 0),
+                                  (503, {'error': 'Model is currently loading'}, 0),
+                                  (503, {'error': 'Model is currently loading'}, 0),
+                                  (400, {'error': 'Input is too long'}, 0)]) as server:
+            with self.assertRaises(InferenceUnavailableException):
+                self.inference_backend.infer(server.endpoint, ['Great event'])
+
+            for _ in range(3):
+                with self.assertRaises(InferenceRequestRejectedException):
+                    self.inference_backend.infer(server.endpoint, ['Too long event'])
+
+        self.assertEqual(len(server.requests), 6)
+        self.assertFalse(self.inference_backend.get_statistics()[server.endpoint]['circuit_open'])
+
+
+@mock.patch.multiple(inference, INFERENCE_MAX_RETRIES=2, INFERENCE_RETRY_BACKOFF=0.01)
+class SentimentFallbackTest(TestCase):
+    def test_unavailable_inference_falls_back_to_the_neutral_sentiment_score(self):
+        self.addCleanup(inference.set_inference_backend, inference.get_inference_backend())
+        inference.set_inference_backend(inference.HuggingFaceInferenceBackend())
+
+        with FakeInferenceServer([(503, {'error': 'Model is currently loading'}, 0)]) as server:
+            with mock.patch.object(sentiment, 'SENTIMENT_ANALYSIS_ENDPOINT', server.endpoint):
+                sentiment_score = sentiment.compute_sentiment_score_from_text('An unavailable sentiment')
+
+        self.assertEqual(sentiment_score, sentiment.NEUTRAL_SENTIMENT_SCORE)
+        self.assertEqual(len(server.requests), 3)
@@ -1,5 +1,7 @@
 from communalspace.settings import DEFAULT_PAGE_LIMIT
 from datetime import datetime, timezone
+from django.db import models
+from django.db.models.functions import Greatest
 from django.http import HttpResponse
 from typing import Any
 from .exceptions import UnauthorizedException
@@ -115,21 +117,34 @@ def parse_limit_page(limit, page):
 
 
 def convert_user_id_to_email_or_phone_number(user_id_data):
+    user_id_data = list(user_id_data)
+    emails_or_phone_numbers = firebase_utils.get_emails_or_phone_numbers_from_ids(
+        [user_id_datum.get('user_id') for user_id_datum in user_id_data]
+    )
     return [
         {
             **user_id_datum,
-            'email_or_phone': firebase_utils.get_email_or_phone_number_from_id(user_id_datum.get('user_id'))
+            'email_or_phone': emails_or_phone_numbers[user_id_datum.get('user_id')]
         } for user_id_datum in user_id_data
     ]
 
 
-def update_average(new_value, previous_average, previous_count):
-    if previous_count == 0:
-        current_total = 0
-    else:
-        current_total = previous_average * previous_count
-
-    return (current_total + new_value) / (previous_count + 1)
+def get_running_average_update(sum_field, count_field, average_field, value, count_increment=1):
+    """
+    Return the expressions of a single UPDATE adding value to a running average
+    stored as (sum, count), with the average derived from them in the same statement.
+    The expressions only read the row being updated, so no lock is needed beforehand.
+    """
+    new_sum = models.F(sum_field) + models.Value(float(value))
+    new_count = models.F(count_field) + count_increment
+    return {
+        sum_field: new_sum,
+        count_field: new_count,
+        average_field: models.ExpressionWrapper(
+            new_sum / Greatest(new_count, 1),
+            output_field=models.FloatField()
+        ),
+    }
 
 
 def get_previous_month_index(current_month_index):
@@ -1,3 +1,9 @@
 #!/bin/bash
-python manage.py migrate
-gunicorn communalspace.wsgi:application --bind=0.0.0.0:8080
\ No newline at end of file
+# The live forum streams (/forums/<event_id>/stream/) are served by a separate
+# process running the ASGI application, started with SERVER_ROLE=forum-stream
+if [ "$SERVER_ROLE" = "forum-stream" ]; then
+    gunicorn communalspace.asgi:application --worker-class=uvicorn.workers.UvicornWorker --bind=0.0.0.0:8080
+else
+    python manage.py migrate
+    gunicorn communalspace.wsgi:application --bind=0.0.0.0:8080
+fi
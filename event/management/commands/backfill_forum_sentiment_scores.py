@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import models
+from event.models import Event
+from forums.models import Forum
+
+
+class Command(BaseCommand):
+    help = 'Copy the average sentiment score of every forum to the forum_sentiment_score of its event'
+
+    def handle(self, *args, **options):
+        forum_sentiment_score = (Forum.objects
+                                 .filter(event=models.OuterRef('pk'))
+                                 .values('average_sentiment_score')[:1])
+
+        number_of_updated_events = (Event.objects
+                                    .non_polymorphic()
+                                    .update(forum_sentiment_score=models.Subquery(forum_sentiment_score)))
+
+        self.stdout.write(f'Updated the forum sentiment score of {number_of_updated_events} events')
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from event.choices import AttendanceActivityType
+from event.models import AttendanceActivity, Initiative, InitiativeParticipation
+from participation.services.participation_helpers import check_in_user
+from users.models import User
+import datetime
+import threading
+import time
+
+BENCHMARK_USER_ID_PREFIX = 'benchmark-check-in-'
+
+
+def _check_in_with_full_saves(initiative, participation, user):
+    """
+    Check-in as it was done before the changed fields were tracked: every setter
+    saved all the fields of the participation or the user.
+    """
+    if participation.is_first_time_attending():
+        initiative.register_attending_participant()
+        participation.first_participation_time = datetime.datetime.utcnow()
+
+    participation.has_attended = True
+    participation.save()
+    participation.add_activity(AttendanceActivityType.CHECK_IN.value)
+    participation.is_currently_attending = True
+    participation.save()
+
+    user.event_currently_attended = initiative
+    user.save()
+    user.currently_attending_role = participation.get_participation_type()
+    user.save()
+
+
+def _check_in_with_dirty_fields(initiative, participation, user):
+    check_in_user(user, initiative, participation)
+
+
+class Command(BaseCommand):
+    help = ('Check in the participants of an initiative as they arrive at its opening, '
+            'saving all the fields against saving the changed fields only, on the configured (local) database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('initiative_id')
+        parser.add_argument('--threads', nargs='+', type=int, default=[1, 8])
+        parser.add_argument('--participants', type=int, default=1000)
+        parser.add_argument('--query-latency-ms', type=float, default=1.0,
+                            help='Latency added to every query, as the network round trip to a remote database')
+
+    def _run(self, check_in, initiative_id, users, threads, query_latency):
+        write_count = 0
+        write_count_lock = threading.Lock()
+
+        def execute_with_latency(execute, sql, params, many, context):
+            nonlocal write_count
+            if sql.lstrip().startswith(('INSERT', 'UPDATE')):
+                with write_count_lock:
+                    write_count += 1
+
+            time.sleep(query_latency)
+            return execute(sql, params, many, context)
+
+        def check_in_users(thread_users):
+            try:
+                with connection.execute_wrapper(execute_with_latency):
+                    for user in thread_users:
+                        with transaction.atomic():
+                            initiative = Initiative.objects.get(pk=initiative_id)
+                            check_in(initiative, initiative.get_participation_by_participant(user), user)
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(check_in_users, [users[index::threads] for index in range(threads)]))
+
+        return time.perf_counter() - start, write_count
+
+    def _reset(self, initiative_id, users):
+        initiative = Initiative.objects.get(pk=initiative_id)
+        participations = initiative.initiativeparticipation_set.filter(participant__in=users)
+        attended_count = participations.filter(has_attended=True).count()
+
+        AttendanceActivity.objects.filter(participation__in=participations).delete()
+        participations.update(has_attended=False, is_currently_attending=False, first_participation_time=None)
+        User.objects.filter(pk__in=[user.pk for user in users]).update(
+            event_currently_attended=None,
+            currently_attending_role=None
+        )
+        initiative.increment_counter('number_of_attending_participants', -attended_count)
+
+    def handle(self, *args, **options):
+        initiative_id = options['initiative_id']
+        initiative = Initiative.objects.get(pk=initiative_id)
+        users = []
+        for index in range(options['participants']):
+            user = User.objects.get_or_create(user_id=f'{BENCHMARK_USER_ID_PREFIX}{index}')[0]
+            if initiative.get_participation_by_participant(user) is None:
+                initiative.add_participant(user)
+
+            users.append(user)
+
+        counter_before = Initiative.objects.get(pk=initiative_id).number_of_attending_participants
+
+        try:
+            for threads in options['threads']:
+                for mode, check_in in (('full saves', _check_in_with_full_saves),
+                                       ('dirty fields', _check_in_with_dirty_fields)):
+                    # Reload the users, whose attendance was reset in the database only
+                    users = list(User.objects.filter(pk__in=[user.pk for user in users]))
+                    duration, write_count = self._run(
+                        check_in, initiative_id, users, threads, options['query_latency_ms'] / 1000
+                    )
+                    counter = Initiative.objects.get(pk=initiative_id).number_of_attending_participants
+                    self._reset(initiative_id, users)
+                    self.stdout.write(
+                        f'{threads:>3} threads | {mode:<12} | {len(users) / duration:8.1f} check-ins/s | '
+                        f'{write_count / len(users):4.1f} writes/check-in | '
+                        f'attending {counter - counter_before}/{len(users)}'
+                    )
+
+        finally:
+            self._reset(initiative_id, users)
+            participations = InitiativeParticipation.objects.filter(event_id=initiative_id, participant__in=users)
+            registered_count = participations.count()
+            participations.delete()
+            Initiative.objects.get(pk=initiative_id).increment_counter('current_num_of_participants', -registered_count)
+            User.objects.filter(user_id__startswith=BENCHMARK_USER_ID_PREFIX).delete()
@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from event.models import Initiative
+from participation.services.participation import (
+    _validate_initiative_is_accepting_participants,
+    _validate_participation_registration,
+    handle_register_user_participation_to_initiative
+)
+from participation.services.participation_helpers import validate_user_is_not_event_creator
+from users.models import User
+import time
+
+BENCHMARK_USER_ID_PREFIX = 'benchmark-registration-'
+
+
+def _register_with_event_row_lock(initiative_id, user):
+    """
+    Registration as it was done before the advisory lock: the initiative row is
+    locked for the whole registration.
+    """
+    initiative = Initiative.objects.select_for_update().get(pk=initiative_id)
+    validate_user_is_not_event_creator(initiative, user)
+    _validate_initiative_is_accepting_participants(initiative)
+    _validate_participation_registration(initiative, user)
+    initiative.initiativeparticipation_set.create(participant=user)
+    initiative.increment_counter('current_num_of_participants', 1)
+
+
+def _register_with_counter(initiative_id, user):
+    handle_register_user_participation_to_initiative({'event_id': initiative_id}, user)
+
+
+class Command(BaseCommand):
+    help = ('Compare concurrent registrations to one initiative with the event row lock '
+            'against the counter increments, on the configured (local) database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('initiative_id')
+        parser.add_argument('--threads', nargs='+', type=int, default=[1, 4, 16])
+        parser.add_argument('--registrations', type=int, default=400)
+        parser.add_argument('--query-latency-ms', type=float, default=1.0,
+                            help='Latency added to every query, as the network round trip to a remote database')
+
+    def _run(self, register, initiative_id, users, threads, query_latency):
+        def execute_with_latency(execute, sql, params, many, context):
+            time.sleep(query_latency)
+            return execute(sql, params, many, context)
+
+        def register_users(thread_users):
+            try:
+                with connection.execute_wrapper(execute_with_latency):
+                    for user in thread_users:
+                        with transaction.atomic():
+                            register(initiative_id, user)
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(register_users, [users[index::threads] for index in range(threads)]))
+
+        return time.perf_counter() - start
+
+    def _reset(self, initiative_id, users):
+        initiative = Initiative.objects.get(pk=initiative_id)
+        participations = initiative.initiativeparticipation_set.filter(participant__in=users)
+        registered_count = participations.count()
+        participations.delete()
+        initiative.increment_counter('current_num_of_participants', -registered_count)
+
+    def handle(self, *args, **options):
+        initiative_id = options['initiative_id']
+        users = [
+            User.objects.get_or_create(user_id=f'{BENCHMARK_USER_ID_PREFIX}{index}')[0]
+            for index in range(options['registrations'])
+        ]
+        counter_before = Initiative.objects.get(pk=initiative_id).current_num_of_participants
+
+        try:
+            for threads in options['threads']:
+                for mode, register in (('row lock', _register_with_event_row_lock), ('counter', _register_with_counter)):
+                    duration = self._run(register, initiative_id, users, threads, options['query_latency_ms'] / 1000)
+                    counter = Initiative.objects.get(pk=initiative_id).current_num_of_participants
+                    self._reset(initiative_id, users)
+                    self.stdout.write(
+                        f'{threads:>3} threads | {mode:<8} | {len(users) / duration:8.1f} registrations/s | '
+                        f'counter {counter - counter_before}/{len(users)}'
+                    )
+
+        finally:
+            self._reset(initiative_id, users)
+            User.objects.filter(user_id__startswith=BENCHMARK_USER_ID_PREFIX).delete()
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0007_initiative_number_of_attending_participants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='forum_sentiment_score',
+            field=models.FloatField(default=None, null=True),
+        ),
+    ]
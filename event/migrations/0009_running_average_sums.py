@@ -0,0 +1,44 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def compute_sums_from_averages(apps, schema_editor):
+    Event = apps.get_model('event', 'Event')
+    Initiative = apps.get_model('event', 'Initiative')
+
+    Event.objects.update(
+        sum_of_event_ratings=Coalesce('average_event_rating', 0.0) * models.F('number_of_ratings_submitted'),
+        sum_of_sentiment_scores=Coalesce('average_sentiment_score', 0.0) * models.F('number_of_sentiments_submitted')
+    )
+    Initiative.objects.update(
+        sum_of_participant_attendance_durations=(models.F('average_participant_attendance_duration') *
+                                                 models.F('number_of_durations_counted'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0008_event_forum_sentiment_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='sum_of_event_ratings',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='sum_of_sentiment_scores',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='initiative',
+            name='sum_of_participant_attendance_durations',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(compute_sums_from_averages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+def set_open_check_ins_from_activities(apps, schema_editor):
+    AttendableEventParticipation = apps.get_model('event', 'AttendableEventParticipation')
+    AttendanceActivity = apps.get_model('event', 'AttendanceActivity')
+
+    latest_check_in_times = (AttendanceActivity.objects
+                             .filter(participation=models.OuterRef('pk'), type='check-in')
+                             .order_by('-timestamp')
+                             .values('timestamp')[:1])
+    AttendableEventParticipation.objects.filter(is_currently_attending=True).update(
+        open_check_in_at=models.Subquery(latest_check_in_times)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0009_running_average_sums'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendableeventparticipation',
+            name='open_check_in_at',
+            field=models.DateTimeField(default=None, null=True),
+        ),
+        migrations.RunPython(set_open_check_ins_from_activities, migrations.RunPython.noop),
+    ]
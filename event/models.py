@@ -1,6 +1,7 @@
 import datetime
 
 from communalspace import utils as app_utils
+from communalspace.dirty_fields import DirtyFieldsMixin
 from communalspace.settings import MINIMUM_SECONDS_FOR_REWARD_ELIGIBILITY
 from django.db import models
 from django.db.models.functions import Trunc
@@ -10,8 +11,10 @@ from event.choices import (
     EventType,
     ParticipationType
 )
+from event.exceptions import InvalidCheckInCheckOutException
 from polymorphic.managers import PolymorphicManager
 from polymorphic.models import PolymorphicModel
+from polymorphic.query import PolymorphicQuerySet
 from rest_framework import serializers
 from review.models import ParticipationReview
 from space.models import LocationSerializer
@@ -19,10 +22,40 @@ from space.models import LocationSerializer
 import uuid
 
 
-class EventManager(PolymorphicManager):
+class EventQuerySet(PolymorphicQuerySet):
     def filter_active(self):
         return self.filter(status__in=(EventStatus.SCHEDULED, EventStatus.ON_GOING))
 
+    def filter_initiatives(self):
+        """
+        Filter on the polymorphic content type inside the query,
+        without fetching the subclass rows of every event.
+        """
+        return self.instance_of(Initiative)
+
+    def filter_projects(self):
+        return self.instance_of(Project)
+
+    def with_serialization_relations(self):
+        """
+        Attach the relations read by BaseEventSerializer, so that serializing
+        a page of events takes a constant number of queries.
+        """
+        return self.select_related('location', 'category', 'creator').prefetch_related('tags')
+
+
+class EventManager(PolymorphicManager):
+    queryset_class = EventQuerySet
+
+    def filter_active(self):
+        return self.get_queryset().filter_active()
+
+    def filter_initiatives(self):
+        return self.get_queryset().filter_initiatives()
+
+    def filter_projects(self):
+        return self.get_queryset().filter_projects()
+
 
 class EventParticipationManager(PolymorphicManager):
     def filter_by_event(self, event):
@@ -86,6 +119,8 @@ class Event(PolymorphicModel):
 
     volunteer_registration_enabled = models.BooleanField(default=True)
 
+    # Counters and averages are only written through update_atomically, so that concurrent
+    # updates need no lock, and existing events are saved with the changed fields only
     current_num_of_participants = models.PositiveIntegerField(default=0)
     current_num_of_volunteers = models.PositiveIntegerField(default=0)
 
@@ -98,12 +133,18 @@ class Event(PolymorphicModel):
     event_image_directory = models.TextField(null=True, default=None)
 
     # Analytics attributes
+    # Averages are derived from their (sum, count) pair by the UPDATE changing them
     average_sentiment_score = models.FloatField(default=None, null=True)
+    sum_of_sentiment_scores = models.FloatField(default=0)
     number_of_sentiments_submitted = models.PositiveIntegerField(default=0)
 
     average_event_rating = models.FloatField(default=None, null=True)
+    sum_of_event_ratings = models.FloatField(default=0)
     number_of_ratings_submitted = models.PositiveIntegerField(default=0)
 
+    # Copy of the forum average sentiment score, kept current by the forum
+    forum_sentiment_score = models.FloatField(default=None, null=True)
+
     objects = EventManager()
 
     def save(self, *args, **kwargs):
@@ -130,26 +171,24 @@ class Event(PolymorphicModel):
         return self.forum_set.get_or_create()[0]
 
     def get_forum_sentiment_score(self):
-        return self.get_or_create_forum().get_average_forum_sentiment_score()
+        return self.forum_sentiment_score
 
     def update_average_sentiment_score(self, new_sentiment_score):
-        self.average_sentiment_score = app_utils.update_average(
-            new_sentiment_score,
-            self.average_sentiment_score,
-            self.number_of_sentiments_submitted
-        )
-        self.number_of_sentiments_submitted += 1
-        self.save()
+        self.update_atomically(**app_utils.get_running_average_update(
+            'sum_of_sentiment_scores',
+            'number_of_sentiments_submitted',
+            'average_sentiment_score',
+            new_sentiment_score
+        ))
         return self.average_sentiment_score
 
     def update_average_event_rating(self, new_event_rating):
-        self.average_event_rating = app_utils.update_average(
-            new_event_rating,
-            self.average_event_rating,
-            self.number_of_ratings_submitted
-        )
-        self.number_of_ratings_submitted += 1
-        self.save()
+        self.update_atomically(**app_utils.get_running_average_update(
+            'sum_of_event_ratings',
+            'number_of_ratings_submitted',
+            'average_event_rating',
+            new_event_rating
+        ))
         return self.average_event_rating
 
     def get_volunteer_registration_enabled(self):
@@ -160,11 +199,10 @@ class Event(PolymorphicModel):
 
     def set_event_image(self, event_image_directory):
         self.event_image_directory = event_image_directory
-        self.save()
+        self.save(update_fields=['event_image_directory'])
 
     def add_tags(self, tag):
         self.tags.add(tag)
-        self.save()
 
     def get_event_image_directory(self):
         return self.event_image_directory
@@ -185,7 +223,7 @@ class Event(PolymorphicModel):
         return self.creator
 
     def get_creator_id(self):
-        return self.creator.get_user_id()
+        return self.creator_id
 
     def get_creator_name(self):
         return self.creator.get_full_name()
@@ -211,10 +249,34 @@ class Event(PolymorphicModel):
     def get_tags(self):
         return self.tags.all()
 
+    def update_atomically(self, condition=None, **expressions):
+        """
+        Apply the expressions to their fields with a single UPDATE, without reading
+        or saving the rest of the event, and reload the updated fields. The fields
+        must belong to the same table. The row stays locked until the end of the
+        transaction, so this should be the last write of the transaction.
+        """
+        field_model = self._meta.get_field(next(iter(expressions))).model
+        updated_events = field_model.objects.non_polymorphic().filter(pk=self.pk)
+        if condition is not None:
+            updated_events = updated_events.filter(condition)
+
+        updated_events.update(**expressions)
+
+        # Read back without refresh_from_db, which would also fetch the polymorphic type of the event
+        updated_values = field_model.objects.non_polymorphic().filter(pk=self.pk).values(*expressions).first()
+        for field_name, value in updated_values.items():
+            setattr(self, field_name, value)
+
+    def increment_counter(self, field_name, delta):
+        """
+        Add delta to a counter of the event. Counters never go below zero.
+        """
+        condition = models.Q(**{f'{field_name}__gte': -delta}) if delta < 0 else None
+        self.update_atomically(condition, **{field_name: models.F(field_name) + delta})
+
     def decrement_participant(self):
-        if self.current_num_of_participants > 0:
-            self.current_num_of_participants -= 1
-            self.save()
+        self.increment_counter('current_num_of_participants', -1)
 
     def get_all_volunteers(self):
         return self.volunteerparticipation_set.all()
@@ -247,15 +309,12 @@ class Event(PolymorphicModel):
 
     def add_volunteer(self, volunteer):
         event_participation = self.volunteerparticipation_set.create(participant=volunteer)
-        self.current_num_of_volunteers += 1
-        self.save()
+        self.increment_counter('current_num_of_volunteers', 1)
 
         return event_participation
 
     def decrement_volunteer(self):
-        if self.current_num_of_volunteers > 0:
-            self.current_num_of_volunteers -= 1
-            self.save()
+        self.increment_counter('current_num_of_volunteers', -1)
 
     def is_active(self):
         return self.status in (EventStatus.SCHEDULED, EventStatus.ON_GOING)
@@ -282,7 +341,7 @@ class Event(PolymorphicModel):
 
     def set_status(self, status):
         self.status = status
-        self.save()
+        self.save(update_fields=['status'])
 
     def get_num_of_volunteers(self):
         return self.current_num_of_volunteers
@@ -301,6 +360,7 @@ class Event(PolymorphicModel):
 class Initiative(Event):
     participation_registration_enabled = models.BooleanField(default=True)
     average_participant_attendance_duration = models.FloatField(default=0)
+    sum_of_participant_attendance_durations = models.FloatField(default=0)
     number_of_durations_counted = models.PositiveIntegerField(default=0)
     number_of_attending_participants = models.PositiveIntegerField(default=0)
 
@@ -312,8 +372,7 @@ class Initiative(Event):
 
     def add_participant(self, participant):
         initiative_participation = self.initiativeparticipation_set.create(participant=participant)
-        self.current_num_of_participants += 1
-        self.save()
+        self.increment_counter('current_num_of_participants', 1)
 
         return initiative_participation
 
@@ -324,22 +383,29 @@ class Initiative(Event):
         return self.initiativeparticipation_set.all()
 
     def update_average_participant_attendance_duration(self, old_duration, new_duration):
-        current_duration_total = self.number_of_durations_counted * self.average_participant_attendance_duration
-        if self.number_of_durations_counted == 0 or old_duration == 0:
-            new_duration_total = current_duration_total + new_duration
-            self.average_participant_attendance_duration = new_duration_total / (self.number_of_durations_counted + 1)
-            self.number_of_durations_counted += 1
-
-        else:
-            new_duration_total = current_duration_total - old_duration + new_duration
-            self.average_participant_attendance_duration = new_duration_total / self.number_of_durations_counted
+        # The first duration of a participant is added, the next ones replace it
+        return self.add_participant_attendance_durations(
+            new_duration - old_duration,
+            1 if old_duration == 0 else 0
+        )
 
-        self.save()
+    def add_participant_attendance_durations(self, added_duration, number_of_new_durations):
+        """
+        Add the attendance of any number of check-outs to the average duration at once:
+        added_duration is the total duration they added, and number_of_new_durations
+        the number of participants whose first duration they counted.
+        """
+        self.update_atomically(**app_utils.get_running_average_update(
+            'sum_of_participant_attendance_durations',
+            'number_of_durations_counted',
+            'average_participant_attendance_duration',
+            added_duration,
+            count_increment=number_of_new_durations
+        ))
         return self.average_participant_attendance_duration
 
     def register_attending_participant(self):
-        self.number_of_attending_participants += 1
-        self.save()
+        self.increment_counter('number_of_attending_participants', 1)
 
     def get_participants_average_attendance_duration(self):
         return self.average_participant_attendance_duration
@@ -377,7 +443,7 @@ class Project(Event):
         return self.goal
 
     def get_goal_kind(self):
-        return self.goal_kind.get_kind()
+        return self.goal_kind_id
 
     def get_progress(self):
         return self.progress
@@ -386,15 +452,14 @@ class Project(Event):
         return self.measurement_unit
 
     def increase_progress(self, amount_to_increase):
-        self.progress = self.progress + amount_to_increase
-        self.save()
+        # Added by the database, as given: unlike the counters, the progress is not floored at zero
+        self.update_atomically(progress=models.F('progress') + amount_to_increase)
 
     def add_participant(self, participant):
         contributor_participation, created = self.contributionparticipation_set.get_or_create(participant=participant)
 
         if created:
-            self.current_num_of_participants += 1
-            self.save()
+            self.increment_counter('current_num_of_participants', 1)
 
         return contributor_participation
 
@@ -411,7 +476,7 @@ class Project(Event):
         return self.contributionparticipation_set.all()
 
 
-class EventParticipation(PolymorphicModel):
+class EventParticipation(DirtyFieldsMixin, PolymorphicModel):
     participant = models.ForeignKey('users.User', on_delete=models.SET_NULL, null=True)
     registration_time = models.DateTimeField(auto_now=True)
     first_participation_time = models.DateTimeField(null=True, default=None)
@@ -447,8 +512,8 @@ class EventParticipation(PolymorphicModel):
         return self.submitted_review
 
     def set_rewarded(self, rewarded):
+        # Saved along with the transition that granted the reward
         self.rewarded = rewarded
-        self.save()
 
     def add_activity(self, activity_type):
         return self.attendanceactivity_set.create(type=activity_type)
@@ -463,10 +528,13 @@ class EventParticipation(PolymorphicModel):
         self.has_left_forum = has_left_forum
         self.save()
 
-    def create_review(self, rating, comment, sentiment_score=0):
+    def create_review(self, rating, comment, sentiment_score=None):
         self.set_submitted_review(True)
         self.get_event().update_average_event_rating(rating)
-        self.get_event().update_average_sentiment_score(sentiment_score)
+
+        # Reviews without a sentiment score are scored later by the sentiment pipeline
+        if sentiment_score is not None:
+            self.get_event().update_average_sentiment_score(sentiment_score)
 
         return ParticipationReview.objects.create(
             participation=self,
@@ -489,7 +557,15 @@ class EventParticipation(PolymorphicModel):
 
 
 class AttendableEventParticipation(EventParticipation):
+    """
+    The attendance transitions (check_in, check_out, set_violated_geofencing_rule and
+    the reward) only record their activity and change the participation in memory.
+    save_attendance writes the changed fields once the whole transition is done.
+    The attendance activities are an audit trail, never read by the transitions:
+    the time of the check-in being attended is kept in open_check_in_at.
+    """
     is_currently_attending = models.BooleanField(default=False)
+    open_check_in_at = models.DateTimeField(null=True, default=None)
     overall_duration_in_seconds = models.FloatField(default=0)
     has_attended = models.BooleanField(default=False)
     has_violated_geofencing_rule = models.BooleanField(default=False)
@@ -506,13 +582,8 @@ class AttendableEventParticipation(EventParticipation):
     def can_submit_review(self):
         return self.has_attended and not self.has_submitted_review()
 
-    def set_attended(self, attended):
-        self.has_attended = attended
-        self.save()
-
     def set_violated_geofencing_rule(self):
         self.has_violated_geofencing_rule = True
-        self.save()
 
     def get_has_violated_geofencing_rule(self):
         return self.has_violated_geofencing_rule
@@ -528,34 +599,48 @@ class AttendableEventParticipation(EventParticipation):
         if self.is_first_time_attending():
             self.first_participation_time = datetime.datetime.utcnow()
 
-        self.set_attended(True)
-        check_in_activity = self.add_activity(AttendanceActivityType.CHECK_IN.value)
+        self.has_attended = True
         self.is_currently_attending = True
-        self.save()
+        check_in_activity = self.add_activity(AttendanceActivityType.CHECK_IN.value)
+        self.open_check_in_at = check_in_activity.get_timestamp()
 
         return {
             'check_in_time': check_in_activity.get_timestamp_iso_format()
         }
 
+    def get_open_check_in_time(self):
+        if self.open_check_in_at is not None:
+            return self.open_check_in_at
+
+        # Check-ins made before open_check_in_at was recorded fall back to the latest check-in activity
+        latest_check_in = (self.attendanceactivity_set
+                           .filter(type=AttendanceActivityType.CHECK_IN.value)
+                           .order_by('-timestamp')
+                           .first())
+        if latest_check_in is None:
+            raise InvalidCheckInCheckOutException('User has no open check-in')
+
+        return latest_check_in.get_timestamp()
+
     def check_out(self):
+        check_in_time = self.get_open_check_in_time()
         check_out_activity = self.add_activity(AttendanceActivityType.CHECK_OUT.value)
-        check_in_activity = (self.get_activities()
-                             .filter(type=AttendanceActivityType.CHECK_IN.value)
-                             .order_by('-timestamp')
-                             .first())
 
-        attendance_duration = (check_out_activity.get_timestamp() - check_in_activity.get_timestamp()).total_seconds()
+        attendance_duration = (check_out_activity.get_timestamp() - check_in_time).total_seconds()
         self.overall_duration_in_seconds += attendance_duration
         self.is_currently_attending = False
+        self.open_check_in_at = None
 
-        self.save()
         return {
-            'check_in_time': check_in_activity.get_timestamp_iso_format(),
+            'check_in_time': check_in_time.isoformat(),
             'check_out_time': check_out_activity.get_timestamp_iso_format(),
             'duration_in_seconds': attendance_duration,
             'total_duration_in_seconds': self.overall_duration_in_seconds,
         }
 
+    def save_attendance(self):
+        self.save_dirty_fields()
+
     def get_attendance_duration(self):
         return self.overall_duration_in_seconds
 
@@ -563,21 +648,19 @@ class AttendableEventParticipation(EventParticipation):
 class InitiativeParticipation(AttendableEventParticipation):
     event = models.ForeignKey('event.Initiative', on_delete=models.CASCADE)
 
-    def check_in(self):
-        if self.is_first_time_attending():
-            self.get_event().register_attending_participant()
+    def save_attendance(self):
+        dirty_fields = self.get_dirty_fields()
+        super().save_attendance()
 
-        return super().check_in()
+        # The initiative row is shared by all of its participants, so it is updated last
+        if 'first_participation_time' in dirty_fields and dirty_fields['first_participation_time'] is None:
+            self.get_event().register_attending_participant()
 
-    def check_out(self):
-        previous_attendance_duration = self.get_attendance_duration()
-        check_out_data = super().check_out()
-        new_attendance_duration = self.get_attendance_duration()
-        self.get_event().update_average_participant_attendance_duration(
-            previous_attendance_duration,
-            new_attendance_duration
-        )
-        return check_out_data
+        if 'overall_duration_in_seconds' in dirty_fields:
+            self.get_event().update_average_participant_attendance_duration(
+                dirty_fields['overall_duration_in_seconds'],
+                self.get_attendance_duration()
+            )
 
     def get_event(self):
         return self.event
@@ -805,6 +888,11 @@ class TransactionHistorySerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+# Running sums behind the averages, which are presented instead
+EVENT_RUNNING_SUM_FIELDS = ['sum_of_event_ratings', 'sum_of_sentiment_scores']
+INITIATIVE_RUNNING_SUM_FIELDS = [*EVENT_RUNNING_SUM_FIELDS, 'sum_of_participant_attendance_durations']
+
+
 class BaseEventSerializer(serializers.ModelSerializer):
     event_type = serializers.SerializerMethodField(method_name='get_event_type')
     event_location = serializers.SerializerMethodField(method_name='get_event_location_data')
@@ -813,10 +901,6 @@ class BaseEventSerializer(serializers.ModelSerializer):
     event_start_date_time = serializers.SerializerMethodField(method_name='get_start_date_time_iso_format')
     event_end_date_time = serializers.SerializerMethodField(method_name='get_end_date_time_iso_format')
     event_tags = serializers.SerializerMethodField(method_name='get_tags_names')
-    forum_sentiment_score = serializers.SerializerMethodField(method_name='get_forum_sentiment_score')
-
-    def get_forum_sentiment_score(self, event):
-        return event.get_forum_sentiment_score()
 
     def get_event_type(self, event):
         return event.get_type()
@@ -874,34 +958,69 @@ class InitiativeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Initiative
-        fields = '__all__'
+        exclude = INITIATIVE_RUNNING_SUM_FIELDS
 
 
 class ProjectSerializer(serializers.ModelSerializer):
+    def get_activities(self, project):
+        projects_activities = self.context.get('projects_activities')
+        if projects_activities is not None:
+            return projects_activities.get(project.id, [])
+
+        return project.get_activities()
+
     def to_representation(self, project):
         serialized_data = BaseEventSerializer(project).data
         serialized_data['goal'] = project.get_goal()
         serialized_data['goal_kind'] = project.get_goal_kind()
         serialized_data['measurement_unit'] = project.get_measurement_unit()
         serialized_data['progress'] = project.get_progress()
-        serialized_data['transactions'] = ContributionActivitySerializer(project.get_activities(), many=True).data
+        serialized_data['transactions'] = ContributionActivitySerializer(self.get_activities(project), many=True).data
         return serialized_data
 
     class Meta:
         model = Project
-        fields = '__all__'
+        exclude = EVENT_RUNNING_SUM_FIELDS
+
+
+class EventListSerializer(serializers.ListSerializer):
+    """
+    Serialize a list of events, fetching the contribution activities
+    of all the projects in the list with a single query.
+    """
+    def _get_projects_activities(self, events):
+        project_ids = [event.id for event in events if isinstance(event, Project)]
+        projects_activities = {project_id: [] for project_id in project_ids}
+
+        if len(project_ids) > 0:
+            activities = (ContributionActivity.objects
+                          .filter(participation__event__in=project_ids)
+                          .annotate(project_id=models.F('participation__event'))
+                          .order_by('-timestamp'))
+
+            for activity in activities:
+                projects_activities[activity.project_id].append(activity)
+
+        return projects_activities
+
+    def to_representation(self, data):
+        events = list(data.all() if isinstance(data, models.Manager) else data)
+        context = {**self.context, 'projects_activities': self._get_projects_activities(events)}
+        child_serializer_class = type(self.child)
+        return [child_serializer_class(event, context=context).data for event in events]
 
 
 class EventSerializer(serializers.ModelSerializer):
     def to_representation(self, event):
         if isinstance(event, Initiative):
-            serialized_data = InitiativeSerializer(event).data
+            serialized_data = InitiativeSerializer(event, context=self.context).data
 
         else:
-            serialized_data = ProjectSerializer(event).data
+            serialized_data = ProjectSerializer(event, context=self.context).data
 
         return serialized_data
 
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = EVENT_RUNNING_SUM_FIELDS
+        list_serializer_class = EventListSerializer
@@ -5,11 +5,10 @@ from communalspace.decorators import catch_exception_and_convert_to_invalid_requ
 from communalspace.settings import GOOGLE_STORAGE_BUCKET_NAME
 from communalspace.storage import google_storage
 from django.core.exceptions import ObjectDoesNotExist
-from space.models import Location
 from space.services import utils as space_utils
+from space.services.haversine import haversine_expression
 from users.models import User
 
-import space.services.haversine
 import mimetypes
 
 
@@ -36,11 +35,7 @@ def handle_get_event_image_by_id(event_id):
 
 
 def _get_all_events_of_spaces(spaces):
-    events_of_spaces = Event.objects.none()
-    for space_ in spaces:
-        events_of_spaces = events_of_spaces | space_.get_all_events_of_space()
-
-    return events_of_spaces
+    return Event.objects.filter(location__in=spaces).order_by('start_date_time')
 
 
 def _get_active_events_of_spaces(spaces):
@@ -58,21 +53,18 @@ def handle_get_interest_based_nearby_active_events(request_data, user: User):
         user.get_preferred_radius()
     )
     nearby_events = _get_active_events_of_spaces(nearby_spaces)
-    return nearby_events.filter(tags__in=user.get_interests())
+    return nearby_events.filter(tags__in=user.get_interests()).with_serialization_relations()
 
 
 def _get_all_events_sorted_based_on_coordinate(latitude, longitude):
     if latitude is not None and longitude is not None:
-        all_locations = Location.objects.all()
-        sorted_locations = sorted(
-            all_locations,
-            key=lambda l: space.services.haversine.haversine(
-                latitude,
-                longitude,
-                l.latitude,
-                l.longitude)
-        )
-        events = _get_all_events_of_spaces(sorted_locations)
+        events = (Event.objects
+                  .annotate(distance=haversine_expression(
+                      latitude,
+                      longitude,
+                      latitude_field='location__latitude',
+                      longitude_field='location__longitude'))
+                  .order_by('distance', 'start_date_time'))
 
     else:
         events = Event.objects.order_by('start_date_time')
@@ -85,23 +77,31 @@ def _get_active_events_based_on_coordinate(latitude, longitude):
             .filter(status__in=(EventStatus.SCHEDULED, EventStatus.ON_GOING)))
 
 
-def _filter_events_based_on_search_parameter(events, search_parameter):
-    events = events.order_by('-start_date_time')
+def _get_ordering_based_on_status(status):
+    if status is not None and status.lower() in (EventStatus.SCHEDULED.lower(), EventStatus.ON_GOING.lower()):
+        return 'start_date_time', 'id'
 
-    if search_parameter.get('status') is not None:
-        events = events.filter(status__iexact=search_parameter.get('status'))
+    else:
+        return '-start_date_time', 'id'
 
-        if search_parameter.get('status').lower() == EventStatus.SCHEDULED.lower():
-            events = events.order_by('start_date_time')
 
-        elif search_parameter.get('status').lower() == EventStatus.ON_GOING.lower():
-            events = events.order_by('start_date_time')
+def _order_events(events, status):
+    """
+    Events annotated with their distance to the user are ordered by distance first,
+    so that the whole search is ordered and paginated in a single query.
+    """
+    ordering = _get_ordering_based_on_status(status)
+    if 'distance' in events.query.annotations:
+        ordering = ('distance', *ordering)
 
-        elif search_parameter.get('status').lower() == EventStatus.COMPLETED.lower():
-            events = events.order_by('-start_date_time')
+    return events.order_by(*ordering)
 
-        elif search_parameter.get('status').lower() == EventStatus.CANCELLED.lower():
-            events = events.order_by('-start_date_time')
+
+def _filter_events_based_on_search_parameter(events, search_parameter):
+    events = _order_events(events, search_parameter.get('status'))
+
+    if search_parameter.get('status') is not None:
+        events = events.filter(status__iexact=search_parameter.get('status'))
 
     if search_parameter.get('category_id') is not None:
         events = events.filter(category__id=search_parameter.get('category_id'))
@@ -111,12 +111,12 @@ def _filter_events_based_on_search_parameter(events, search_parameter):
         events = events.filter(tags__name__in=tag_names)
 
     if search_parameter.get('type') is not None and search_parameter.get('type').lower() == EventType.INITIATIVE:
-        events = utils.filter_initiatives(events)
+        events = events.filter_initiatives()
 
     if search_parameter.get('type') is not None and search_parameter.get('type').lower() == EventType.PROJECT:
-        events = utils.filter_projects(events)
+        events = events.filter_projects()
 
-    return events
+    return events.with_serialization_relations()
 
 
 @catch_exception_and_convert_to_invalid_request_decorator((ObjectDoesNotExist,))
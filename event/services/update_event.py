@@ -43,21 +43,25 @@ def _update_event(event, request_data, event_tags) -> Event:
     event.end_date_time = app_utils.get_date_from_date_time_string(request_data.get('end_date_time', event.end_date_time))
     event.category = utils.get_category_from_id_or_raise_exception(request_data.get('category_id', event.category.id))
     event.volunteer_registration_enabled = request_data.get('volunteer_registration_enabled', event.volunteer_registration_enabled)
+    updated_fields = ['start_date_time', 'end_date_time', 'category', 'volunteer_registration_enabled']
 
     if isinstance(event, Project):
         event.goal_kind = utils.get_or_create_goal_kind(request_data.get('goal_kind', event.goal_kind.kind))
         event.goal = request_data.get('project_goal', event.goal)
         event.measurement_unit = request_data.get('goal_measurement_unit', event.measurement_unit)
+        updated_fields += ['goal_kind', 'goal', 'measurement_unit']
 
     if isinstance(event, Initiative):
         event.participation_registration_enabled = request_data.get('participation_registration_enabled', event.initiative.participation_registration_enabled)
+        updated_fields += ['participation_registration_enabled']
 
     if event_tags:
         event.tags.clear()
         for tag in event_tags:
             event.add_tags(tag)
 
-    event.save()
+    # The counters and averages of the event may have changed since it was loaded
+    event.save(update_fields=updated_fields)
     return event
 
 
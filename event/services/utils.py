@@ -6,7 +6,6 @@ from ..models import (
     Project,
     Tags
 )
-from ..choices import EventType
 from django.core.exceptions import ObjectDoesNotExist
 
 
@@ -113,16 +112,6 @@ def convert_tag_ids_to_tags(tag_ids):
     return tags
 
 
-def filter_initiatives(list_of_events):
-    initiative_ids = [event.get_id() for event in list_of_events if event.get_type() == EventType.INITIATIVE]
-    return Event.objects.filter(id__in=initiative_ids)
-
-
-def filter_projects(list_of_events):
-    project_ids = [event.get_id() for event in list_of_events if event.get_type() == EventType.PROJECT]
-    return Event.objects.filter(id__in=project_ids)
-
-
 def get_or_create_goal_kind(goal_kind):
     goal_kind, _ = GoalKind.objects.get_or_create(kind=goal_kind)
     return goal_kind
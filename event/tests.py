@@ -1,3 +1,317 @@
+from communalspace import paginators
+from communalspace.testing import create_initiative, create_project
+from django.db import connection
+from django.db.models import F
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from space.models import Location
+from users.models import User
+from .choices import AttendanceActivityType, EventStatus
+from .exceptions import InvalidCheckInCheckOutException
+from .models import (
+    INITIATIVE_RUNNING_SUM_FIELDS,
+    Event,
+    EventCategory,
+    EventSerializer,
+    Initiative,
+    InitiativeSerializer,
+    Project,
+    ProjectSerializer,
+    Tags
+)
+from .services import discover_event, update_event
+import datetime
 
-# Create your tests here.
+
+class EventListSerializationQueryCountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(user_id='creator')
+        cls.contributor = User.objects.create_user(user_id='contributor')
+        cls.location = Location.objects.create(name='Park', latitude=-6.2, longitude=106.8)
+        cls.category = EventCategory.objects.create(name='Environment')
+        cls.tags = [Tags.objects.create(name='green'), Tags.objects.create(name='clean')]
+
+    def _create_events(self, number_of_events):
+        for index in range(number_of_events):
+            event_data = {
+                'name': f'Event {index}',
+                'location': self.location,
+                'creator': self.creator,
+                'category': self.category,
+            }
+            if index % 2 == 0:
+                event = create_initiative(**event_data)
+
+            else:
+                event = create_project(measurement_unit='kg', **event_data)
+                event.register_contribution(self.contributor, 5)
+
+            event.tags.set(self.tags)
+
+    def _count_serialization_queries(self):
+        events = Event.objects.order_by('name').with_serialization_relations()
+        with CaptureQueriesContext(connection) as queries:
+            serialized_events = EventSerializer(events, many=True).data
+
+        return len(queries), serialized_events
+
+    def test_serializing_mixed_events_takes_a_constant_number_of_queries(self):
+        self._create_events(4)
+        small_list_query_count, small_list = self._count_serialization_queries()
+
+        self._create_events(16)
+        large_list_query_count, large_list = self._count_serialization_queries()
+
+        self.assertEqual(len(small_list), 4)
+        self.assertEqual(len(large_list), 20)
+        self.assertEqual(small_list_query_count, large_list_query_count)
+
+    def test_serialized_events_keep_their_type_specific_data(self):
+        self._create_events(2)
+        _, serialized_events = self._count_serialization_queries()
+
+        initiative_data, project_data = serialized_events
+        self.assertEqual(initiative_data['name'], 'Event 0')
+        self.assertEqual(project_data['name'], 'Event 1')
+        self.assertEqual(len(project_data['transactions']), 1)
+        self.assertEqual({tag['name'] for tag in initiative_data['event_tags']}, {'green', 'clean'})
+
+    def test_activities_of_the_projects_are_passed_to_the_children_without_changing_the_context(self):
+        self._create_events(2)
+        serializer = EventSerializer(Event.objects.order_by('name'), many=True, context={'user': None})
+
+        self.assertEqual(len(serializer.data[1]['transactions']), 1)
+        self.assertEqual(serializer.context, {'user': None})
+
+    def test_running_sums_are_not_serialized(self):
+        initiative = create_initiative()
+        initiative.update_average_event_rating(4)
+        serialized_initiative = EventSerializer(Event.objects.get(pk=initiative.pk)).data
+
+        self.assertEqual(serialized_initiative['average_event_rating'], 4)
+        for field_name in INITIATIVE_RUNNING_SUM_FIELDS:
+            self.assertNotIn(field_name, serialized_initiative)
+            for serializer in (EventSerializer(), InitiativeSerializer(), ProjectSerializer()):
+                self.assertNotIn(field_name, serializer.fields)
+
+
+class EventCursorPaginationTest(TestCase):
+    RATINGS = [None, 3.0, 1.0, None, 2.0, 2.0, None, 4.0]
+
+    @classmethod
+    def setUpTestData(cls):
+        location = Location.objects.create(name='Park', latitude=-6.2, longitude=106.8)
+        for index, rating in enumerate(cls.RATINGS):
+            create_initiative(name=f'Event {index}', location=location, average_event_rating=rating)
+
+    def _paginate_all(self, events, limit):
+        forward_ids = []
+        page = paginators.paginate_result_by_cursor(events, limit)
+        pages = [page]
+        forward_ids.extend(event.id for event in page.object_list)
+        while page.next_cursor is not None:
+            page = paginators.paginate_result_by_cursor(events, limit, page.next_cursor)
+            pages.append(page)
+            forward_ids.extend(event.id for event in page.object_list)
+
+        backward_ids = []
+        while page.previous_cursor is not None:
+            page = paginators.paginate_result_by_cursor(events, limit, page.previous_cursor)
+            backward_ids = [event.id for event in page.object_list] + backward_ids
+
+        return forward_ids, backward_ids + [event.id for event in pages[-1].object_list]
+
+    def _assert_paginates_every_event_once(self, events, expected_events):
+        expected_ids = [event.id for event in expected_events]
+        for limit in (1, 2, 3):
+            forward_ids, backward_ids = self._paginate_all(events, limit)
+            self.assertEqual(forward_ids, expected_ids)
+            self.assertEqual(backward_ids, expected_ids)
+
+    def test_ascending_nullable_ordering_pages_through_null_values(self):
+        events = Event.objects.order_by('average_event_rating')
+        expected_events = Event.objects.order_by(F('average_event_rating').asc(nulls_last=True), 'pk')
+        self._assert_paginates_every_event_once(events, expected_events)
+
+    def test_descending_nullable_ordering_pages_through_null_values(self):
+        events = Event.objects.order_by('-average_event_rating')
+        expected_events = Event.objects.order_by(F('average_event_rating').desc(nulls_first=True), 'pk')
+        self._assert_paginates_every_event_once(events, expected_events)
+
+
+class StaleEventWriteTest(TestCase):
+    def setUp(self):
+        self.initiative = create_initiative()
+        self.project = create_project()
+
+    def test_setters_do_not_overwrite_the_counters_updated_since_loading(self):
+        stale_initiative = Initiative.objects.get(pk=self.initiative.pk)
+        self.initiative.increment_counter('current_num_of_participants', 2)
+        self.initiative.increment_counter('number_of_attending_participants', 1)
+
+        stale_initiative.set_status(EventStatus.ON_GOING)
+        stale_initiative.set_event_image('events/park-cleanup.png')
+        update_event._update_event(stale_initiative, {
+            'start_date_time': stale_initiative.get_start_date_time().isoformat(),
+            'end_date_time': stale_initiative.get_end_date_time().isoformat(),
+            'participation_registration_enabled': False
+        }, [])
+
+        initiative = Initiative.objects.get(pk=self.initiative.pk)
+        self.assertEqual(initiative.get_status(), EventStatus.ON_GOING)
+        self.assertFalse(initiative.get_participation_registration_enabled())
+        self.assertEqual(initiative.get_num_of_participants(), 2)
+        self.assertEqual(initiative.get_number_of_attending_participant(), 1)
+
+    def test_setters_do_not_overwrite_the_averages_updated_since_loading(self):
+        stale_initiative = Initiative.objects.get(pk=self.initiative.pk)
+        self.initiative.update_average_event_rating(4)
+        self.initiative.update_average_event_rating(2)
+        self.initiative.update_average_sentiment_score(0.5)
+        self.initiative.add_participant_attendance_durations(600, 2)
+
+        stale_initiative.set_status(EventStatus.COMPLETED)
+
+        initiative = Initiative.objects.get(pk=self.initiative.pk)
+        self.assertEqual(initiative.average_event_rating, 3)
+        self.assertEqual(initiative.number_of_ratings_submitted, 2)
+        self.assertEqual(initiative.average_sentiment_score, 0.5)
+        self.assertEqual(initiative.average_participant_attendance_duration, 300)
+
+    def test_progress_is_added_by_the_database(self):
+        stale_project = Project.objects.get(pk=self.project.pk)
+        self.project.increase_progress(5)
+        stale_project.increase_progress(3)
+
+        self.assertEqual(stale_project.get_progress(), 8)
+        self.assertEqual(Project.objects.get(pk=self.project.pk).get_progress(), 8)
+
+    def test_negative_progress_is_added_as_given(self):
+        self.project.increase_progress(5)
+        self.project.increase_progress(-8)
+
+        self.assertEqual(self.project.get_progress(), -3)
+        self.assertEqual(Project.objects.get(pk=self.project.pk).get_progress(), -3)
+
+
+class ParticipantCounterTest(TestCase):
+    def _assert_adds_without_locking_the_event(self, add):
+        with CaptureQueriesContext(connection) as queries:
+            add()
+
+        self.assertFalse([query['sql'] for query in queries if 'FOR UPDATE' in query['sql']])
+
+    def test_participants_and_volunteers_are_counted_without_locking_the_event(self):
+        initiative = create_initiative()
+        project = create_project()
+        for index in range(2):
+            self._assert_adds_without_locking_the_event(
+                lambda: initiative.add_participant(User.objects.create_user(user_id=f'participant-{index}'))
+            )
+            self._assert_adds_without_locking_the_event(
+                lambda: initiative.add_volunteer(User.objects.create_user(user_id=f'volunteer-{index}'))
+            )
+            self._assert_adds_without_locking_the_event(
+                lambda: project.add_participant(User.objects.create_user(user_id=f'contributor-{index}'))
+            )
+
+        initiative = Initiative.objects.get(pk=initiative.pk)
+        self.assertEqual(initiative.get_num_of_participants(), 2)
+        self.assertEqual(initiative.get_num_of_volunteers(), 2)
+        self.assertEqual(Project.objects.get(pk=project.pk).get_num_of_participants(), 2)
+
+
+class OpenCheckInTest(TestCase):
+    def setUp(self):
+        initiative = create_initiative(start_date_time=timezone.now() - datetime.timedelta(hours=1))
+        self.participation = initiative.add_participant(User.objects.create_user(user_id='participant'))
+
+    def test_check_out_without_open_check_in_time_falls_back_to_the_latest_check_in(self):
+        # Checked in before open_check_in_at was recorded
+        check_in_activity = self.participation.add_activity(AttendanceActivityType.CHECK_IN.value)
+        self.participation.is_currently_attending = True
+        self.participation.save()
+
+        check_out_data = self.participation.check_out()
+
+        self.assertEqual(check_out_data['check_in_time'], check_in_activity.get_timestamp_iso_format())
+        self.assertGreaterEqual(check_out_data['duration_in_seconds'], 0)
+
+    def test_check_out_without_any_check_in_is_invalid(self):
+        self.participation.is_currently_attending = True
+        self.participation.save()
+
+        with self.assertRaises(InvalidCheckInCheckOutException):
+            self.participation.check_out()
+
+        self.assertFalse(self.participation.get_activities().exists())
+
+
+class DiscoverEventTest(TestCase):
+    # (name, latitude, days until the start), the farther events start sooner
+    EVENTS = [
+        ('Near', -6.2, 3),
+        ('Middle', -6.3, 2),
+        ('Far', -7.2, 1),
+    ]
+
+    def setUp(self):
+        self.events = {
+            name: create_initiative(
+                name=name,
+                start_date_time=timezone.now() + datetime.timedelta(days=days_until_start),
+                location=Location.objects.create(name=name, latitude=latitude, longitude=106.8)
+            )
+            for name, latitude, days_until_start in self.EVENTS
+        }
+
+    def _search_event_names(self, request_data):
+        return [event.get_name() for event in discover_event.handle_search_events_location_wide(request_data)]
+
+    def test_location_wide_search_is_ordered_by_distance(self):
+        self.assertEqual(self._search_event_names({'latitude': '-6.2', 'longitude': '106.8'}), ['Near', 'Middle', 'Far'])
+
+    def test_events_at_the_same_distance_are_ordered_by_start_time(self):
+        create_initiative(
+            name='Near Later',
+            start_date_time=timezone.now() + datetime.timedelta(days=4),
+            location=self.events['Near'].get_location()
+        )
+
+        self.assertEqual(
+            self._search_event_names({'latitude': '-6.2', 'longitude': '106.8', 'status': EventStatus.SCHEDULED}),
+            ['Near', 'Near Later', 'Middle', 'Far']
+        )
+
+    def test_search_without_a_location_includes_every_event(self):
+        self.assertEqual(self._search_event_names({}), ['Near', 'Middle', 'Far'])
+        self.assertEqual(self._search_event_names({'status': EventStatus.SCHEDULED}), ['Far', 'Middle', 'Near'])
+
+
+class EventTypeFilterTest(TestCase):
+    def setUp(self):
+        self.initiatives = [create_initiative(name=f'Initiative {index}') for index in range(2)]
+        self.projects = [create_project(name=f'Project {index}') for index in range(2)]
+
+    def test_type_filters_keep_the_events_of_their_type(self):
+        self.assertEqual(set(Event.objects.filter_initiatives()), set(self.initiatives))
+        self.assertEqual(set(Event.objects.filter_projects()), set(self.projects))
+        self.assertTrue(all(isinstance(event, Project) for event in Event.objects.filter_projects()))
+
+    def test_type_filters_are_chained_inside_the_query(self):
+        events = Event.objects.filter(name__endswith='0').filter_initiatives()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(events.count(), 1)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(list(events), [self.initiatives[0]])
+
+    def test_search_filters_the_events_by_type(self):
+        initiative_names = [event.get_name() for event in discover_event.handle_search_events({'type': 'initiative'})]
+        project_names = [event.get_name() for event in discover_event.handle_search_events({'type': 'project'})]
+
+        self.assertEqual(sorted(initiative_names), ['Initiative 0', 'Initiative 1'])
+        self.assertEqual(sorted(project_names), ['Project 0', 'Project 1'])
@@ -1,7 +1,7 @@
 from communalspace import paginators
 from communalspace import utils as app_utils
 from communalspace.decorators import firebase_authenticated
-from communalspace.serializers import PaginatorSerializer
+from communalspace.serializers import CursorPaginatorSerializer, PaginatorSerializer
 from communalspace.firebase_admin import firebase as firebase_utils
 from django.db import transaction
 from django.views.decorators.http import require_POST, require_GET
@@ -233,6 +233,26 @@ def serve_get_nearby_events(request):
     return Response(data=response_data)
 
 
+def _paginate_events(events, request_data):
+    limit, page_number = app_utils.parse_limit_page(request_data.get('limit'), request_data.get('page'))
+
+    if request_data.get('cursor') is not None:
+        paginated_result = paginators.paginate_result_by_cursor(
+            events,
+            limit,
+            request_data.get('cursor'),
+            include_total=request_data.get('include_total') == 'true'
+        )
+        return CursorPaginatorSerializer(paginated_result, EventSerializer).data
+
+    paginated_result, total_page_number = paginators.paginate_result(events, limit, page_number)
+    return PaginatorSerializer(
+        paginated_result,
+        EventSerializer,
+        total_page_number
+    ).data
+
+
 @require_GET
 @api_view(['GET'])
 def serve_get_events_per_location(request, location_id):
@@ -252,16 +272,13 @@ def serve_get_events_per_location(request, location_id):
 
     limit: integer (number of results to be displayed in one fetch)
     page: integer
+    cursor: string (next/previous cursor of the previous fetch, empty for the first fetch).
+            When present, the results are paginated by cursor instead of page number.
+    include_total: true/false (only used with cursor, counts the results up to a bound)
     """
     request_data = request.GET
     matching_events_of_location = discover_event.handle_get_events_per_location(location_id, request_data)
-    limit, page_number = app_utils.parse_limit_page(request_data.get('limit'), request_data.get('page'))
-    paginated_result, total_page_number = paginators.paginate_result(matching_events_of_location, limit, page_number)
-    response_data = PaginatorSerializer(
-        paginated_result,
-        EventSerializer,
-        total_page_number
-    ).data
+    response_data = _paginate_events(matching_events_of_location, request_data)
     return Response(data=response_data)
 
 
@@ -288,16 +305,13 @@ def serve_search_events(request):
 
     limit: integer (number of results to be displayed in one fetch)
     page: integer
+    cursor: string (next/previous cursor of the previous fetch, empty for the first fetch).
+            When present, the results are paginated by cursor instead of page number.
+    include_total: true/false (only used with cursor, counts the results up to a bound)
     """
     request_data = request.GET
     events = discover_event.handle_search_events(request_data)
-    limit, page_number = app_utils.parse_limit_page(request_data.get('limit'), request_data.get('page'))
-    paginated_result, total_page_number = paginators.paginate_result(events, limit, page_number)
-    data = PaginatorSerializer(
-        paginated_result,
-        EventSerializer,
-        total_page_number
-    ).data
+    data = _paginate_events(events, request_data)
     return Response(data=data)
 
 
@@ -1,5 +1,33 @@
 from django.apps import AppConfig
+from apscheduler.triggers.interval import IntervalTrigger
+from communalspace.cron import scheduler
+from communalspace.settings import SENTIMENT_PIPELINE_INTERVAL, TRENDING_POSTS_REFRESH_INTERVAL
 
 
 class ForumsConfig(AppConfig):
-    name = 'forums'
\ No newline at end of file
+    name = 'forums'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        from forums.services.sentiment_pipeline import (
+            FORUM_POST_SENTIMENT_PIPELINE_JOB_ID,
+            process_pending_forum_post_sentiments
+        )
+        scheduler.add_job(
+            process_pending_forum_post_sentiments,
+            IntervalTrigger(seconds=SENTIMENT_PIPELINE_INTERVAL),
+            id=FORUM_POST_SENTIMENT_PIPELINE_JOB_ID,
+            max_instances=1,
+            coalesce=True
+        )
+
+        from forums.services.trending_posts import TRENDING_POSTS_REBUILD_JOB_ID, rebuild_trending_posts
+        scheduler.add_job(
+            rebuild_trending_posts,
+            IntervalTrigger(seconds=TRENDING_POSTS_REFRESH_INTERVAL),
+            id=TRENDING_POSTS_REBUILD_JOB_ID,
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
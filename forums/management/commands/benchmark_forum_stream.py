@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from urllib.parse import urlsplit
+import asyncio
+import time
+
+
+class Command(BaseCommand):
+    help = 'Hold many idle server-sent event streams of a forum open against a running ASGI server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='URL of the stream endpoint, e.g. http://localhost:8080/forums/<event_id>/stream/')
+        parser.add_argument('--token', required=True, help='Firebase ID token of a member of the event')
+        parser.add_argument('--connections', type=int, default=500)
+        parser.add_argument('--duration', type=float, default=30)
+
+    async def _open_stream(self, url, token, duration, statistics):
+        parsed_url = urlsplit(url)
+        try:
+            reader, writer = await asyncio.open_connection(parsed_url.hostname, parsed_url.port or 80)
+
+        except OSError:
+            statistics['failed'] += 1
+            return
+
+        request = (f'GET {parsed_url.path} HTTP/1.1\r\n'
+                   f'Host: {parsed_url.netloc}\r\n'
+                   f'Authorization: Bearer {token}\r\n'
+                   f'Accept: text/event-stream\r\n\r\n')
+        writer.write(request.encode('ascii'))
+
+        try:
+            status_line = await reader.readline()
+            if b' 200 ' not in status_line:
+                statistics['failed'] += 1
+                return
+
+            statistics['opened'] += 1
+            deadline = time.perf_counter() + duration
+            while time.perf_counter() < deadline:
+                line = await asyncio.wait_for(reader.readline(), deadline - time.perf_counter())
+                if not line:
+                    statistics['closed_by_server'] += 1
+                    return
+
+                if line.startswith(b'event: '):
+                    statistics['events'] += 1
+
+                elif line.startswith(b': heartbeat'):
+                    statistics['heartbeats'] += 1
+
+        except asyncio.TimeoutError:
+            pass
+
+        except OSError:
+            statistics['failed'] += 1
+
+        finally:
+            writer.close()
+
+    async def _run(self, options):
+        statistics = {'opened': 0, 'failed': 0, 'closed_by_server': 0, 'events': 0, 'heartbeats': 0}
+        await asyncio.gather(*[
+            self._open_stream(options['url'], options['token'], options['duration'], statistics)
+            for _ in range(options['connections'])
+        ])
+        return statistics
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        statistics = asyncio.run(self._run(options))
+        self.stdout.write(
+            f"{options['connections']} connections in {time.perf_counter() - start:.1f} s | "
+            f"opened {statistics['opened']} | failed {statistics['failed']} | "
+            f"closed by server {statistics['closed_by_server']} | "
+            f"events {statistics['events']} | heartbeats {statistics['heartbeats']}"
+        )
@@ -0,0 +1,48 @@
+from communalspace.inference import get_inference_backend
+from communalspace.settings import TOKEN_CLASSIFICATION_ENDPOINT
+from django.core.management.base import BaseCommand
+from forums.models import ForumPost
+from forums.services.keyword_extraction import LocalKeywordExtractionBackend
+import time
+
+SAMPLE_TEXTS = [
+    'Great event! Thanks to the Jakarta Green Community for organizing the beach clean up.',
+    'The beach clean up at Ancol was fun, see you at the next beach clean up!',
+    'Is the meeting point still at Gelora Bung Karno? I will bring extra gloves and trash bags.',
+    'Kegiatan bersih pantai hari ini sangat seru, terima kasih semua relawan.',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare the local keyword extraction against the remote token classification model on forum posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100)
+        parser.add_argument('--remote', action='store_true', help='Also measure the remote model (sends the texts)')
+
+    def _measure(self, function):
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        texts = list(ForumPost.objects.order_by('-posted_at').values_list('content', flat=True)[:options['limit']])
+        if len(texts) == 0:
+            texts = SAMPLE_TEXTS
+
+        local_backend = LocalKeywordExtractionBackend()
+        local_duration = self._measure(lambda: local_backend.extract_from_texts(texts))
+        self.stdout.write(
+            f'{len(texts):>6} posts | local  {local_duration * 1000:10.3f} ms | '
+            f'{local_duration * 1000 / len(texts):8.3f} ms per post'
+        )
+
+        if options['remote']:
+            remote_duration = self._measure(
+                lambda: [get_inference_backend().infer(TOKEN_CLASSIFICATION_ENDPOINT, [text]) for text in texts]
+            )
+            self.stdout.write(
+                f'{len(texts):>6} posts | remote {remote_duration * 1000:10.3f} ms | '
+                f'{remote_duration * 1000 / len(texts):8.3f} ms per post | '
+                f'local speedup {remote_duration / local_duration:.1f}x'
+            )
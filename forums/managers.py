@@ -0,0 +1,75 @@
+from django.db import connection, models
+from django.db.models.functions import RowNumber
+
+
+def group_word_counts(word_counts):
+    top_words = {}
+    for word_count in word_counts:
+        top_words.setdefault(word_count.entity_group, []).append({'word': word_count.word, 'count': word_count.count})
+
+    return top_words
+
+
+class ForumWordCountManager(models.Manager):
+    def get_top_words_of_forums(self, forum_ids, limit):
+        """
+        Return the most frequent words of every given forum, grouped by entity group,
+        with a single query ranking the words of each forum.
+        """
+        word_counts = (self.filter(forum_id__in=forum_ids)
+                       .annotate(rank=models.Window(
+                           expression=RowNumber(),
+                           partition_by=[models.F('forum_id')],
+                           order_by=[models.F('count').desc(), models.F('word').asc()]
+                       ))
+                       .filter(rank__lte=limit)
+                       .order_by('forum_id', 'rank'))
+
+        word_counts_of_forums = {forum_id: [] for forum_id in forum_ids}
+        for word_count in word_counts:
+            word_counts_of_forums[word_count.forum_id].append(word_count)
+
+        return {forum_id: group_word_counts(word_counts) for forum_id, word_counts in word_counts_of_forums.items()}
+
+    def increment_counts(self, forum_id, word_counts):
+        """
+        Add the given counts, a dictionary mapping (entity group, word) to a count,
+        to the word counts of the forum with a single upsert, so that concurrent
+        increments of the same word are all kept.
+        """
+        if len(word_counts) == 0:
+            return
+
+        table_name = connection.ops.quote_name(self.model._meta.db_table)
+        values_placeholder = ', '.join(['(%s, %s, %s, %s)'] * len(word_counts))
+        parameters = []
+        for (entity_group, word), count in word_counts.items():
+            parameters.extend([forum_id, entity_group, word, count])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table_name} (forum_id, entity_group, word, count) VALUES {values_placeholder} '
+                f'ON CONFLICT (forum_id, entity_group, word) DO UPDATE SET count = {table_name}.count + EXCLUDED.count',
+                parameters
+            )
+
+
+class ForumPostVoteManager(models.Manager):
+    def toggle_vote(self, post_id, user_id, value):
+        """
+        Cast a vote (1 or -1) of the user on the post with a single upsert.
+        Casting the same vote twice retracts it, casting the opposite vote replaces it.
+        Returns the new vote of the user (0 once retracted) and the change of the vote count of the post.
+        """
+        table_name = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table_name} (post_id, user_id, value, previous_value) VALUES (%s, %s, %s, 0) '
+                f'ON CONFLICT (post_id, user_id) DO UPDATE SET '
+                f'previous_value = {table_name}.value, '
+                f'value = CASE WHEN {table_name}.value = EXCLUDED.value THEN 0 ELSE EXCLUDED.value END '
+                f'RETURNING value, value - previous_value',
+                [post_id, user_id, value]
+            )
+            vote_value, vote_count_delta = cursor.fetchone()
+            return vote_value, vote_count_delta
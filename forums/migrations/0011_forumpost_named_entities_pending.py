@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0010_forumpost_pending_sentiment_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forumpost',
+            name='named_entities_pending',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_top_words_to_word_counts(apps, schema_editor):
+    Forum = apps.get_model('forums', 'Forum')
+    ForumWordCount = apps.get_model('forums', 'ForumWordCount')
+
+    word_counts = {}
+    for forum in Forum.objects.exclude(top_words={}).iterator():
+        for entity_group, words in forum.top_words.items():
+            for word in words:
+                key = (forum.id, entity_group[:30], word['word'].lower()[:255])
+                word_counts[key] = word_counts.get(key, 0) + word['count']
+
+    ForumWordCount.objects.bulk_create(
+        [
+            ForumWordCount(forum_id=forum_id, entity_group=entity_group, word=word, count=count)
+            for (forum_id, entity_group, word), count in word_counts.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0011_forumpost_named_entities_pending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForumWordCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_group', models.CharField(max_length=30)),
+                ('word', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('forum', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='forums.forum')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['forum', '-count'], name='forum_word_count_top_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='forumwordcount',
+            constraint=models.UniqueConstraint(fields=('forum', 'entity_group', 'word'), name='unique_forum_word_count'),
+        ),
+        migrations.RunPython(copy_top_words_to_word_counts, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='forum',
+            name='top_words',
+        ),
+    ]
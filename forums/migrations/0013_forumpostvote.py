@@ -0,0 +1,53 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_voters_to_votes(apps, schema_editor):
+    ForumPost = apps.get_model('forums', 'ForumPost')
+    ForumPostVote = apps.get_model('forums', 'ForumPostVote')
+
+    votes = []
+    for post_id, user_id in ForumPost.upvoters.through.objects.values_list('forumpost_id', 'user_id').iterator():
+        votes.append(ForumPostVote(post_id=post_id, user_id=user_id, value=1))
+
+    for post_id, user_id in ForumPost.downvoters.through.objects.values_list('forumpost_id', 'user_id').iterator():
+        votes.append(ForumPostVote(post_id=post_id, user_id=user_id, value=-1))
+
+    ForumPostVote.objects.bulk_create(votes, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('forums', '0012_forumwordcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForumPostVote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.SmallIntegerField(default=0)),
+                ('previous_value', models.SmallIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='forums.forumpost')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='forumpostvote',
+            constraint=models.UniqueConstraint(fields=('post', 'user'), name='unique_forum_post_vote'),
+        ),
+        migrations.RunPython(copy_voters_to_votes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='forumpost',
+            name='downvoters',
+        ),
+        migrations.RemoveField(
+            model_name='forumpost',
+            name='upvoters',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0014_trendingpost'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='forumpost',
+            index=models.Index(fields=['forum', '-posted_at', '-id'], name='forum_post_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def compute_sums_from_averages(apps, schema_editor):
+    Forum = apps.get_model('forums', 'Forum')
+    Forum.objects.update(
+        sum_of_post_sentiment_scores=(Coalesce('average_sentiment_score', 0.0) *
+                                      models.F('number_of_post_sentiment_calculated'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0015_forumpost_feed_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forum',
+            name='sum_of_post_sentiment_scores',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(compute_sums_from_averages, migrations.RunPython.noop),
+    ]
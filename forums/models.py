@@ -1,7 +1,10 @@
+from collections import Counter
 from communalspace import utils as app_utils
+from communalspace.settings import FORUM_TOP_WORDS_LIMIT
 from django.db import models
 from rest_framework import serializers
 from event.models import Event
+from .managers import ForumPostVoteManager, ForumWordCountManager, group_word_counts
 import uuid
 from event.choices import ParticipationType
 
@@ -10,57 +13,77 @@ class Forum(models.Model):
     id = models.UUIDField(primary_key=True, auto_created=True, default=uuid.uuid4)
     event = models.ForeignKey('event.Event', on_delete=models.CASCADE)
 
+    # Derived from the (sum, count) pair by the UPDATE changing them
     average_sentiment_score = models.FloatField(default=None, null=True)
+    sum_of_post_sentiment_scores = models.FloatField(default=0)
     number_of_post_sentiment_calculated = models.PositiveIntegerField(default=0)
 
-    top_words = models.JSONField(default=dict)
-
     def get_event(self) -> Event:
         return self.event
 
     def update_average_forum_sentiment_score(self, new_sentiment_score):
-        self.average_sentiment_score = app_utils.update_average(
-            new_sentiment_score,
-            self.average_sentiment_score,
-            self.number_of_post_sentiment_calculated
+        running_average_update = app_utils.get_running_average_update(
+            'sum_of_post_sentiment_scores',
+            'number_of_post_sentiment_calculated',
+            'average_sentiment_score',
+            new_sentiment_score
         )
-        self.number_of_post_sentiment_calculated += 1
-        self.save()
+        Forum.objects.filter(id=self.id).update(**running_average_update)
+        self.refresh_from_db(fields=list(running_average_update))
+        Event.objects.filter(id=self.event_id).update(forum_sentiment_score=self.average_sentiment_score)
         return self.average_sentiment_score
 
     def get_average_forum_sentiment_score(self):
         return self.average_sentiment_score
 
     def update_forum_top_words(self, named_entities):
-        for named_entity in named_entities:
-            entity_group_label = named_entity['entity_group']
-            entity_group = self.top_words.setdefault(entity_group_label, [])
-            entity_exists_in_group = False
-            for existing_entity in entity_group:
-                if existing_entity.get('word').lower() == named_entity.get('word').lower():
-                    existing_entity['count'] += 1
-                    entity_exists_in_group = True
-                    break
-            if not entity_exists_in_group:
-                entity_group.append({'word': named_entity.get('word').lower(), 'count': 1})
+        word_counts = Counter(
+            (named_entity['entity_group'][:30], named_entity['word'].lower()[:255])
+            for named_entity in named_entities
+        )
+        ForumWordCount.objects.increment_counts(self.id, word_counts)
 
-        self.save()
+    def get_forum_top_words(self, limit=FORUM_TOP_WORDS_LIMIT):
+        """
+        Return the most frequent words of the forum, grouped by entity group.
+        """
+        return group_word_counts(self.forumwordcount_set.order_by('-count', 'word')[:limit])
 
-    def get_forum_top_words(self):
-        return self.top_words
+    def create_post(self, content, author, author_role, sentiment_score=None, named_entities=None, is_anonymous=False):
+        # Posts without a sentiment score are analyzed later by the sentiment pipeline
+        if sentiment_score is not None:
+            self.update_average_forum_sentiment_score(sentiment_score)
+
+        if named_entities is not None:
+            self.update_forum_top_words(named_entities)
 
-    def create_post(self, content, author, author_role, sentiment_score, named_entities, is_anonymous=False):
-        self.update_average_forum_sentiment_score(sentiment_score)
-        self.update_forum_top_words(named_entities)
         return self.forumpost_set.create(
             content=content,
             author=author,
             author_role=author_role,
             is_anonymous=is_anonymous,
-            sentiment_score=sentiment_score
+            sentiment_score=sentiment_score,
+            named_entities_pending=named_entities is None
         )
 
 
+class ForumWordCount(models.Model):
+    forum = models.ForeignKey('forums.Forum', on_delete=models.CASCADE)
+    entity_group = models.CharField(max_length=30)
+    word = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+
+    objects = ForumWordCountManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['forum', 'entity_group', 'word'], name='unique_forum_word_count'),
+        ]
+        indexes = [
+            models.Index(fields=['forum', '-count'], name='forum_word_count_top_idx'),
+        ]
+
+
 class ForumPost(models.Model):
     id = models.UUIDField(primary_key=True, auto_created=True, default=uuid.uuid4)
     content = models.TextField()
@@ -70,14 +93,60 @@ class ForumPost(models.Model):
     posted_at = models.DateTimeField(auto_now_add=True)
     is_anonymous = models.BooleanField(default=False)
     vote_count = models.IntegerField(default=0)
-    upvoters = models.ManyToManyField('users.User', related_name="upvoted_posts")
-    downvoters = models.ManyToManyField('users.User', related_name="downvoted_posts")
-    sentiment_score = models.FloatField(default=0)
+    # None until the post is analyzed by the sentiment pipeline
+    sentiment_score = models.FloatField(default=None, null=True)
+    # True until the top words of the post are counted in its forum
+    named_entities_pending = models.BooleanField(default=False)
+
+    def set_sentiment_score(self, sentiment_score):
+        self.sentiment_score = sentiment_score
+        self.save()
+
+    def set_named_entities_pending(self, named_entities_pending):
+        self.named_entities_pending = named_entities_pending
+        self.save()
 
     @property
     def author_name(self):
         return "Anonymous User" if self.is_anonymous else self.author.full_name
 
+    def get_voter_ids(self, value):
+        return [vote.user_id for vote in self.forumpostvote_set.all() if vote.value == value]
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['forum', '-posted_at', '-id'], name='forum_post_feed_idx'),
+        ]
+
+
+class ForumPostVote(models.Model):
+    post = models.ForeignKey('forums.ForumPost', on_delete=models.CASCADE)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE)
+    # 1 for an upvote, -1 for a downvote, 0 once the vote is retracted
+    value = models.SmallIntegerField(default=0)
+    # Value before the last vote, to compute the change of the vote count
+    previous_value = models.SmallIntegerField(default=0)
+
+    objects = ForumPostVoteManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'user'], name='unique_forum_post_vote'),
+        ]
+
+
+class TrendingPost(models.Model):
+    """
+    Materialized top posts of all forums, ranked by their trending score.
+    """
+    post = models.OneToOneField('forums.ForumPost', on_delete=models.CASCADE, primary_key=True)
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='trending_post_score_idx'),
+        ]
+
 
 class ForumSerializer(serializers.ModelSerializer):
     event_name = serializers.ReadOnlyField(source='event.name')
@@ -95,6 +164,14 @@ class ForumSerializer(serializers.ModelSerializer):
 
 class ForumPostSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(read_only=True)
+    upvoters = serializers.SerializerMethodField(method_name='get_upvoters')
+    downvoters = serializers.SerializerMethodField(method_name='get_downvoters')
+
+    def get_upvoters(self, post):
+        return post.get_voter_ids(1)
+
+    def get_downvoters(self, post):
+        return post.get_voter_ids(-1)
 
     class Meta:
         model = ForumPost
@@ -111,3 +188,63 @@ class ForumPostSerializer(serializers.ModelSerializer):
             'upvoters',
             'downvoters'
         ]
+
+
+class ForumPostFeedListSerializer(serializers.ListSerializer):
+    """
+    Serialize a page of forum posts, fetching the votes of the requesting user
+    on all the posts of the page with a single query.
+    """
+    def _get_votes_of_user(self, posts):
+        user = self.context.get('user')
+        if user is None or len(posts) == 0:
+            return {}
+
+        return dict(ForumPostVote.objects
+                    .filter(post__in=[post.id for post in posts], user=user)
+                    .values_list('post_id', 'value'))
+
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, models.Manager) else data)
+        context = {**self.context, 'votes_of_user': self._get_votes_of_user(posts)}
+        child_serializer_class = type(self.child)
+        return [child_serializer_class(post, context=context).data for post in posts]
+
+
+class ForumPostFeedSerializer(serializers.ModelSerializer):
+    """
+    Lean representation of the forum posts in a feed, with the vote of the
+    requesting user instead of the lists of voters.
+    """
+    author_name = serializers.CharField(read_only=True)
+    my_vote = serializers.SerializerMethodField(method_name='get_my_vote')
+
+    def get_my_vote(self, post):
+        return self.context.get('votes_of_user', {}).get(post.id, 0)
+
+    class Meta:
+        model = ForumPost
+        list_serializer_class = ForumPostFeedListSerializer
+        fields = [
+            'id',
+            'content',
+            'author',
+            'author_name',
+            'author_role',
+            'forum',
+            'posted_at',
+            'is_anonymous',
+            'vote_count',
+            'my_vote'
+        ]
+
+
+class ForumActivityFeedSerializer(ForumPostFeedSerializer):
+    """
+    Forum post of the merged feed of a user, with the event of its forum.
+    """
+    event_id = serializers.UUIDField(source='forum.event_id', read_only=True)
+    event_name = serializers.CharField(source='forum.event.name', read_only=True)
+
+    class Meta(ForumPostFeedSerializer.Meta):
+        fields = ForumPostFeedSerializer.Meta.fields + ['event_id', 'event_name']
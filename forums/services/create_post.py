@@ -2,10 +2,9 @@ from communalspace import utils as app_utils
 from communalspace.decorators import catch_exception_and_convert_to_invalid_request_decorator
 from communalspace.exceptions import InvalidRequestException, RestrictedAccessException
 from django.core.exceptions import ObjectDoesNotExist
-from review.services import sentiment
-from .named_entity_recognition import recognize_entities_from_text
-from forums.models import ForumPost
-from event.services import utils as event_utils
+from . import keyword_extraction, sentiment_pipeline
+from .forum_access import forum_access_resolver
+from forums.models import Forum, ForumPost
 
 
 def _validate_create_forum_post_request(request_data, author_id, event_id):
@@ -20,28 +19,32 @@ def _validate_create_forum_post_request(request_data, author_id, event_id):
 
 
 def _create_forum_post(request_data, author, role, forum) -> ForumPost:
-    forum_post_sentiment_score = sentiment.compute_sentiment_score_from_text(request_data.get('content'))
-    forum_post_named_entities = recognize_entities_from_text(request_data.get('content'))
-    return forum.create_post(
+    # Top words extracted in-process are counted right away, the others by the sentiment pipeline
+    top_words_backend = keyword_extraction.get_top_words_backend()
+    named_entities = None
+    if top_words_backend.runs_in_process:
+        named_entities = top_words_backend.extract_from_texts([request_data.get('content')])[0]
+
+    forum_post = forum.create_post(
         content=request_data.get('content'),
         author=author,
         author_role=role,
         is_anonymous=request_data.get('is_anonymous', False),
-        sentiment_score=forum_post_sentiment_score,
-        named_entities=forum_post_named_entities
+        named_entities=named_entities
     )
+    sentiment_pipeline.request_forum_post_sentiment_processing()
+    return forum_post
 
 
 @catch_exception_and_convert_to_invalid_request_decorator((ObjectDoesNotExist,))
 def handle_create_forum_post(request_data, author, event_id):
     _validate_create_forum_post_request(request_data, author, event_id)
-    event = event_utils.get_event_by_id_or_raise_exception(event_id)
-    is_creator = event.get_creator() == author
-    participation = event.get_all_type_participation_by_participant(author)
-    if participation is None and not is_creator:
+    access = forum_access_resolver.resolve(author, event_id)
+    if access is None:
+        raise ObjectDoesNotExist(f'Event with id {event_id} does not exist')
+    if not access.is_member():
         raise RestrictedAccessException('user is not part of event with id ' + event_id)
-    if participation is not None and participation.get_has_left_forum():
+    if access.has_left_forum:
         raise RestrictedAccessException('user has left forum of event with id ' + event_id)
-    role = participation.get_participation_type() if not is_creator else "creator"
-    forum = event.get_or_create_forum()
-    return _create_forum_post(request_data, author, role, forum)
+    forum, _ = Forum.objects.get_or_create(event_id=event_id)
+    return _create_forum_post(request_data, author, access.get_role(), forum)
@@ -0,0 +1,167 @@
+from cachetools import TTLCache
+from communalspace import request_scope
+from communalspace import utils as app_utils
+from communalspace.metrics import CacheStatistics, register_statistics
+from communalspace.settings import FORUM_ACCESS_CACHE_MAXSIZE, FORUM_ACCESS_CACHE_TIMEOUT
+from django.db.models import OuterRef, Q, Subquery
+from event.choices import ParticipationType
+from event.models import (
+    ContributionParticipation,
+    Event,
+    InitiativeParticipation,
+    VolunteerParticipation
+)
+import threading
+
+CREATOR_ROLE = 'creator'
+
+# Checked in the order of Event.get_all_type_participation_by_participant
+PARTICIPATION_ROLES = (
+    (ParticipationType.VOLUNTEER, VolunteerParticipation),
+    (ParticipationType.PARTICIPANT, InitiativeParticipation),
+    (ParticipationType.CONTRIBUTOR, ContributionParticipation),
+)
+
+
+class ForumAccess:
+    """
+    Role of a user in an event (creator, one of the participation types, or None
+    when the user is not part of the event) and whether the user left its forum.
+    """
+    def __init__(self, role, has_left_forum):
+        self.role = role
+        self.has_left_forum = has_left_forum
+
+    def get_role(self):
+        return self.role
+
+    def is_member(self):
+        return self.role is not None
+
+    def can_use_forum(self):
+        return self.is_member() and not self.has_left_forum
+
+
+def _query_forum_access(user_id, event_id):
+    """
+    Fetch the forum access of the user in the event with a single query,
+    or return None if the event does not exist.
+    """
+    has_left_forum_subqueries = {
+        role: Subquery(
+            participation_model.objects
+            .non_polymorphic()
+            .filter(event_id=OuterRef('pk'), participant_id=user_id)
+            .values('has_left_forum')[:1]
+        )
+        for role, participation_model in PARTICIPATION_ROLES
+    }
+
+    row = (Event.objects
+           .non_polymorphic()
+           .filter(pk=event_id)
+           .annotate(**has_left_forum_subqueries)
+           .values('creator_id', *has_left_forum_subqueries)
+           .first())
+
+    if row is None:
+        return None
+
+    if row['creator_id'] == user_id:
+        return ForumAccess(CREATOR_ROLE, False)
+
+    for role, _ in PARTICIPATION_ROLES:
+        if row[role] is not None:
+            return ForumAccess(role, row[role])
+
+    return ForumAccess(None, False)
+
+
+def get_accessible_event_ids(user):
+    """
+    Return the subquery of the ids of the events whose forum the user can use:
+    the events created by the user and the events the user takes part in
+    without having left their forum.
+    """
+    is_accessible = Q(creator=user)
+    for _, participation_model in PARTICIPATION_ROLES:
+        is_accessible |= Q(pk__in=(
+            participation_model.objects
+            .non_polymorphic()
+            .filter(participant=user, has_left_forum=False)
+            .values('event_id')
+        ))
+
+    return Event.objects.non_polymorphic().filter(is_accessible).values('pk')
+
+
+class ForumAccessResolver:
+    """
+    Resolves the forum access of a user in an event. Answers are memoized for
+    the current request, and the accesses granting the use of the forum are
+    cached per process for a short time. Entries are invalidated by the
+    participation and event signals of the current process and expire after
+    the timeout to pick up changes made by other processes. Denials are not
+    cached, so a user who has just joined an event is never denied by another
+    process.
+    """
+    REQUEST_MEMO_NAMESPACE = 'forum_access'
+
+    def __init__(self, maxsize, timeout):
+        self._lock = threading.Lock()
+        self._accesses = TTLCache(maxsize=maxsize, ttl=timeout)
+        self.statistics = CacheStatistics()
+
+    def _get_cached_access(self, key):
+        with self._lock:
+            if key in self._accesses:
+                return True, self._accesses[key]
+
+        return False, None
+
+    def resolve(self, user, event_id):
+        """
+        Return the ForumAccess of the user in the event, or None if the event does not exist.
+        """
+        event_id = str(event_id)
+        if not app_utils.is_valid_uuid_string(event_id):
+            return None
+
+        key = (user.get_user_id(), event_id)
+        request_memo = request_scope.get_request_memo(self.REQUEST_MEMO_NAMESPACE)
+        if request_memo is not None and key in request_memo:
+            return request_memo[key]
+
+        is_cached, access = self._get_cached_access(key)
+        if is_cached:
+            self.statistics.record_hit()
+
+        else:
+            self.statistics.record_miss()
+            access = _query_forum_access(*key)
+            if access is not None and access.can_use_forum():
+                with self._lock:
+                    self._accesses[key] = access
+
+        if request_memo is not None:
+            request_memo[key] = access
+
+        return access
+
+    def invalidate(self, user_id, event_id):
+        with self._lock:
+            self._accesses.pop((user_id, str(event_id)), None)
+
+    def invalidate_event(self, event_id):
+        event_id = str(event_id)
+        with self._lock:
+            for key in [key for key in self._accesses if key[1] == event_id]:
+                self._accesses.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._accesses.clear()
+
+
+forum_access_resolver = ForumAccessResolver(FORUM_ACCESS_CACHE_MAXSIZE, FORUM_ACCESS_CACHE_TIMEOUT)
+register_statistics('forum_access_cache', forum_access_resolver.statistics.get_statistics)
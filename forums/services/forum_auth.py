@@ -1,4 +1,4 @@
-from event.models import Event
+from .forum_access import forum_access_resolver
 from users.models import User
 
 
@@ -12,17 +12,5 @@ def check_authorization(user: User, event_id: str) -> bool:
 
     * The user information will be taken from the firebase authentication.
     """
-    event = Event.objects.get(pk=event_id)
-    participation = event.get_all_type_participation_by_participant(user)
-    try:
-        has_left_forum = participation.get_has_left_forum()
-    except:
-        has_left_forum = True
-
-    if event.creator == user:
-        return True
-
-    if participation is not None and has_left_forum is not True:
-        return True
-
-    return False
+    access = forum_access_resolver.resolve(user, event_id)
+    return access is not None and access.can_use_forum()
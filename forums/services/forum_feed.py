@@ -0,0 +1,47 @@
+from communalspace import paginators
+from communalspace import utils as app_utils
+from communalspace.exceptions import RestrictedAccessException
+from .forum_access import get_accessible_event_ids
+from .forum_auth import check_authorization
+from ..models import Forum, ForumPost
+
+
+def get_forum_posts_page(forum: Forum, limit, cursor, before=None, after=None):
+    """
+    Return a page of the posts of the forum, newest first, paginated by cursor
+    on (posted_at, id) so that deep pages cost the same as the first one.
+    """
+    posts = forum.forumpost_set.select_related('author')
+    if before:
+        posts = posts.filter(posted_at__lt=before)
+
+    if after:
+        posts = posts.filter(posted_at__gt=after)
+
+    return paginators.paginate_result_by_cursor(posts.order_by('-posted_at', '-id'), limit, cursor)
+
+
+def handle_get_forum_posts_by_event(request_data, user, event_id):
+    if not check_authorization(user, event_id):
+        raise RestrictedAccessException('user is not part of event with id ' + event_id)
+
+    forum = Forum.objects.get(event_id=event_id)
+    limit, _ = app_utils.parse_limit_page(request_data.get('limit'), None)
+    return get_forum_posts_page(forum, limit, request_data.get('cursor'))
+
+
+def get_forum_activity_feed_page(user, limit, cursor):
+    """
+    Return a page of the posts of all the forums the user can use, newest first,
+    fetched with a single query per page on (posted_at, id).
+    """
+    posts = (ForumPost.objects
+             .filter(forum__event__in=get_accessible_event_ids(user))
+             .select_related('author', 'forum__event'))
+
+    return paginators.paginate_result_by_cursor(posts.order_by('-posted_at', '-id'), limit, cursor)
+
+
+def handle_get_forum_activity_feed(request_data, user):
+    limit, _ = app_utils.parse_limit_page(request_data.get('limit'), None)
+    return get_forum_activity_feed_page(user, limit, request_data.get('cursor'))
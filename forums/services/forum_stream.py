@@ -0,0 +1,364 @@
+from asgiref.sync import sync_to_async
+from collections import defaultdict
+from communalspace import paginators
+from communalspace.settings import (
+    FORUM_STREAM_CATCH_UP_LIMIT,
+    FORUM_STREAM_HEARTBEAT_INTERVAL,
+    FORUM_STREAM_MAX_DURATION,
+    FORUM_STREAM_QUEUE_SIZE,
+    FORUM_STREAM_RETRY_MILLISECONDS
+)
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, close_old_connections, connection, connections
+from ..models import ForumPost, ForumPostFeedSerializer
+import asyncio
+import json
+import select
+import threading
+
+POST_EVENT = 'post'
+VOTE_EVENT = 'vote'
+
+# Database notification channel of the forum events of all processes
+FORUM_STREAM_CHANNEL = 'forum_stream'
+# Longest wait of the listening thread for notifications before checking whether to stop
+FORUM_STREAM_LISTEN_TIMEOUT = 1
+
+
+class ForumStreamEvent:
+    def __init__(self, kind, data, event_id=None):
+        self.kind = kind
+        self.data = data
+        self.event_id = event_id
+
+    def get_post_id(self):
+        return str(self.data['id']) if self.kind == POST_EVENT else None
+
+    def encode(self):
+        lines = [f'event: {self.kind}']
+        if self.event_id is not None:
+            lines.append(f'id: {self.event_id}')
+
+        lines.append(f'data: {json.dumps(self.data, cls=DjangoJSONEncoder)}')
+        return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class ForumSubscription:
+    """
+    Queue of the events of a forum for one stream, living on the event loop of the stream.
+    When the stream falls more than FORUM_STREAM_QUEUE_SIZE events behind, or events
+    may have been missed, the subscription is interrupted and the stream is closed,
+    to be resumed from the database.
+    """
+    def __init__(self, forum_id, loop, queue_size):
+        self.forum_id = forum_id
+        self.is_interrupted = False
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=queue_size)
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.is_interrupted = True
+
+    def _interrupt(self):
+        self.is_interrupted = True
+        try:
+            # Wakes up the stream waiting for its next event
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+    def deliver(self, event):
+        """
+        Thread-safe delivery of an event, called from the publishing thread.
+        """
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def interrupt(self):
+        """
+        Thread-safe interruption of the subscription, called from the publishing thread.
+        """
+        self._loop.call_soon_threadsafe(self._interrupt)
+
+    async def get(self, timeout):
+        """
+        Return the next event, or None if none arrives within the timeout.
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ForumEventBroker:
+    """
+    Per-process fan-out of the forum events to the streams of the forum served
+    by this process.
+    """
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, forum_id):
+        subscription = ForumSubscription(str(forum_id), asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[subscription.forum_id].add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.forum_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if len(subscriptions) == 0:
+                    del self._subscriptions[subscription.forum_id]
+
+    def has_subscribers(self, forum_id):
+        with self._lock:
+            return str(forum_id) in self._subscriptions
+
+    def get_subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, forum_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(str(forum_id), ()))
+
+        for subscription in subscriptions:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # The event loop of the stream has been closed
+                self.unsubscribe(subscription)
+
+    def interrupt_all(self):
+        with self._lock:
+            subscriptions = [
+                subscription
+                for forum_subscriptions in self._subscriptions.values()
+                for subscription in forum_subscriptions
+            ]
+
+        for subscription in subscriptions:
+            try:
+                subscription.interrupt()
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+
+forum_event_broker = ForumEventBroker(FORUM_STREAM_QUEUE_SIZE)
+
+
+def run_in_database_thread(function):
+    """
+    Wrap a synchronous function to be awaited from a stream. It runs in the shared
+    thread pool instead of the thread of the request, so that open streams do not
+    each hold a database connection.
+    """
+    return sync_to_async(function, thread_sensitive=False)
+
+
+def _get_stream_posts(forum_id):
+    return ForumPost.objects.filter(forum_id=forum_id).select_related('author').order_by('posted_at', 'id')
+
+
+def _create_post_event(post, data):
+    return ForumStreamEvent(POST_EVENT, data, paginators.get_cursor_after(_get_stream_posts(post.forum_id), post))
+
+
+def _notify(notification):
+    # Delivered by the database once the current transaction commits, and dropped if it is rolled back
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [FORUM_STREAM_CHANNEL, json.dumps(notification)])
+
+
+def notify_created_post(post: ForumPost):
+    _notify({'forum_id': str(post.forum_id), 'kind': POST_EVENT, 'id': str(post.id)})
+
+
+def notify_post_vote_count(post: ForumPost):
+    _notify({'forum_id': str(post.forum_id), 'kind': VOTE_EVENT, 'id': str(post.id), 'vote_count': post.vote_count})
+
+
+class ForumEventListener:
+    """
+    Listens to the forum notifications of all processes on a single database
+    connection, and publishes the events of the forums with open streams in this
+    process to the broker. The posts notified together are read with one query,
+    whatever the number of streams. When the connection is lost, the open streams
+    are interrupted, as they may have missed events, and the next stream opened
+    listens again.
+    """
+    def __init__(self, broker, channel):
+        self._broker = broker
+        self._channel = channel
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_listening = None
+
+    def _connect(self):
+        database_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        # Opened by the thread of the caller, used and closed by the listening thread
+        database_connection.inc_thread_sharing()
+        database_connection.ensure_connection()
+        with database_connection.connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {self._channel}')
+
+        return database_connection
+
+    def ensure_listening(self):
+        """
+        Start listening if this process does not listen yet. Once this returns, every
+        event committed afterwards is published to the broker.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_listening = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._listen,
+                    args=(self._connect(), self._stop_listening),
+                    daemon=True
+                )
+                self._thread.start()
+
+    def stop(self):
+        """
+        Stop listening and wait for the listening thread to close its connections.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._stop_listening.set()
+                thread.join()
+
+    def _listen(self, database_connection, stop_listening):
+        try:
+            listening_connection = database_connection.connection
+            while not stop_listening.is_set():
+                if select.select([listening_connection], [], [], FORUM_STREAM_LISTEN_TIMEOUT) == ([], [], []):
+                    continue
+
+                listening_connection.poll()
+                notifications = [json.loads(notify.payload) for notify in listening_connection.notifies]
+                listening_connection.notifies.clear()
+                self.publish_notifications(notifications)
+
+        except (DatabaseError, database_connection.Database.Error, OSError):
+            self._broker.interrupt_all()
+
+        finally:
+            database_connection.close()
+            connection.close()
+
+    def publish_notifications(self, notifications):
+        notifications = [
+            notification for notification in notifications
+            if self._broker.has_subscribers(notification['forum_id'])
+        ]
+        post_ids = [notification['id'] for notification in notifications if notification['kind'] == POST_EVENT]
+        posts = {}
+        if len(post_ids) > 0:
+            close_old_connections()
+            posts = {str(post.id): post for post in ForumPost.objects.filter(id__in=post_ids).select_related('author')}
+
+        for notification in notifications:
+            if notification['kind'] == POST_EVENT:
+                post = posts.get(notification['id'])
+
+                # The post may have been deleted in the meantime
+                if post is None:
+                    continue
+
+                event = _create_post_event(post, ForumPostFeedSerializer(post).data)
+
+            else:
+                event = ForumStreamEvent(VOTE_EVENT, {'id': notification['id'], 'vote_count': notification['vote_count']})
+
+            self._broker.publish(notification['forum_id'], event)
+
+
+forum_event_listener = ForumEventListener(forum_event_broker, FORUM_STREAM_CHANNEL)
+
+
+def get_forum_post_events_after(forum_id, cursor, user):
+    """
+    Return the events of the posts created after the cursor (all of them, in
+    pages of FORUM_STREAM_CATCH_UP_LIMIT posts).
+    """
+    events = []
+    while True:
+        page = paginators.paginate_result_by_cursor(_get_stream_posts(forum_id), FORUM_STREAM_CATCH_UP_LIMIT, cursor)
+        posts_data = ForumPostFeedSerializer(page.object_list, many=True, context={'user': user}).data
+        events.extend(_create_post_event(post, data) for post, data in zip(page.object_list, posts_data))
+
+        if len(page.object_list) > 0:
+            cursor = events[-1].event_id
+
+        if page.next_cursor is None:
+            return events
+
+
+def get_latest_forum_post_cursor(forum_id):
+    latest_post = _get_stream_posts(forum_id).last()
+    return paginators.get_cursor_after(_get_stream_posts(forum_id), latest_post) if latest_post is not None else None
+
+
+async def _stream_forum_events(subscription, events):
+    try:
+        yield f'retry: {FORUM_STREAM_RETRY_MILLISECONDS}\n\n'.encode('utf-8')
+
+        sent_post_ids = set()
+        for event in events:
+            sent_post_ids.add(event.get_post_id())
+            yield event.encode()
+
+        yield b': heartbeat\n\n'
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + FORUM_STREAM_MAX_DURATION
+        while loop.time() < deadline and not subscription.is_interrupted:
+            event = await subscription.get(min(FORUM_STREAM_HEARTBEAT_INTERVAL, deadline - loop.time()))
+            if event is None:
+                yield b': heartbeat\n\n'
+                continue
+
+            # Posts created during the catch-up may be received twice
+            if event.kind == POST_EVENT:
+                if event.get_post_id() in sent_post_ids:
+                    continue
+
+                sent_post_ids.add(event.get_post_id())
+
+            yield event.encode()
+
+    finally:
+        forum_event_broker.unsubscribe(subscription)
+
+
+async def open_forum_stream(forum_id, user, cursor=None):
+    """
+    Open the stream of server-sent events of the forum: the posts created after the
+    cursor (or after the latest post when no cursor is given), followed by the posts
+    and the vote counts notified by any process while the stream is open. The stream
+    is closed after FORUM_STREAM_MAX_DURATION seconds, as the client resumes it from
+    its last event id.
+    Raise InvalidRequestException if the cursor is invalid.
+    """
+    await run_in_database_thread(forum_event_listener.ensure_listening)()
+    subscription = forum_event_broker.subscribe(forum_id)
+    try:
+        if cursor is None:
+            cursor = await run_in_database_thread(get_latest_forum_post_cursor)(forum_id)
+
+        events = await run_in_database_thread(get_forum_post_events_after)(forum_id, cursor, user)
+
+    except Exception:
+        forum_event_broker.unsubscribe(subscription)
+        raise
+
+    return _stream_forum_events(subscription, events)
@@ -0,0 +1,149 @@
+from collections import Counter
+from communalspace.settings import FORUM_TOP_WORDS_BACKEND
+from django.utils.module_loading import import_string
+from .named_entity_recognition import recognize_entities_from_texts
+import re
+
+ENTITY_GROUP = 'MISC'
+KEYWORD_GROUP = 'KEYWORD'
+
+MINIMUM_KEYWORD_LENGTH = 3
+
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"[.!?;:]+(?:\s+|$)|\n+")
+
+# English and Indonesian function words, which are never keywords
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being below
+between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down during each few
+for from further get got had hadn't has hasn't have haven't having he he'd he'll he's her here here's hers herself
+him himself his how how's i i'd i'll i'm i've if in into is isn't it it's its itself just let's me more most
+mustn't my myself no nor not now of off on once only or other ought our ours ourselves out over own really same
+she she'd she'll she's should shouldn't so some such than thank thanks that that's the their theirs them
+themselves then there there's these they they'd they'll they're they've this those through to too under until up
+us very was wasn't we we'd we'll we're we've were weren't what what's when when's where where's which while who
+who's whom why why's will with won't would wouldn't yes you you'd you'll you're you've your yours yourself
+yourselves
+ada adalah agar akan aku anda apa atau bagi bahwa banyak belum bisa buat dalam dan dari dengan di dia hal hanya
+harus ini itu jadi jika juga kalau kami kamu karena ke kita lagi lebih mereka nya oleh pada para saja saya sangat
+sebagai sedang sekali semua sudah tapi telah tentang tersebut tidak untuk yang ya
+""".split())
+
+
+def _is_capitalized(token):
+    return token[0].isupper()
+
+
+def _is_keyword(token):
+    return len(token) >= MINIMUM_KEYWORD_LENGTH and token.lower() not in STOP_WORDS
+
+
+def _extract_capitalized_phrases(tokens):
+    """
+    Return the (start, end) token spans of the runs of capitalized words,
+    trimmed of stop words. The first word of a sentence is only part of a phrase
+    when the next word is capitalized too, as its capitalization says nothing.
+    """
+    spans = []
+    index = 0
+    while index < len(tokens):
+        if not _is_capitalized(tokens[index]):
+            index += 1
+            continue
+
+        end = index + 1
+        while end < len(tokens) and _is_capitalized(tokens[end]):
+            end += 1
+
+        start = index
+        while start < end and tokens[start].lower() in STOP_WORDS:
+            start += 1
+
+        phrase_end = end
+        while phrase_end > start and tokens[phrase_end - 1].lower() in STOP_WORDS:
+            phrase_end -= 1
+
+        is_sentence_start_only = index == 0 and end == 1
+        if start < phrase_end and not is_sentence_start_only:
+            spans.append((start, phrase_end))
+
+        index = end
+
+    return spans
+
+
+def extract_keywords_from_text(text):
+    """
+    Extract the named entities and keywords of a text, in the format of the
+    token classification results (entity_group and word of every occurrence).
+    Runs of capitalized words are reported as entities, bigrams of keywords
+    that occur more than once as keyword phrases, and the other words
+    that are not stop words as keywords.
+    """
+    sentences = [TOKEN_PATTERN.findall(sentence) for sentence in SENTENCE_BOUNDARY_PATTERN.split(text or '')]
+
+    bigram_counts = Counter(
+        (tokens[index].lower(), tokens[index + 1].lower())
+        for tokens in sentences
+        for index in range(len(tokens) - 1)
+        if _is_keyword(tokens[index]) and _is_keyword(tokens[index + 1])
+    )
+
+    entities = []
+    for tokens in sentences:
+        covered_indexes = set()
+        for start, end in _extract_capitalized_phrases(tokens):
+            entities.append({'entity_group': ENTITY_GROUP, 'word': ' '.join(tokens[start:end])})
+            covered_indexes.update(range(start, end))
+
+        index = 0
+        while index < len(tokens):
+            if index in covered_indexes or not _is_keyword(tokens[index]):
+                index += 1
+                continue
+
+            if index + 1 < len(tokens) and index + 1 not in covered_indexes:
+                bigram = (tokens[index].lower(), tokens[index + 1].lower())
+                if bigram_counts.get(bigram, 0) > 1:
+                    entities.append({'entity_group': KEYWORD_GROUP, 'word': ' '.join(bigram)})
+                    index += 2
+                    continue
+
+            entities.append({'entity_group': KEYWORD_GROUP, 'word': tokens[index].lower()})
+            index += 1
+
+    return entities
+
+
+class LocalKeywordExtractionBackend:
+    """
+    Extracts the top words in-process with tokenization, stop word filtering,
+    capitalization heuristics and repeated bigram detection.
+    """
+    runs_in_process = True
+
+    def extract_from_texts(self, texts):
+        return [extract_keywords_from_text(text) for text in texts]
+
+
+class NamedEntityRecognitionBackend:
+    """
+    Extracts the top words with the remote token classification model.
+    Slower, as the texts have to be sent to the inference endpoint.
+    """
+    runs_in_process = False
+
+    def extract_from_texts(self, texts):
+        return recognize_entities_from_texts(texts)
+
+
+_top_words_backend = import_string(FORUM_TOP_WORDS_BACKEND)()
+
+
+def get_top_words_backend():
+    return _top_words_backend
+
+
+def set_top_words_backend(top_words_backend):
+    global _top_words_backend
+    _top_words_backend = top_words_backend
@@ -1,11 +1,22 @@
-import json
-import requests
-from communalspace.settings import HUGGING_FACE_ACCESS_TOKEN, TOKEN_CLASSIFICATION_ENDPOINT
+from communalspace.exceptions import InferenceUnavailableException
+from communalspace.settings import TOKEN_CLASSIFICATION_ENDPOINT
+from review.services.inference_cache import inference_result_cache
+
+
+def recognize_entities_from_texts(texts):
+    """
+    Batched version of recognize_entities_from_text,
+    recognizing the entities of all uncached texts in a single inference request.
+    """
+    if len(texts) == 0:
+        return []
+
+    return inference_result_cache.infer(TOKEN_CLASSIFICATION_ENDPOINT, list(texts))
 
 
 def recognize_entities_from_text(text):
-    headers = {"Authorization": f"Bearer {HUGGING_FACE_ACCESS_TOKEN}"}
-    data = json.dumps({"inputs": text, "options": {"wait_for_model": True}})
-    response = requests.request("POST", TOKEN_CLASSIFICATION_ENDPOINT, headers=headers, data=data)
-    ner = json.loads(response.content.decode("utf-8"))
-    return ner
+    try:
+        return recognize_entities_from_texts([text])[0]
+
+    except InferenceUnavailableException:
+        return []
@@ -1,7 +1,9 @@
 from communalspace import utils as app_utils
 from communalspace.exceptions import InvalidRequestException, RestrictedAccessException
+from communalspace.settings import DEFAULT_PAGE_LIMIT
 from .forum_auth import check_authorization
-from event.services import utils as event_utils
+from .forum_feed import get_forum_posts_page
+from ..models import Forum
 
 
 def _validate_post_range(request_data):
@@ -22,23 +24,11 @@ def find_post_in_range(request_data, user, event_id):
         raise RestrictedAccessException('user is not part of event with id ' + event_id)
 
     request_limit = request_data.get("limit")
-    limit = int(request_limit) if request_limit is not None else None
+    limit = int(request_limit) if request_limit is not None else DEFAULT_PAGE_LIMIT
     request_after = request_data.get("after")
     after = app_utils.get_date_from_date_time_string(request_after) if request_after is not None else None
     request_before = request_data.get("before")
     before = app_utils.get_date_from_date_time_string(request_before) if request_before is not None else None
 
-    event = event_utils.get_event_by_id_or_raise_exception(event_id)
-    forum = event.get_or_create_forum()
-
-    posts = forum.forumpost_set.all()
-    if before:
-        posts = posts.filter(posted_at__lt=before)
-    if after:
-        posts = posts.filter(posted_at__gt=after)
-
-    posts = posts.order_by("-posted_at")
-    if limit:
-        posts = posts[:limit]
-
-    return posts
+    forum, _ = Forum.objects.get_or_create(event_id=event_id)
+    return get_forum_posts_page(forum, limit, request_data.get("cursor"), before=before, after=after)
@@ -0,0 +1,76 @@
+from communalspace.cron import run_job_now
+from communalspace.exceptions import InferenceUnavailableException
+from communalspace.inference import infer_one_by_one_if_rejected
+from communalspace.settings import SENTIMENT_PIPELINE_BATCH_SIZE
+from django.db import models, transaction
+from review.services import sentiment
+from .keyword_extraction import get_top_words_backend
+from ..models import Forum, ForumPost
+
+FORUM_POST_SENTIMENT_PIPELINE_JOB_ID = 'forum_post_sentiment_pipeline'
+
+
+def _get_pending_forum_posts():
+    return list(ForumPost.objects
+                .filter(models.Q(sentiment_score__isnull=True) | models.Q(named_entities_pending=True))
+                .order_by('posted_at', 'id')[:SENTIMENT_PIPELINE_BATCH_SIZE])
+
+
+@transaction.atomic()
+def _apply_forum_post_analysis(forum_post_id, sentiment_score, named_entities):
+    forum_post = ForumPost.objects.select_for_update().filter(id=forum_post_id).first()
+    if forum_post is None:
+        return
+
+    forum = Forum.objects.select_for_update().get(id=forum_post.forum_id)
+
+    # Parts of the post may have been analyzed by another process in the meantime
+    if sentiment_score is not None and forum_post.sentiment_score is None:
+        forum.update_average_forum_sentiment_score(sentiment_score)
+        forum_post.set_sentiment_score(sentiment_score)
+
+    if named_entities is not None and forum_post.named_entities_pending:
+        forum.update_forum_top_words(named_entities)
+        forum_post.set_named_entities_pending(False)
+
+
+def process_pending_forum_post_sentiments():
+    """
+    Analyze a batch of pending forum posts with one sentiment request and one
+    top words extraction, outside of any transaction, then apply every result
+    to its post and forum. The posts rejected by the endpoint get the neutral
+    sentiment score and no top words.
+    """
+    pending_forum_posts = _get_pending_forum_posts()
+    unscored_forum_posts = [forum_post for forum_post in pending_forum_posts if forum_post.sentiment_score is None]
+    unextracted_forum_posts = [forum_post for forum_post in pending_forum_posts if forum_post.named_entities_pending]
+    try:
+        sentiment_scores = infer_one_by_one_if_rejected(
+            sentiment.compute_sentiment_scores_from_texts,
+            [forum_post.content for forum_post in unscored_forum_posts],
+            sentiment.NEUTRAL_SENTIMENT_SCORE
+        )
+        named_entities_of_posts = infer_one_by_one_if_rejected(
+            get_top_words_backend().extract_from_texts,
+            [forum_post.content for forum_post in unextracted_forum_posts],
+            []
+        )
+
+    except InferenceUnavailableException:
+        # The posts stay pending until the next run
+        return 0
+
+    sentiment_scores = dict(zip([forum_post.id for forum_post in unscored_forum_posts], sentiment_scores))
+    named_entities_of_posts = dict(zip([forum_post.id for forum_post in unextracted_forum_posts], named_entities_of_posts))
+    for forum_post in pending_forum_posts:
+        _apply_forum_post_analysis(
+            forum_post.id,
+            sentiment_scores.get(forum_post.id),
+            named_entities_of_posts.get(forum_post.id)
+        )
+
+    return len(pending_forum_posts)
+
+
+def request_forum_post_sentiment_processing():
+    transaction.on_commit(lambda: run_job_now(FORUM_POST_SENTIMENT_PIPELINE_JOB_ID))
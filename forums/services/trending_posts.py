@@ -1,5 +1,78 @@
-from ..models import Forum, ForumPostSerializer
+from ..models import ForumPost, ForumPostFeedSerializer, ForumWordCount, TrendingPost
 from communalspace.exceptions import InvalidRequestException
+from communalspace.settings import (
+    FORUM_TOP_WORDS_LIMIT,
+    TRENDING_POSTS_DECAY_SECONDS,
+    TRENDING_POSTS_SIZE,
+    TRENDING_POSTS_VOTE_THRESHOLD
+)
+from django.db import models, transaction
+from django.db.models.functions import Extract, Greatest, Log
+import math
+
+TRENDING_POSTS_REBUILD_JOB_ID = 'trending_posts_rebuild'
+
+
+def compute_trending_score(vote_count, posted_at):
+    """
+    Time-decayed score of a post: every tenfold increase of the votes is worth
+    TRENDING_POSTS_DECAY_SECONDS of recency. As the recency term only depends
+    on the posting time, scores never have to be recomputed as time passes.
+    """
+    return math.log10(max(vote_count, 1)) + posted_at.timestamp() / TRENDING_POSTS_DECAY_SECONDS
+
+
+def _trending_score_expression():
+    return (Log(10, Greatest(models.F('vote_count'), 1, output_field=models.FloatField())) +
+            Extract('posted_at', 'epoch') / models.Value(float(TRENDING_POSTS_DECAY_SECONDS)))
+
+
+def _trim_trending_posts():
+    lowest_post_ids = list(TrendingPost.objects.order_by('-score').values_list('post_id', flat=True)[TRENDING_POSTS_SIZE:])
+    if len(lowest_post_ids) > 0:
+        TrendingPost.objects.filter(post_id__in=lowest_post_ids).delete()
+
+
+def update_trending_post(post: ForumPost):
+    """
+    Incrementally refresh the trending posts after the votes of a post changed.
+    """
+    if post.vote_count < TRENDING_POSTS_VOTE_THRESHOLD:
+        TrendingPost.objects.filter(post=post).delete()
+        return
+
+    score = compute_trending_score(post.vote_count, post.posted_at)
+    lowest_score = (TrendingPost.objects
+                    .order_by('-score')
+                    .values_list('score', flat=True)[TRENDING_POSTS_SIZE - 1:TRENDING_POSTS_SIZE]
+                    .first())
+
+    if lowest_score is not None and score < lowest_score:
+        TrendingPost.objects.filter(post=post).delete()
+        return
+
+    TrendingPost.objects.bulk_create(
+        [TrendingPost(post=post, score=score)],
+        update_conflicts=True,
+        unique_fields=['post'],
+        update_fields=['score']
+    )
+    _trim_trending_posts()
+
+
+@transaction.atomic()
+def rebuild_trending_posts():
+    """
+    Recompute the trending posts from all posts with enough votes.
+    """
+    top_posts = (ForumPost.objects
+                 .filter(vote_count__gte=TRENDING_POSTS_VOTE_THRESHOLD)
+                 .annotate(trending_score=_trending_score_expression())
+                 .order_by('-trending_score')
+                 .values_list('id', 'trending_score')[:TRENDING_POSTS_SIZE])
+
+    TrendingPost.objects.all().delete()
+    TrendingPost.objects.bulk_create([TrendingPost(post_id=post_id, score=score) for post_id, score in top_posts])
 
 
 def find_trending_posts(request_data):
@@ -9,21 +82,32 @@ def find_trending_posts(request_data):
         except:
             raise InvalidRequestException("'threshold' is not a valid integer")
 
-    threshold = int(request_data.get("threshold")) if request_data.get("threshold") is not None else 20
+    # The table only keeps the posts with at least TRENDING_POSTS_VOTE_THRESHOLD votes,
+    # so lower thresholds return the same posts as the default one
+    threshold = (int(request_data.get("threshold")) if request_data.get("threshold") is not None
+                 else TRENDING_POSTS_VOTE_THRESHOLD)
+
+    trending_posts = (TrendingPost.objects
+                      .filter(post__vote_count__gte=threshold)
+                      .select_related('post__author', 'post__forum__event__location')
+                      .order_by('-score'))
 
-    all_forums = Forum.objects.all()
-    trending_posts = []
+    posts_of_forums = {}
+    for trending_post in trending_posts:
+        posts_of_forums.setdefault(trending_post.post.forum, []).append(trending_post.post)
 
-    for forum in all_forums:
-        posts = ForumPostSerializer(forum.forumpost_set.filter(vote_count__gte=threshold), many=True).data
-        if len(posts) > 0:
-            trending_posts.append({
-                'event_id': forum.event.get_id(),
-                'event_name': forum.event.get_name(),
-                'event_location_id': forum.event.location.id,
-                'event_location_name': forum.event.get_location_name(),
-                'forum_top_words': forum.get_forum_top_words(),
-                'forum_trending_posts': posts
-            })
+    top_words_of_forums = ForumWordCount.objects.get_top_words_of_forums(
+        [forum.id for forum in posts_of_forums],
+        FORUM_TOP_WORDS_LIMIT
+    )
 
-    return trending_posts
+    return [
+        {
+            'event_id': forum.event.get_id(),
+            'event_name': forum.event.get_name(),
+            'event_location_id': forum.event.location.id,
+            'event_location_name': forum.event.get_location_name(),
+            'forum_top_words': top_words_of_forums[forum.id],
+            'forum_trending_posts': ForumPostFeedSerializer(posts, many=True).data
+        } for forum, posts in posts_of_forums.items()
+    ]
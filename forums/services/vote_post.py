@@ -1,40 +1,30 @@
-from forums.models import ForumPost
+from django.db import models
+from forums import signals
+from forums.models import ForumPost, ForumPostVote
 from users.models import User
+from . import trending_posts
 
+UPVOTE = 1
+DOWNVOTE = -1
 
-def upvote_post(post_id, user_id):
-    post = ForumPost.objects.get(pk=post_id)
-    user = User.objects.get(pk=user_id)
-
-    if user in post.upvoters.all():
-        post.vote_count -= 1
-        post.upvoters.remove(user)
-    elif user in post.downvoters.all():
-        post.vote_count += 2
-        post.downvoters.remove(user)
-        post.upvoters.add(user)
-    else:
-        post.vote_count += 1
-        post.upvoters.add(user)
 
-    post.save()
-    return post
+def _vote_post(post_id, user: User, value):
+    """
+    Toggle the vote of the user on the post, returning the post with
+    its new vote count and the new vote of the user.
+    """
+    post = ForumPost.objects.get(pk=post_id)
+    vote_value, vote_count_delta = ForumPostVote.objects.toggle_vote(post.id, user.get_user_id(), value)
+    ForumPost.objects.filter(id=post.id).update(vote_count=models.F('vote_count') + vote_count_delta)
+    post.refresh_from_db(fields=['vote_count'])
+    trending_posts.update_trending_post(post)
+    signals.post_vote_count_changed.send(sender=ForumPost, post=post)
+    return post, vote_value
 
 
-def downvote_post(post_id, user_id):
-    post = ForumPost.objects.get(pk=post_id)
-    user = User.objects.get(pk=user_id)
+def upvote_post(post_id, user: User):
+    return _vote_post(post_id, user, UPVOTE)
 
-    if user in post.downvoters.all():
-        post.vote_count += 1
-        post.downvoters.remove(user)
-    elif user in post.upvoters.all():
-        post.vote_count -= 2
-        post.upvoters.remove(user)
-        post.downvoters.add(user)
-    else:
-        post.vote_count -= 1
-        post.downvoters.add(user)
 
-    post.save()
-    return post
+def downvote_post(post_id, user: User):
+    return _vote_post(post_id, user, DOWNVOTE)
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from event.models import Event, Initiative, Project
+from .models import ForumPost
+from .services import forum_stream
+from .services.forum_access import PARTICIPATION_ROLES, forum_access_resolver
+
+# Sent with the post whose vote count has been updated
+post_vote_count_changed = Signal()
+
+
+def invalidate_participant_forum_access(sender, instance, **kwargs):
+    user_id, event_id = instance.participant_id, instance.event_id
+    transaction.on_commit(lambda: forum_access_resolver.invalidate(user_id, event_id))
+
+
+def invalidate_event_forum_access(sender, instance, **kwargs):
+    event_id = instance.get_id()
+    transaction.on_commit(lambda: forum_access_resolver.invalidate_event(event_id))
+
+
+# Model signals are sent with the concrete class of the saved instance
+for _, participation_model in PARTICIPATION_ROLES:
+    post_save.connect(invalidate_participant_forum_access, sender=participation_model)
+    post_delete.connect(invalidate_participant_forum_access, sender=participation_model)
+
+for event_model in (Event, Initiative, Project):
+    post_save.connect(invalidate_event_forum_access, sender=event_model)
+    post_delete.connect(invalidate_event_forum_access, sender=event_model)
+
+
+@receiver(post_save, sender=ForumPost)
+def notify_created_post(sender, instance, created, **kwargs):
+    if created:
+        forum_stream.notify_created_post(instance)
+
+
+@receiver(post_vote_count_changed)
+def notify_post_vote_count(sender, post, **kwargs):
+    forum_stream.notify_post_vote_count(post)
@@ -1,3 +1,555 @@
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from communalspace import inference
+from communalspace.exceptions import InferenceRequestRejectedException
+from communalspace.settings import SENTIMENT_ANALYSIS_ENDPOINT
+from communalspace.testing import create_initiative, create_project
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from review.services.sentiment import NEUTRAL_SENTIMENT_SCORE
+from unittest import mock
+from users.models import User
+from users.services.user_cache import user_cache
+from .models import Forum, ForumPost, ForumPostFeedSerializer, ForumPostVote, ForumWordCount
+from .services import (
+    forum_feed,
+    forum_stream,
+    keyword_extraction,
+    range_find_post,
+    sentiment_pipeline,
+    trending_posts,
+    vote_post
+)
+from .services.forum_access import forum_access_resolver
+from .views import stream_forum_updates, upvote_forum_post
+import asyncio
+import datetime
+import threading
 
-# Create your tests here.
+
+class ForumAccessResolverTest(TestCase):
+    def setUp(self):
+        self.initiative = create_initiative()
+        self.user = User.objects.create_user(user_id='participant')
+        forum_access_resolver.clear()
+        self.addCleanup(forum_access_resolver.clear)
+
+    def _can_use_forum(self):
+        return forum_access_resolver.resolve(self.user, self.initiative.get_id()).can_use_forum()
+
+    def test_denials_are_not_cached(self):
+        self.assertFalse(self._can_use_forum())
+
+        # The on-commit invalidation is not run, as if the user had joined through another process
+        self.initiative.add_participant(self.user)
+        self.assertTrue(self._can_use_forum())
+
+    def test_cached_access_is_invalidated_by_the_participation_signals(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            participation = self.initiative.add_participant(self.user)
+
+        self.assertTrue(self._can_use_forum())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            participation.has_left_forum = True
+            participation.save()
+
+        self.assertFalse(self._can_use_forum())
+
+    def test_cached_access_is_invalidated_by_the_event_signals(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.initiative.add_participant(self.user)
+
+        self.assertTrue(self._can_use_forum())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.initiative.delete()
+
+        self.assertIsNone(forum_access_resolver.resolve(self.user, self.initiative.get_id()))
+
+
+class ForumPostSentimentPipelineTest(TestCase):
+    def setUp(self):
+        self.forum = Forum.objects.get(event=create_initiative())
+        self.author = User.objects.create_user(user_id='author')
+
+        self.addCleanup(inference.set_inference_backend, inference.get_inference_backend())
+        inference.set_inference_backend(inference.StubInferenceBackend(self._reject_the_rejected_post))
+        self.addCleanup(keyword_extraction.set_top_words_backend, keyword_extraction.get_top_words_backend())
+        keyword_extraction.set_top_words_backend(keyword_extraction.NamedEntityRecognitionBackend())
+
+    def _reject_the_rejected_post(self, endpoint, inputs):
+        if 'Rejected post' in inputs:
+            raise InferenceRequestRejectedException('Input is too long')
+
+        if endpoint == SENTIMENT_ANALYSIS_ENDPOINT:
+            return [[{'label': 'positive', 'score': 1.0}] for _ in inputs]
+
+        return [[{'entity_group': 'MISC', 'word': 'Park'}] for _ in inputs]
+
+    def _create_post(self, content):
+        return ForumPost.objects.create(forum=self.forum, author=self.author, content=content,
+                                        named_entities_pending=True)
+
+    def test_rejected_posts_are_analyzed_without_blocking_the_others(self):
+        rejected_post = self._create_post('Rejected post')
+        post = self._create_post('Great Park')
+
+        self.assertEqual(sentiment_pipeline.process_pending_forum_post_sentiments(), 2)
+        rejected_post.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual(rejected_post.sentiment_score, NEUTRAL_SENTIMENT_SCORE)
+        self.assertFalse(rejected_post.named_entities_pending)
+        self.assertEqual(post.sentiment_score, 1.0)
+        self.assertFalse(post.named_entities_pending)
+        self.assertEqual(sentiment_pipeline.process_pending_forum_post_sentiments(), 0)
+
+
+class ForumPostVoteTest(TestCase):
+    def setUp(self):
+        self.initiative = create_initiative()
+        self.voter = User.objects.create_user(user_id='voter')
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.post = ForumPost.objects.create(forum=Forum.objects.get(event=self.initiative),
+                                             author=User.objects.create_user(user_id='author'), content='Hello')
+
+    def _get_vote(self):
+        return ForumPostVote.objects.get(post=self.post, user=self.voter)
+
+    def _get_vote_count(self):
+        return ForumPost.objects.get(pk=self.post.pk).vote_count
+
+    def test_new_vote_is_inserted(self):
+        self.assertEqual(ForumPostVote.objects.toggle_vote(self.post.id, self.voter.user_id, vote_post.UPVOTE), (1, 1))
+
+        vote = self._get_vote()
+        self.assertEqual((vote.value, vote.previous_value), (1, 0))
+
+    def test_casting_the_same_vote_twice_retracts_it(self):
+        vote_post.upvote_post(self.post.id, self.voter)
+        post, vote_value = vote_post.upvote_post(self.post.id, self.voter)
+
+        vote = self._get_vote()
+        self.assertEqual((vote.value, vote.previous_value), (0, 1))
+        self.assertEqual(vote_value, 0)
+        self.assertEqual(post.vote_count, 0)
+        self.assertEqual(self._get_vote_count(), 0)
+
+    def test_casting_the_opposite_vote_replaces_it(self):
+        vote_post.upvote_post(self.post.id, self.voter)
+        self.assertEqual(ForumPostVote.objects.toggle_vote(self.post.id, self.voter.user_id, vote_post.DOWNVOTE),
+                         (-1, -2))
+
+        vote = self._get_vote()
+        self.assertEqual((vote.value, vote.previous_value), (-1, 1))
+
+    def test_votes_of_several_users_add_up(self):
+        vote_post.upvote_post(self.post.id, self.voter)
+        vote_post.downvote_post(self.post.id, self.voter)
+        post, _ = vote_post.upvote_post(self.post.id, User.objects.create_user(user_id='other-voter'))
+
+        self.assertEqual(post.vote_count, 0)
+        self.assertEqual(self._get_vote_count(), 0)
+
+    def test_vote_responses_include_the_vote_of_the_user_instead_of_the_voters(self):
+        self.initiative.add_participant(self.voter)
+        for index in range(10):
+            vote_post.upvote_post(self.post.id, User.objects.create_user(user_id=f'other-voter-{index}'))
+
+        request = RequestFactory().post(f'/forums/{self.initiative.get_id()}/upvote/',
+                                        data={'post_id': str(self.post.id)}, content_type='application/json',
+                                        HTTP_AUTHORIZATION='Bearer voter')
+        with mock.patch('communalspace.decorators.verified_id_token_cache.verify_id_token',
+                        side_effect=lambda id_token: {'user_id': id_token}):
+            response = upvote_forum_post(request, str(self.initiative.get_id()))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['vote_count'], 11)
+        self.assertEqual(response.data['my_vote'], 1)
+        self.assertNotIn('upvoters', response.data)
+
+
+@mock.patch.object(trending_posts, 'TRENDING_POSTS_SIZE', 2)
+class TrendingPostsTest(TestCase):
+    def setUp(self):
+        self.initiative = create_initiative()
+        self.forum = Forum.objects.get(event=self.initiative)
+        self.author = User.objects.create_user(user_id='author')
+
+    def _create_post(self, vote_count, age):
+        post = ForumPost.objects.create(forum=self.forum, author=self.author, content='Hello', vote_count=vote_count)
+        ForumPost.objects.filter(pk=post.pk).update(posted_at=timezone.now() - age)
+        return ForumPost.objects.get(pk=post.pk)
+
+    def _find_trending_post_ids(self, request_data):
+        return [
+            post['id']
+            for forum_posts in trending_posts.find_trending_posts(request_data)
+            for post in forum_posts['forum_trending_posts']
+        ]
+
+    def test_posts_above_the_threshold_trend_over_more_recent_posts_with_fewer_votes(self):
+        popular_post = self._create_post(25, datetime.timedelta(days=3))
+        for _ in range(3):
+            self._create_post(2, datetime.timedelta(minutes=5))
+
+        trending_posts.rebuild_trending_posts()
+
+        self.assertEqual(self._find_trending_post_ids({}), [str(popular_post.id)])
+        self.assertEqual(self._find_trending_post_ids({'threshold': '30'}), [])
+
+    def test_votes_reaching_the_threshold_make_a_post_trend(self):
+        post = self._create_post(trending_posts.TRENDING_POSTS_VOTE_THRESHOLD - 1, datetime.timedelta(days=1))
+        trending_posts.update_trending_post(post)
+        self.assertEqual(self._find_trending_post_ids({}), [])
+
+        post, _ = vote_post.upvote_post(post.id, User.objects.create_user(user_id='voter'))
+        self.assertEqual(self._find_trending_post_ids({}), [str(post.id)])
+
+
+class KeywordExtractionTest(SimpleTestCase):
+    def _extract_keywords(self, text):
+        return [
+            (entity['entity_group'], entity['word'])
+            for entity in keyword_extraction.extract_keywords_from_text(text)
+        ]
+
+    def test_keywords_of_a_fixed_corpus(self):
+        keywords = self._extract_keywords(
+            'Volunteers from Jakarta Green Team cleaned the river bank. The river bank was full of plastic waste!'
+        )
+
+        self.assertEqual(keywords, [
+            ('MISC', 'Jakarta Green Team'),
+            ('KEYWORD', 'volunteers'),
+            ('KEYWORD', 'cleaned'),
+            ('KEYWORD', 'river bank'),
+            ('KEYWORD', 'river bank'),
+            ('KEYWORD', 'full'),
+            ('KEYWORD', 'plastic'),
+            ('KEYWORD', 'waste'),
+        ])
+
+    def test_indonesian_stop_words_are_filtered(self):
+        self.assertEqual(self._extract_keywords('Kami membersihkan sungai di Taman Suropati'), [
+            ('MISC', 'Taman Suropati'),
+            ('KEYWORD', 'membersihkan'),
+            ('KEYWORD', 'sungai'),
+        ])
+
+    def test_capitalized_first_word_of_a_sentence_is_not_an_entity(self):
+        self.assertEqual(self._extract_keywords('Great event'), [('KEYWORD', 'great'), ('KEYWORD', 'event')])
+
+    def test_empty_texts_have_no_keywords(self):
+        self.assertEqual(self._extract_keywords(None), [])
+        self.assertEqual(self._extract_keywords('It is 2 of us.'), [])
+
+
+class ForumTopWordsTest(TestCase):
+    def setUp(self):
+        self.forum = Forum.objects.get(event=create_initiative(name='Park Cleanup'))
+        self.other_forum = Forum.objects.get(event=create_initiative(name='River Cleanup'))
+
+    def test_increments_of_the_same_word_are_accumulated(self):
+        ForumWordCount.objects.increment_counts(self.forum.id, {('KEYWORD', 'river'): 2, ('MISC', 'Jakarta'): 1})
+        ForumWordCount.objects.increment_counts(self.forum.id, {('KEYWORD', 'river'): 3})
+        ForumWordCount.objects.increment_counts(self.other_forum.id, {('KEYWORD', 'river'): 1})
+        ForumWordCount.objects.increment_counts(self.forum.id, {})
+
+        self.assertEqual(ForumWordCount.objects.get(forum=self.forum, word='river').count, 5)
+        self.assertEqual(ForumWordCount.objects.get(forum=self.forum, word='Jakarta').count, 1)
+        self.assertEqual(ForumWordCount.objects.get(forum=self.other_forum, word='river').count, 1)
+
+    def test_top_words_of_the_forum_are_lowercased_and_ranked_by_count(self):
+        self.forum.update_forum_top_words([
+            {'entity_group': 'KEYWORD', 'word': 'River'},
+            {'entity_group': 'KEYWORD', 'word': 'river'},
+            {'entity_group': 'KEYWORD', 'word': 'waste'},
+            {'entity_group': 'KEYWORD', 'word': 'bank'},
+            {'entity_group': 'MISC', 'word': 'Jakarta'},
+        ])
+
+        self.assertEqual(self.forum.get_forum_top_words(limit=3), {
+            'KEYWORD': [{'word': 'river', 'count': 2}, {'word': 'bank', 'count': 1}],
+            'MISC': [{'word': 'jakarta', 'count': 1}],
+        })
+
+    def test_top_words_are_ranked_and_limited_per_forum(self):
+        ForumWordCount.objects.increment_counts(self.forum.id, {
+            ('KEYWORD', 'river'): 3, ('KEYWORD', 'waste'): 2, ('KEYWORD', 'bank'): 2, ('MISC', 'jakarta'): 1
+        })
+        ForumWordCount.objects.increment_counts(self.other_forum.id, {('KEYWORD', 'plastic'): 1})
+        forum_without_words = Forum.objects.get(event=create_initiative(name='Tree Planting'))
+
+        top_words = ForumWordCount.objects.get_top_words_of_forums(
+            [self.forum.id, self.other_forum.id, forum_without_words.id], 3
+        )
+
+        self.assertEqual(top_words, {
+            self.forum.id: {'KEYWORD': [
+                {'word': 'river', 'count': 3}, {'word': 'bank', 'count': 2}, {'word': 'waste', 'count': 2}
+            ]},
+            self.other_forum.id: {'KEYWORD': [{'word': 'plastic', 'count': 1}]},
+            forum_without_words.id: {},
+        })
+
+
+FEED_START = datetime.datetime(2026, 1, 1, 12, tzinfo=datetime.timezone.utc)
+
+
+class ForumFeedTest(TestCase):
+    def setUp(self):
+        self.initiative = create_initiative()
+        self.forum = Forum.objects.get(event=self.initiative)
+        self.creator = self.initiative.get_creator()
+        forum_access_resolver.clear()
+        self.addCleanup(forum_access_resolver.clear)
+
+    def _create_post(self, hours_since_feed_start):
+        post = ForumPost.objects.create(forum=self.forum, author=self.creator, content='Hello')
+        posted_at = FEED_START + datetime.timedelta(hours=hours_since_feed_start)
+        ForumPost.objects.filter(pk=post.pk).update(posted_at=posted_at)
+        return ForumPost.objects.get(pk=post.pk)
+
+    def _get_post_ids_by_page(self, get_page):
+        pages = []
+        cursor = None
+        while True:
+            page = get_page(cursor)
+            pages.append([post.id for post in page.object_list])
+            cursor = page.next_cursor
+            if cursor is None:
+                return pages
+
+    def test_posts_are_paged_newest_first_with_ties_broken_by_id(self):
+        posts = [self._create_post(hours) for hours in [0, 1, 1, 2, 3]]
+        expected_post_ids = [post.id for post in sorted(posts, key=lambda post: (post.posted_at, post.id),
+                                                        reverse=True)]
+
+        pages = self._get_post_ids_by_page(lambda cursor: forum_feed.get_forum_posts_page(self.forum, 2, cursor))
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual([post_id for page in pages for post_id in page], expected_post_ids)
+
+    def test_previous_cursor_returns_the_previous_page(self):
+        for hours in [0, 1, 1, 2, 3]:
+            self._create_post(hours)
+
+        first_page = forum_feed.get_forum_posts_page(self.forum, 2, None)
+        second_page = forum_feed.get_forum_posts_page(self.forum, 2, first_page.next_cursor)
+        previous_page = forum_feed.get_forum_posts_page(self.forum, 2, second_page.previous_cursor)
+
+        self.assertIsNone(first_page.previous_cursor)
+        self.assertEqual(previous_page.object_list, first_page.object_list)
+
+    def test_empty_forums_have_a_single_empty_page(self):
+        page = forum_feed.get_forum_posts_page(self.forum, 2, None)
+
+        self.assertEqual((page.object_list, page.next_cursor, page.previous_cursor), ([], None, None))
+
+    def test_range_bounds_are_exclusive(self):
+        posts = [self._create_post(hours) for hours in range(5)]
+
+        page = range_find_post.find_post_in_range(
+            {'after': '2026-01-01T13:00:00Z', 'before': '2026-01-01T15:00:00Z'},
+            self.creator,
+            str(self.initiative.get_id())
+        )
+
+        self.assertEqual(page.object_list, [posts[2]])
+
+    def test_range_pages_stay_within_the_bounds(self):
+        posts = [self._create_post(hours) for hours in [0, 1, 1, 2, 3, 4]]
+        request_data = {'after': '2026-01-01T12:00:00Z', 'before': '2026-01-01T16:00:00Z', 'limit': '2'}
+
+        pages = self._get_post_ids_by_page(lambda cursor: range_find_post.find_post_in_range(
+            {**request_data, 'cursor': cursor}, self.creator, str(self.initiative.get_id())
+        ))
+
+        self.assertEqual(sorted(post_id for page in pages for post_id in page),
+                         sorted(post.id for post in posts[1:5]))
+
+    def test_feed_serializer_includes_the_vote_of_the_user_on_every_post(self):
+        upvoted_post, downvoted_post, post = [self._create_post(hours) for hours in range(3)]
+        ForumPostVote.objects.toggle_vote(upvoted_post.id, self.creator.user_id, vote_post.UPVOTE)
+        ForumPostVote.objects.toggle_vote(downvoted_post.id, self.creator.user_id, vote_post.DOWNVOTE)
+
+        serializer = ForumPostFeedSerializer([upvoted_post, downvoted_post, post], many=True,
+                                             context={'user': self.creator})
+
+        self.assertEqual([serialized_post['my_vote'] for serialized_post in serializer.data], [1, -1, 0])
+        self.assertNotIn('votes_of_user', serializer.context)
+
+
+class ForumActivityFeedTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(user_id='member')
+        self.author = User.objects.create_user(user_id='author')
+
+    def _get_forum(self, event):
+        return Forum.objects.get(event=event)
+
+    def _create_post(self, event, hours_since_feed_start):
+        post = ForumPost.objects.create(forum=self._get_forum(event), author=self.author, content='Hello')
+        posted_at = FEED_START + datetime.timedelta(hours=hours_since_feed_start)
+        ForumPost.objects.filter(pk=post.pk).update(posted_at=posted_at)
+        return ForumPost.objects.get(pk=post.pk)
+
+    def test_feed_pages_through_the_posts_of_the_accessible_forums_newest_first(self):
+        created_initiative = create_initiative(name='Created', creator=self.user)
+        participated_initiative = create_initiative(name='Participated')
+        participated_initiative.add_participant(self.user)
+        contributed_project = create_project(name='Contributed')
+        contributed_project.add_participant(self.user)
+        left_initiative = create_initiative(name='Left')
+        left_initiative.add_participant(self.user).set_has_left_forum(True)
+        other_initiative = create_initiative(name='Other')
+
+        accessible_posts = [
+            self._create_post(created_initiative, 0),
+            self._create_post(participated_initiative, 1),
+            self._create_post(contributed_project, 1),
+            self._create_post(participated_initiative, 3),
+            self._create_post(created_initiative, 4),
+        ]
+        self._create_post(left_initiative, 2)
+        self._create_post(other_initiative, 5)
+        expected_posts = [
+            (post.id, post.forum.event.get_name())
+            for post in sorted(accessible_posts, key=lambda post: (post.posted_at, post.id), reverse=True)
+        ]
+
+        pages = []
+        cursor = None
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                page = forum_feed.get_forum_activity_feed_page(self.user, 2, cursor)
+                pages.append([(post.id, post.forum.event.get_name()) for post in page.object_list])
+
+            self.assertEqual(len(queries), 1)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual([post for page in pages for post in page], expected_posts)
+
+    def test_users_without_forums_have_an_empty_feed(self):
+        self._create_post(create_initiative(), 0)
+
+        page = forum_feed.get_forum_activity_feed_page(self.user, 2, None)
+
+        self.assertEqual((page.object_list, page.next_cursor), ([], None))
+
+
+class ForumEventBrokerTest(SimpleTestCase):
+    def setUp(self):
+        self.broker = forum_stream.ForumEventBroker(queue_size=2)
+
+    def _create_event(self, post_id):
+        return forum_stream.ForumStreamEvent(forum_stream.VOTE_EVENT, {'id': post_id, 'vote_count': 1})
+
+    async def test_events_are_delivered_to_the_subscribers_of_their_forum(self):
+        subscription = self.broker.subscribe('forum')
+        other_forum_subscription = self.broker.subscribe('other-forum')
+
+        # Published from the listening thread
+        publishing_thread = threading.Thread(target=self.broker.publish, args=('forum', self._create_event('post')))
+        publishing_thread.start()
+        publishing_thread.join()
+
+        event = await subscription.get(timeout=1)
+        self.assertEqual(event.data['id'], 'post')
+        self.assertIsNone(await other_forum_subscription.get(timeout=0.01))
+
+    async def test_unsubscribed_streams_receive_no_events(self):
+        subscription = self.broker.subscribe('forum')
+        self.broker.unsubscribe(subscription)
+
+        self.assertFalse(self.broker.has_subscribers('forum'))
+        self.broker.publish('forum', self._create_event('post'))
+        self.assertIsNone(await subscription.get(timeout=0.01))
+
+    async def test_subscriptions_falling_behind_are_interrupted(self):
+        subscription = self.broker.subscribe('forum')
+        for index in range(3):
+            self.broker.publish('forum', self._create_event(f'post-{index}'))
+
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.is_interrupted)
+
+    async def test_all_subscriptions_are_interrupted_when_events_may_have_been_missed(self):
+        subscriptions = [self.broker.subscribe('forum'), self.broker.subscribe('other-forum')]
+        self.broker.interrupt_all()
+
+        await asyncio.sleep(0)
+        self.assertTrue(all(subscription.is_interrupted for subscription in subscriptions))
+
+
+class ForumStreamTest(TransactionTestCase):
+    """
+    The database work of the stream runs in other threads, so the data is committed.
+    """
+    def setUp(self):
+        self.initiative = create_initiative()
+        self.member = User.objects.create_user(user_id='member')
+        self.initiative.add_participant(self.member)
+        User.objects.create_user(user_id='non-member')
+        forum_access_resolver.clear()
+        self.addCleanup(forum_access_resolver.clear)
+
+        verify_id_token = mock.patch(
+            'communalspace.decorators.verified_id_token_cache.verify_id_token',
+            side_effect=lambda id_token: {'user_id': id_token}
+        )
+        verify_id_token.start()
+        self.addCleanup(verify_id_token.stop)
+
+        # Runs the database work in the thread of the test, to not leave connections open in the thread pool
+        run_in_database_thread = mock.patch.object(forum_stream, 'run_in_database_thread', sync_to_async)
+        run_in_database_thread.start()
+        self.addCleanup(run_in_database_thread.stop)
+        self.addCleanup(forum_stream.forum_event_listener.stop)
+
+    async def _open_stream(self, **headers):
+        request = RequestFactory().get(f'/forums/{self.initiative.get_id()}/stream/', **headers)
+        return await stream_forum_updates(request, str(self.initiative.get_id()))
+
+    async def _read_until(self, streaming_content, text):
+        content = b''
+        while text.encode('utf-8') not in content:
+            content += await asyncio.wait_for(streaming_content.__anext__(), timeout=5)
+
+        return content.decode('utf-8')
+
+    async def _read_to_end(self, streaming_content):
+        async for _ in streaming_content:
+            pass
+
+    async def test_streams_require_authentication(self):
+        response = await self._open_stream()
+        self.assertEqual(response.status_code, 401)
+
+    async def test_streams_are_restricted_to_the_members_of_the_event(self):
+        response = await self._open_stream(HTTP_AUTHORIZATION='Bearer non-member')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(forum_stream.forum_event_broker.get_subscriber_count(), 0)
+
+    async def test_posts_created_by_any_process_are_streamed_to_members(self):
+        response = await self._open_stream(HTTP_AUTHORIZATION='Bearer member')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        streaming_content = response.streaming_content
+        await self._read_until(streaming_content, ': heartbeat')
+
+        forum = await sync_to_async(Forum.objects.get)(event=self.initiative)
+        post = await sync_to_async(ForumPost.objects.create)(forum=forum, author=self.member, content='Hello')
+        content = await self._read_until(streaming_content, str(post.id))
+        self.assertIn('event: post', content)
+
+        forum_stream.forum_event_broker.interrupt_all()
+        await asyncio.wait_for(self._read_to_end(streaming_content), timeout=5)
+        self.assertFalse(forum_stream.forum_event_broker.has_subscribers(forum.id))
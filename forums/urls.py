@@ -1,10 +1,12 @@
 from django.urls import path
 from .views import (
-    serve_create_forum_post, upvote_forum_post, downvote_forum_post, get_forum_posts_by_event, get_forum_posts_by_event_and_range, serve_get_forum_analytics, server_get_global_forum_posts
+    serve_create_forum_post, upvote_forum_post, downvote_forum_post, get_forum_posts_by_event, get_forum_posts_by_event_and_range, serve_get_forum_analytics, server_get_global_forum_posts,
+    get_forum_activity_feed
 )
 
 
 urlpatterns = [
+    path('feed/', get_forum_activity_feed),
     path('<str:event_id>/post/', serve_create_forum_post),
     path('<str:event_id>/upvote/', upvote_forum_post),
     path('<str:event_id>/downvote/', downvote_forum_post),
@@ -1,10 +1,13 @@
 from django.views.decorators.http import require_POST, require_GET
 from django.db import transaction
-from communalspace.decorators import firebase_authenticated
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from communalspace.decorators import authenticate_request, firebase_authenticated
+from communalspace.exceptions import InvalidRequestException, RestrictedAccessException, UnauthorizedException
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .models import ForumPostSerializer, Forum
-from .services import create_post
+from communalspace.serializers import CursorPaginatorSerializer
+from .models import Forum, ForumActivityFeedSerializer, ForumPostFeedSerializer, ForumPostSerializer
+from .services import create_post, forum_feed, forum_stream
 import json
 
 from .services.forum_auth import check_authorization
@@ -35,6 +38,11 @@ def serve_create_forum_post(request, event_id):
     return Response(data=response_data)
 
 
+def _serialize_voted_post(post, vote_value):
+    # Only the vote of the user is returned, as listing every voter takes a query over all the votes
+    return ForumPostFeedSerializer(post, context={'votes_of_user': {post.id: vote_value}}).data
+
+
 @require_POST
 @api_view(['POST'])
 @firebase_authenticated()
@@ -55,8 +63,8 @@ def upvote_forum_post(request, event_id):
         return Response({"error": "User not authorized to upvote post"}, status=403)
 
     else:
-        updated_post = upvote_post(request_data.get('post_id'), user_id)
-        response_data = ForumPostSerializer(updated_post).data
+        updated_post, vote_value = upvote_post(request_data.get('post_id'), user_id)
+        response_data = _serialize_voted_post(updated_post, vote_value)
         return Response(data=response_data)
 
 
@@ -79,8 +87,8 @@ def downvote_forum_post(request, event_id):
     if not check_authorization(user_id, event_id):
         return Response({"error": "User not authorized to downvote post"}, status=403)
     else:
-        updated_post = downvote_post(request_data.get('post_id'), user_id)
-        response_data = ForumPostSerializer(updated_post).data
+        updated_post, vote_value = downvote_post(request_data.get('post_id'), user_id)
+        response_data = _serialize_voted_post(updated_post, vote_value)
         return Response(data=response_data)
 
 
@@ -90,22 +98,39 @@ def downvote_forum_post(request, event_id):
 @transaction.atomic()
 def get_forum_posts_by_event(request, event_id):
     """
-    This view serves as the endpoint to get all forum posts for an event.
+    This view serves as the endpoint to get the forum posts of an event, newest first.
     ----------------------------------------------------------
     request-data must contain:
     event_id: UUID string
 
+    request-param may contain:
+    limit: integer (number of posts to be displayed in one fetch)
+    cursor: string (next/previous cursor of the previous fetch)
+
     * The user information will be taken from the firebase authentication.
     """
-    user_id = request.user
+    posts_page = forum_feed.handle_get_forum_posts_by_event(request.GET, request.user, event_id)
+    response_data = CursorPaginatorSerializer(posts_page, ForumPostFeedSerializer, context={'user': request.user}).data
+    return Response(data=response_data)
 
-    if not check_authorization(user_id, event_id):
-        return Response({"error": "User not authorized to view forum"}, status=403)
-    else:
-        forum = Forum.objects.get(event_id=event_id)
-        posts = forum.forumpost_set.all()
-        response_data = ForumPostSerializer(posts, many=True).data
-        return Response(data=response_data)
+
+@require_GET
+@api_view(['GET'])
+@firebase_authenticated()
+def get_forum_activity_feed(request):
+    """
+    This view serves as the endpoint to get the posts of all the forums
+    the user can access, newest first.
+    ----------------------------------------------------------
+    request-param may contain:
+    limit: integer (number of posts to be displayed in one fetch)
+    cursor: string (next/previous cursor of the previous fetch)
+
+    * The user information will be taken from the firebase authentication.
+    """
+    posts_page = forum_feed.handle_get_forum_activity_feed(request.GET, request.user)
+    response_data = CursorPaginatorSerializer(posts_page, ForumActivityFeedSerializer, context={'user': request.user}).data
+    return Response(data=response_data)
 
 
 @require_GET
@@ -113,16 +138,22 @@ def get_forum_posts_by_event(request, event_id):
 @firebase_authenticated()
 def get_forum_posts_by_event_and_range(request, event_id):
     """
-    This view serves as the endpoint to get all forum posts for an event
-    in a certain time range
+    This view serves as the endpoint to get the forum posts of an event
+    in a certain time range, newest first
     ----------------------------------------------------------
     request-data must contain:
     event_id: UUID string
 
+    request-param may contain:
+    before: ISO date string
+    after: ISO date string
+    limit: integer (number of posts to be displayed in one fetch)
+    cursor: string (next/previous cursor of the previous fetch)
+
     * The user information will be taken from the firebase authentication.
     """
-    posts = find_post_in_range(request.GET, request.user, event_id)
-    response_data = ForumPostSerializer(posts, many=True).data
+    posts_page = find_post_in_range(request.GET, request.user, event_id)
+    response_data = CursorPaginatorSerializer(posts_page, ForumPostFeedSerializer, context={'user': request.user}).data
     return Response(data=response_data)
 
 
@@ -138,3 +169,49 @@ def serve_get_forum_analytics(request, event_id):
 def server_get_global_forum_posts(request):
     posts = find_trending_posts(request.GET)
     return Response(data=posts)
+
+
+def _get_streamed_forum_id(request, event_id):
+    user = authenticate_request(request)
+    if not check_authorization(user, event_id):
+        raise RestrictedAccessException('user is not part of event with id ' + event_id)
+
+    forum, _ = Forum.objects.get_or_create(event_id=event_id)
+    return forum.id
+
+
+async def stream_forum_updates(request, event_id):
+    """
+    This view serves as the endpoint to stream the new posts and vote counts of the
+    forum of an event as server-sent events. It must be served by the ASGI application,
+    so that idle streams do not hold a worker thread.
+    ----------------------------------------------------------
+    request-data must contain:
+    event_id: UUID string
+
+    request-param may contain:
+    cursor: string (id of the last received event, also read from the Last-Event-ID header)
+
+    * The user information will be taken from the firebase authentication.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('cursor')
+    try:
+        forum_id = await forum_stream.run_in_database_thread(_get_streamed_forum_id)(request, event_id)
+        events = await forum_stream.open_forum_stream(forum_id, request.user, cursor)
+
+    except UnauthorizedException as exception:
+        return JsonResponse({'message': str(exception)}, status=401)
+
+    except RestrictedAccessException as exception:
+        return JsonResponse({'message': str(exception)}, status=403)
+
+    except InvalidRequestException as exception:
+        return JsonResponse({'message': str(exception)}, status=400)
+
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
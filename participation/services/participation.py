@@ -1,5 +1,6 @@
 from communalspace.decorators import catch_exception_and_convert_to_invalid_request_decorator
 from communalspace.exceptions import InvalidRequestException
+from communalspace.locks import acquire_transaction_lock
 from django.core.exceptions import ObjectDoesNotExist
 from event.services import utils as event_utils
 from participation.services.participation_helpers import (
@@ -38,9 +39,16 @@ def _validate_participation_registration(event, participant):
         )
 
 
+def _lock_user_participation(event, user):
+    # Serializes the registrations of the same user to the event only,
+    # the event counters are incremented without locking the event row
+    acquire_transaction_lock('event-participation', event.get_id(), user.get_user_id())
+
+
 @catch_exception_and_convert_to_invalid_request_decorator((ObjectDoesNotExist,))
 def handle_register_user_participation_to_initiative(request_data, user):
-    event = event_utils.get_initiative_by_id_or_raise_exception_thread_safe(request_data.get('event_id'))
+    event = event_utils.get_initiative_by_id_or_raise_exception(request_data.get('event_id'))
+    _lock_user_participation(event, user)
     validate_user_is_not_event_creator(event, user)
     _validate_initiative_is_accepting_participants(event)
     _validate_participation_registration(event, user)
@@ -49,7 +57,8 @@ def handle_register_user_participation_to_initiative(request_data, user):
 
 @catch_exception_and_convert_to_invalid_request_decorator((ObjectDoesNotExist,))
 def handle_register_user_volunteering_to_event(request_data, user):
-    event = event_utils.get_event_by_id_or_raise_exception_thread_safe(request_data.get('event_id'))
+    event = event_utils.get_event_by_id_or_raise_exception(request_data.get('event_id'))
+    _lock_user_participation(event, user)
     validate_user_is_not_event_creator(event, user)
     _validate_event_is_accepting_volunteers(event)
     _validate_participation_registration(event, user)
@@ -73,7 +82,8 @@ def handle_participant_volunteer_leave_events(request_data, user):
     3. If check in is null, delete participation object
     4. If check in is not null, set leave forum
     """
-    event = event_utils.get_event_by_id_or_raise_exception_thread_safe(request_data.get('event_id'))
+    event = event_utils.get_event_by_id_or_raise_exception(request_data.get('event_id'))
+    _lock_user_participation(event, user)
     participation = event.get_participation_by_participant(user)
 
     _validate_user_is_a_participant_or_volunteer(participation)
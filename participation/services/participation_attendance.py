@@ -4,6 +4,7 @@ from event.exceptions import InvalidCheckInCheckOutException
 from event.choices import ParticipationType
 from event.services import utils as event_utils
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from participation.services.participation_helpers import (
     validate_event_is_on_going,
     validate_user_is_inside_event_location,
@@ -12,7 +13,8 @@ from participation.services.participation_helpers import (
     validate_user_is_attending_event,
     check_out_user,
     validate_assisting_user_is_manager_of_event,
-    handle_reward_grant
+    grant_reward_if_eligible,
+    save_attendance_transition
 )
 from space.services import utils as space_utils
 from users.services import utils as user_utils
@@ -40,10 +42,13 @@ def handle_participation_self_check_in_confirmation(request_data, user):
     return check_in_user(user, initiative, user_participation)
 
 
+@transaction.atomic(savepoint=False)
 def self_check_out_participant(user, attendable_participation, user_latitude, user_longitude):
     check_out_data = attendable_participation.self_check_out(user_latitude, user_longitude)
     user.remove_currently_attended_event()
-    return handle_reward_grant(user, check_out_data, attendable_participation)
+    reward_and_check_out_data = grant_reward_if_eligible(user, check_out_data, attendable_participation)
+    save_attendance_transition(user, attendable_participation)
+    return reward_and_check_out_data
 
 
 @catch_exception_and_convert_to_invalid_request_decorator((
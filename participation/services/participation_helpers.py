@@ -1,8 +1,19 @@
 from communalspace.exceptions import InvalidRequestException, RestrictedAccessException
 from communalspace.settings import POINTS_PER_ATTENDANCE
-from event.choices import EventType
+from django.db import transaction
+from django.db.models import F, FloatField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Extract
+from django.utils import timezone
+from event.choices import AttendanceActivityType, EventType
 from event.exceptions import InvalidCheckInCheckOutException
-from event.models import AttendableEventParticipation
+from event.models import (
+    AttendableEventParticipation,
+    AttendanceActivity,
+    InitiativeParticipation,
+    VolunteerParticipation
+)
+from users.models import User
+from users.services.user_cache import user_cache
 
 
 def validate_user_is_not_event_creator(event, user):
@@ -42,20 +53,35 @@ def validate_assisting_user_is_manager_of_event(event, assisting_user):
         )
 
 
+def save_attendance_transition(user, attendable_participation):
+    """
+    Write the user and the participation changed by an attendance transition, each
+    row once. The attendance of the user is always written, as the user may be a stale
+    cached copy. The participation is written last, as the event rows it updates are
+    shared by every participant checking in or out at the same time.
+    """
+    user.save_attendance()
+    attendable_participation.save_attendance()
+
+
+@transaction.atomic(savepoint=False)
 def check_in_user(user, attendable_event, attendable_participation):
     check_in_data = attendable_participation.check_in()
-    user.set_currently_attended_event(attendable_event)
-    user.set_currently_attending_role(attendable_participation.get_participation_type())
+    user.set_currently_attended_event(attendable_event, attendable_participation.get_participation_type())
+    save_attendance_transition(user, attendable_participation)
     return check_in_data
 
 
+@transaction.atomic(savepoint=False)
 def check_out_user(user, attendable_participation):
     check_out_data = attendable_participation.check_out()
     user.remove_currently_attended_event()
-    return handle_reward_grant(user, check_out_data, attendable_participation)
+    reward_and_check_out_data = grant_reward_if_eligible(user, check_out_data, attendable_participation)
+    save_attendance_transition(user, attendable_participation)
+    return reward_and_check_out_data
 
 
-def handle_reward_grant(user, activity_data, attendable_participation):
+def grant_reward_if_eligible(user, activity_data, attendable_participation):
     reward_and_check_out_data = {**activity_data}
     if attendable_participation.is_eligible_for_reward():
         user.add_reward(POINTS_PER_ATTENDANCE)
@@ -68,18 +94,90 @@ def handle_reward_grant(user, activity_data, attendable_participation):
     return reward_and_check_out_data
 
 
+@transaction.atomic(savepoint=False)
+def handle_reward_grant(user, activity_data, participation):
+    reward_data = grant_reward_if_eligible(user, activity_data, participation)
+    user.save_dirty_fields()
+    participation.save_dirty_fields()
+    return reward_data
+
+
 def validate_event_is_initiative(event):
     if event.get_type() != EventType.INITIATIVE:
         raise InvalidRequestException(f'Event with ID {event.get_id()} is not an initiative')
 
 
+def _get_attendance_duration_until(check_out_time):
+    """
+    Return the expression of the duration in seconds from the open check-in of a
+    participation to the check-out time. Check-ins made before open_check_in_at was
+    recorded fall back to the latest check-in activity, like in check_out.
+    """
+    latest_check_in_time = Subquery(
+        AttendanceActivity.objects
+        .filter(participation=OuterRef('pk'), type=AttendanceActivityType.CHECK_IN.value)
+        .order_by('-timestamp')
+        .values('timestamp')[:1]
+    )
+    check_in_time = Coalesce(F('open_check_in_at'), latest_check_in_time)
+    return Coalesce(Extract(check_out_time - check_in_time, 'epoch', output_field=FloatField()), 0.0)
+
+
 def force_check_out_participants_of_event(event):
-    non_checked_out_participations = (AttendableEventParticipation.objects
-                                      .filter_by_event(event)
-                                      .filter(is_currently_attending=True))
-
-    for participation in non_checked_out_participations:
-        participant = participation.get_participant()
-        participant.remove_currently_attended_event()
-        participation.check_out()
-        participation.set_violated_geofencing_rule()
+    """
+    Check out all the participants still attending the event, as having violated the
+    geofencing rule, with a fixed number of statements whatever their number: the
+    durations are computed by the database from the open check-in times.
+    """
+    attendable_participation_models = [VolunteerParticipation]
+    if event.get_type() == EventType.INITIATIVE:
+        attendable_participation_models.append(InitiativeParticipation)
+
+    check_out_time = timezone.now()
+    attendance_duration = _get_attendance_duration_until(check_out_time)
+
+    with transaction.atomic(savepoint=False):
+        attending_participations = {
+            participation_model: list(
+                participation_model.objects
+                .non_polymorphic()
+                .select_for_update()
+                .filter(event_id=event.get_id(), is_currently_attending=True)
+                .annotate(attendance_duration=attendance_duration)
+                .values('pk', 'participant_id', 'overall_duration_in_seconds', 'attendance_duration')
+            )
+            for participation_model in attendable_participation_models
+        }
+        participations = [
+            participation
+            for model_participations in attending_participations.values()
+            for participation in model_participations
+        ]
+        if len(participations) == 0:
+            return
+
+        AttendanceActivity.objects.bulk_create([
+            AttendanceActivity(participation_id=participation['pk'], type=AttendanceActivityType.CHECK_OUT.value)
+            for participation in participations
+        ])
+        (AttendableEventParticipation.objects
+         .non_polymorphic()
+         .filter(pk__in=[participation['pk'] for participation in participations])
+         .update(overall_duration_in_seconds=F('overall_duration_in_seconds') + attendance_duration,
+                 is_currently_attending=False,
+                 open_check_in_at=None,
+                 has_violated_geofencing_rule=True))
+        # Participations of deleted users have no participant
+        participant_ids = [
+            participation['participant_id'] for participation in participations
+            if participation['participant_id'] is not None
+        ]
+        User.objects.filter(pk__in=participant_ids).update(event_currently_attended=None, currently_attending_role=None)
+        transaction.on_commit(lambda: user_cache.invalidate_many(participant_ids))
+
+        initiative_participations = attending_participations.get(InitiativeParticipation, [])
+        if len(initiative_participations) > 0:
+            event.add_participant_attendance_durations(
+                sum(participation['attendance_duration'] for participation in initiative_participations),
+                sum(1 for participation in initiative_participations if participation['overall_duration_in_seconds'] == 0)
+            )
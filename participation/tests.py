@@ -1,3 +1,165 @@
+from communalspace.testing import create_initiative
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from event.choices import AttendanceActivityType
+from event.models import AttendanceActivity, InitiativeParticipation
+from users.models import User
+from users.services.user_cache import user_cache
+from .services.participation import handle_register_user_participation_to_initiative
+from .services.participation_helpers import (
+    check_in_user,
+    check_out_user,
+    force_check_out_participants_of_event,
+    save_attendance_transition
+)
+import datetime
 
-# Create your tests here.
+
+class RegistrationTest(TestCase):
+    def test_registrations_do_not_lock_the_event(self):
+        initiative = create_initiative()
+        for index in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                handle_register_user_participation_to_initiative(
+                    {'event_id': str(initiative.get_id())},
+                    User.objects.create_user(user_id=f'participant-{index}')
+                )
+
+            self.assertFalse([query['sql'] for query in queries if 'FOR UPDATE' in query['sql']])
+
+        initiative.refresh_from_db()
+        self.assertEqual(initiative.get_num_of_participants(), 2)
+
+
+class AttendanceTransitionTest(TestCase):
+    def setUp(self):
+        self.initiative = create_initiative(start_date_time=timezone.now() - datetime.timedelta(hours=1))
+        self.user = User.objects.create_user(user_id='participant')
+        self.participation = self.initiative.add_participant(self.user)
+
+    def test_check_out_through_a_stale_user_writes_the_attendance(self):
+        # Cached by another process before the check-in
+        stale_user = User.objects.get(pk='participant')
+        check_in_user(self.user, self.initiative, self.participation)
+        self.assertFalse(stale_user.is_currently_attending_event())
+
+        check_out_user(stale_user, self.initiative.get_participation_by_participant(stale_user))
+
+        user = User.objects.get(pk='participant')
+        self.assertIsNone(user.get_currently_attended_event())
+        self.assertFalse(user.is_currently_attending_event())
+
+
+class ForceCheckOutTest(TestCase):
+    def setUp(self):
+        self.initiative = create_initiative(start_date_time=timezone.now() - datetime.timedelta(hours=1))
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+
+    def _check_in(self, user_id):
+        user = User.objects.create_user(user_id=user_id)
+        participation = self.initiative.add_participant(user)
+        check_in_user(user, self.initiative, participation)
+        return participation
+
+    def test_checked_out_participants_are_invalidated_in_the_user_cache(self):
+        self._check_in('participant')
+        self.assertTrue(user_cache.get_or_create_user_by_id('participant').is_currently_attending_event())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            force_check_out_participants_of_event(self.initiative)
+
+        self.assertFalse(user_cache.get_or_create_user_by_id('participant').is_currently_attending_event())
+
+    def test_participations_of_deleted_users_are_checked_out(self):
+        self._check_in('participant')
+        deleted_user_participation = self._check_in('deleted-participant')
+        User.objects.filter(pk='deleted-participant').delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            force_check_out_participants_of_event(self.initiative)
+
+        deleted_user_participation.refresh_from_db()
+        self.assertFalse(deleted_user_participation.get_is_currently_attending())
+        self.assertFalse(User.objects.get(pk='participant').is_currently_attending_event())
+
+
+class BulkForceCheckOutTest(TestCase):
+    """
+    Compares the bulk force check-out with checking out the participants one by one.
+    """
+    ATTENDANCES = [
+        # (participant, minutes since the check-in, duration of the previous attendances)
+        ('first', 30, 0),
+        ('second', 10, 600),
+    ]
+
+    def _create_attended_initiative(self, name):
+        initiative = create_initiative(name=name, start_date_time=timezone.now() - datetime.timedelta(hours=1))
+        for participant, minutes_since_check_in, previous_duration in self.ATTENDANCES:
+            user = User.objects.create_user(user_id=f'{name}-{participant}')
+            participation = initiative.add_participant(user)
+            if previous_duration > 0:
+                participation.overall_duration_in_seconds = previous_duration
+                participation.save()
+                initiative.add_participant_attendance_durations(previous_duration, 1)
+
+            check_in_user(user, initiative, participation)
+            check_in_time = timezone.now() - datetime.timedelta(minutes=minutes_since_check_in)
+            AttendanceActivity.objects.filter(participation=participation).update(timestamp=check_in_time)
+            InitiativeParticipation.objects.filter(pk=participation.pk).update(open_check_in_at=check_in_time)
+
+        return initiative
+
+    def _check_out_one_by_one(self, initiative):
+        for participation in InitiativeParticipation.objects.filter(event=initiative, is_currently_attending=True):
+            participant = participation.get_participant()
+            participant.remove_currently_attended_event()
+            participation.check_out()
+            participation.set_violated_geofencing_rule()
+            save_attendance_transition(participant, participation)
+
+    def _get_participations(self, initiative):
+        return {
+            participation.get_participant().user_id.split('-', 1)[1]: participation
+            for participation in InitiativeParticipation.objects.filter(event=initiative)
+        }
+
+    def test_bulk_check_out_matches_checking_out_one_by_one(self):
+        bulk_initiative = self._create_attended_initiative('bulk')
+        reference_initiative = self._create_attended_initiative('reference')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            force_check_out_participants_of_event(bulk_initiative)
+
+        self._check_out_one_by_one(reference_initiative)
+
+        bulk_participations = self._get_participations(bulk_initiative)
+        reference_participations = self._get_participations(reference_initiative)
+        for participant, minutes_since_check_in, previous_duration in self.ATTENDANCES:
+            bulk_participation = bulk_participations[participant]
+            reference_participation = reference_participations[participant]
+            self.assertAlmostEqual(bulk_participation.get_attendance_duration(),
+                                   previous_duration + minutes_since_check_in * 60, delta=5)
+            self.assertAlmostEqual(bulk_participation.get_attendance_duration(),
+                                   reference_participation.get_attendance_duration(), delta=5)
+            self.assertFalse(bulk_participation.get_is_currently_attending())
+            self.assertIsNone(bulk_participation.open_check_in_at)
+            self.assertTrue(bulk_participation.get_has_violated_geofencing_rule())
+            self.assertEqual(
+                [activity.type for activity in bulk_participation.get_activities()],
+                [activity.type for activity in reference_participation.get_activities()]
+            )
+            self.assertEqual(bulk_participation.get_activities().first().type, AttendanceActivityType.CHECK_OUT.value)
+            self.assertFalse(bulk_participation.get_participant().is_currently_attending_event())
+
+        bulk_initiative.refresh_from_db()
+        reference_initiative.refresh_from_db()
+        self.assertEqual(bulk_initiative.number_of_durations_counted, 2)
+        self.assertEqual(bulk_initiative.number_of_durations_counted, reference_initiative.number_of_durations_counted)
+        self.assertAlmostEqual(bulk_initiative.get_participants_average_attendance_duration(), (1800 + 1200) / 2,
+                               delta=5)
+        self.assertAlmostEqual(bulk_initiative.get_participants_average_attendance_duration(),
+                               reference_initiative.get_participants_average_attendance_duration(), delta=5)
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from apscheduler.triggers.interval import IntervalTrigger
+from communalspace.cron import scheduler
+from communalspace.settings import SENTIMENT_PIPELINE_INTERVAL
 
 
 class ReviewConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'review'
+
+    def ready(self):
+        from review.services.sentiment_pipeline import (
+            REVIEW_SENTIMENT_PIPELINE_JOB_ID,
+            process_pending_review_sentiments
+        )
+        scheduler.add_job(
+            process_pending_review_sentiments,
+            IntervalTrigger(seconds=SENTIMENT_PIPELINE_INTERVAL),
+            id=REVIEW_SENTIMENT_PIPELINE_JOB_ID,
+            max_instances=1,
+            coalesce=True
+        )
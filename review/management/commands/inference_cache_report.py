@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import models
+from review.models import InferenceResult
+
+
+class Command(BaseCommand):
+    help = 'Report the number of cached inference results and the inference requests they saved, per model'
+
+    def handle(self, *args, **options):
+        model_reports = (InferenceResult.objects
+                         .values('model_name')
+                         .annotate(number_of_results=models.Count('key'), number_of_hits=models.Sum('hit_count'))
+                         .order_by('model_name'))
+
+        for model_report in model_reports:
+            number_of_lookups = model_report['number_of_results'] + model_report['number_of_hits']
+            self.stdout.write(
+                f"{model_report['model_name']} | {model_report['number_of_results']} cached results | "
+                f"{model_report['number_of_hits']} hits | "
+                f"hit rate {model_report['number_of_hits'] / number_of_lookups:.1%}"
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='participationreview',
+            name='sentiment_score',
+            field=models.FloatField(default=None, null=True),
+        ),
+    ]
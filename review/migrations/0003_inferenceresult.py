@@ -0,0 +1,23 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0002_participationreview_pending_sentiment_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InferenceResult',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('model_name', models.CharField(max_length=255)),
+                ('result', models.JSONField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -5,7 +5,8 @@ class ParticipationReview(models.Model):
     participation = models.ForeignKey('event.EventParticipation', on_delete=models.CASCADE)
     event_rating = models.SmallIntegerField()
     event_comment = models.TextField(null=True)
-    sentiment_score = models.FloatField(default=0)
+    # None until the review is scored by the sentiment pipeline
+    sentiment_score = models.FloatField(default=None, null=True)
 
     def get_rating(self):
         return self.event_rating
@@ -20,3 +21,20 @@ class ParticipationReview(models.Model):
     def get_sentiment_score(self):
         return self.sentiment_score
 
+    def get_event_id(self):
+        return self.participation.event_id
+
+
+class InferenceResult(models.Model):
+    """
+    Persisted result of an inference request for one text, shared by all processes.
+    The key is the hash of the model name and the normalized text.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    model_name = models.CharField(max_length=255)
+    result = models.JSONField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def get_result(self):
+        return self.result
@@ -0,0 +1,148 @@
+from cachetools import LRUCache
+from collections import Counter, defaultdict
+from communalspace.exceptions import InferenceUnavailableException
+from communalspace.inference import get_inference_backend
+from communalspace.metrics import CacheStatistics, register_statistics
+from communalspace.settings import INFERENCE_CACHE_HIT_COUNT_FLUSH_SIZE, INFERENCE_CACHE_MAXSIZE
+from django.db import models
+from ..models import InferenceResult
+import hashlib
+import threading
+import unicodedata
+
+
+def normalize_text(text):
+    return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+
+def get_model_name(endpoint):
+    return endpoint.rstrip('/').split('/models/')[-1]
+
+
+def get_inference_key(model_name, normalized_text):
+    return hashlib.sha256(f'{model_name}\n{normalized_text}'.encode('utf-8')).hexdigest()
+
+
+class InferenceResultCache:
+    """
+    Content-addressed cache of inference results, with an in-process LRU
+    in front of the InferenceResult table. Only the texts missing from both
+    are sent to the inference backend, in a single request.
+
+    The hits of the persisted results are counted in memory and added to
+    the table once hit_count_flush_size hits are pending.
+    """
+    def __init__(self, maxsize, hit_count_flush_size):
+        self._lock = threading.Lock()
+        self._results = LRUCache(maxsize=maxsize)
+        self._hit_count_flush_size = hit_count_flush_size
+        self._pending_hit_counts = Counter()
+        self._number_of_pending_hits = 0
+        self.memory_statistics = CacheStatistics()
+        self.database_statistics = CacheStatistics()
+
+    def _get_cached_results(self, keys):
+        with self._lock:
+            results = {key: self._results[key] for key in keys if key in self._results}
+
+        for _ in results:
+            self.memory_statistics.record_hit()
+
+        for _ in range(len(keys) - len(results)):
+            self.memory_statistics.record_miss()
+
+        return results
+
+    def _get_persisted_results(self, keys):
+        results = dict(InferenceResult.objects.filter(key__in=keys).values_list('key', 'result'))
+
+        for _ in results:
+            self.database_statistics.record_hit()
+
+        for _ in range(len(keys) - len(results)):
+            self.database_statistics.record_miss()
+
+        with self._lock:
+            self._results.update(results)
+
+        return results
+
+    def _compute_results(self, endpoint, model_name, texts_by_key):
+        keys = list(texts_by_key)
+        computed_results = get_inference_backend().infer(endpoint, [texts_by_key[key] for key in keys])
+
+        # Error responses are not cached, the texts stay pending like on any unavailable inference
+        if not isinstance(computed_results, list) or len(computed_results) != len(keys):
+            raise InferenceUnavailableException(f'Unexpected inference response of model {model_name}')
+
+        results = dict(zip(keys, computed_results))
+
+        InferenceResult.objects.bulk_create(
+            [InferenceResult(key=key, model_name=model_name, result=result) for key, result in results.items()],
+            ignore_conflicts=True
+        )
+        with self._lock:
+            self._results.update(results)
+
+        return results
+
+    def _record_hits(self, keys):
+        with self._lock:
+            self._pending_hit_counts.update(keys)
+            self._number_of_pending_hits += len(keys)
+            if self._number_of_pending_hits < self._hit_count_flush_size:
+                return
+
+        self.flush_hit_counts()
+
+    def flush_hit_counts(self):
+        """
+        Add the pending hits to the persisted results, with one update per distinct number of hits.
+        """
+        with self._lock:
+            pending_hit_counts = self._pending_hit_counts
+            self._pending_hit_counts = Counter()
+            self._number_of_pending_hits = 0
+
+        keys_by_hit_count = defaultdict(list)
+        for key, hit_count in pending_hit_counts.items():
+            keys_by_hit_count[hit_count].append(key)
+
+        for hit_count, keys in keys_by_hit_count.items():
+            InferenceResult.objects.filter(key__in=keys).update(hit_count=models.F('hit_count') + hit_count)
+
+    def infer(self, endpoint, texts):
+        """
+        Return the inference result of every text, in the order of the texts.
+        """
+        model_name = get_model_name(endpoint)
+        normalized_texts = [normalize_text(text) for text in texts]
+        keys = [get_inference_key(model_name, normalized_text) for normalized_text in normalized_texts]
+        unique_keys = list(dict.fromkeys(keys))
+
+        results = self._get_cached_results(unique_keys)
+        if len(results) < len(unique_keys):
+            results.update(self._get_persisted_results([key for key in unique_keys if key not in results]))
+
+        if len(results) > 0:
+            self._record_hits(list(results))
+
+        if len(results) < len(unique_keys):
+            texts_by_key = {
+                key: normalized_text
+                for key, normalized_text in zip(keys, normalized_texts)
+                if key not in results
+            }
+            results.update(self._compute_results(endpoint, model_name, texts_by_key))
+
+        return [results[key] for key in keys]
+
+    def get_statistics(self):
+        return {
+            'memory': self.memory_statistics.get_statistics(),
+            'database': self.database_statistics.get_statistics(),
+        }
+
+
+inference_result_cache = InferenceResultCache(INFERENCE_CACHE_MAXSIZE, INFERENCE_CACHE_HIT_COUNT_FLUSH_SIZE)
+register_statistics('inference_cache', inference_result_cache.get_statistics)
@@ -1,11 +1,11 @@
-from . import sentiment
+from . import sentiment_pipeline
 from communalspace.decorators import catch_exception_and_convert_to_invalid_request_decorator
 from communalspace.exceptions import InvalidRequestException
+from communalspace.locks import acquire_transaction_lock
 from django.core.exceptions import ObjectDoesNotExist
 from event.services import utils as event_utils
 
 
-
 def _validate_review_request_data(request_data):
     if not isinstance(request_data.get('event_rating'), int):
         raise InvalidRequestException('Event rating must be an integer')
@@ -25,19 +25,21 @@ def _validate_participant_can_submit_review(participation):
         raise InvalidRequestException('Participant has not attended event or has submitted a review')
 
 
-def submit_review_and_compute_sentiment(participation, request_data):
-    review_sentiment_score = sentiment.compute_sentiment_score_from_text(request_data.get('event_comment'))
-    return participation.create_review(
+def submit_review(participation, request_data):
+    review = participation.create_review(
         rating=request_data.get('event_rating'),
-        comment=request_data.get('event_comment'),
-        sentiment_score=review_sentiment_score
+        comment=request_data.get('event_comment')
     )
+    sentiment_pipeline.request_review_sentiment_processing()
+    return review
 
 
 @catch_exception_and_convert_to_invalid_request_decorator((ObjectDoesNotExist,))
 def handle_submit_review(request_data, user):
     _validate_review_request_data(request_data)
-    event = event_utils.get_event_by_id_or_raise_exception_thread_safe(request_data.get('event_id'))
+    event = event_utils.get_event_by_id_or_raise_exception(request_data.get('event_id'))
+    # Only the reviews of the same user are serialized, the event averages are updated atomically
+    acquire_transaction_lock('event-review', event.get_id(), user.get_user_id())
     participation = event.get_all_type_participation_by_participant(user)
     _validate_participant_can_submit_review(participation)
-    submit_review_and_compute_sentiment(participation, request_data)
+    submit_review(participation, request_data)
@@ -1,15 +1,12 @@
-import requests
-import json
-from communalspace.settings import SENTIMENT_ANALYSIS_ENDPOINT, HUGGING_FACE_ACCESS_TOKEN
+from communalspace.exceptions import InferenceUnavailableException
+from communalspace.settings import SENTIMENT_ANALYSIS_ENDPOINT
+from .inference_cache import inference_result_cache
 
 
-def compute_sentiment_score_from_text(text):
-    headers = {"Authorization": f"Bearer {HUGGING_FACE_ACCESS_TOKEN}"}
-    data = json.dumps({"inputs": [text], "options": {"wait_for_model": True}})
-    response = requests.request("POST", SENTIMENT_ANALYSIS_ENDPOINT, headers=headers, data=data)
-    sentiment = json.loads(response.content.decode("utf-8"))
-    sentiment_scores = sentiment[0]
+NEUTRAL_SENTIMENT_SCORE = 0.5
+
 
+def _compute_overall_score(sentiment_scores):
     positive_weight = 1
     negative_weight = -1
     neutral_weight = 0.25
@@ -27,3 +24,23 @@ def compute_sentiment_score_from_text(text):
     overall_score = (overall_score + 1) * 0.5
 
     return overall_score
+
+
+def compute_sentiment_scores_from_texts(texts):
+    """
+    Batched version of compute_sentiment_score_from_text,
+    scoring all uncached texts in a single inference request.
+    """
+    if len(texts) == 0:
+        return []
+
+    sentiments = inference_result_cache.infer(SENTIMENT_ANALYSIS_ENDPOINT, list(texts))
+    return [_compute_overall_score(sentiment_scores) for sentiment_scores in sentiments]
+
+
+def compute_sentiment_score_from_text(text):
+    try:
+        return compute_sentiment_scores_from_texts([text])[0]
+
+    except InferenceUnavailableException:
+        return NEUTRAL_SENTIMENT_SCORE
@@ -0,0 +1,58 @@
+from communalspace.cron import run_job_now
+from communalspace.exceptions import InferenceUnavailableException
+from communalspace.inference import infer_one_by_one_if_rejected
+from communalspace.settings import SENTIMENT_PIPELINE_BATCH_SIZE
+from django.db import transaction
+from event.services import utils as event_utils
+from . import sentiment
+from ..models import ParticipationReview
+
+REVIEW_SENTIMENT_PIPELINE_JOB_ID = 'review_sentiment_pipeline'
+
+
+def _get_pending_reviews():
+    return list(ParticipationReview.objects
+                .filter(sentiment_score__isnull=True)
+                .select_related('participation')
+                .order_by('id')[:SENTIMENT_PIPELINE_BATCH_SIZE])
+
+
+@transaction.atomic()
+def _apply_review_sentiment_score(review_id, sentiment_score):
+    review = ParticipationReview.objects.select_for_update().filter(id=review_id).first()
+
+    # The review may have been scored by another process in the meantime
+    if review is None or review.get_sentiment_score() is not None:
+        return
+
+    event = event_utils.get_event_by_id_or_raise_exception(review.get_event_id())
+    event.update_average_sentiment_score(sentiment_score)
+    review.set_sentiment_score(sentiment_score)
+
+
+def process_pending_review_sentiments():
+    """
+    Score a batch of pending reviews with a single inference request,
+    outside of any transaction, then apply every score to its review and event.
+    The reviews rejected by the endpoint get the neutral sentiment score.
+    """
+    pending_reviews = _get_pending_reviews()
+    try:
+        sentiment_scores = infer_one_by_one_if_rejected(
+            sentiment.compute_sentiment_scores_from_texts,
+            [review.get_comment() or '' for review in pending_reviews],
+            sentiment.NEUTRAL_SENTIMENT_SCORE
+        )
+
+    except InferenceUnavailableException:
+        # The reviews stay pending until the next run
+        return 0
+
+    for review, sentiment_score in zip(pending_reviews, sentiment_scores):
+        _apply_review_sentiment_score(review.id, sentiment_score)
+
+    return len(pending_reviews)
+
+
+def request_review_sentiment_processing():
+    transaction.on_commit(lambda: run_job_now(REVIEW_SENTIMENT_PIPELINE_JOB_ID))
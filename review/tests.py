@@ -1,3 +1,98 @@
+from communalspace import inference
+from communalspace.exceptions import InferenceRequestRejectedException, InferenceUnavailableException
+from communalspace.testing import create_initiative
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from users.models import User
+from .models import InferenceResult, ParticipationReview
+from .services import sentiment, sentiment_pipeline
+from .services.inference_cache import InferenceResultCache, get_inference_key, get_model_name
+import datetime
 
-# Create your tests here.
+SENTIMENT_ANALYSIS_ENDPOINT = 'https://inference.test/models/sentiment'
+POSITIVE_SENTIMENT = [{'label': 'positive', 'score': 1.0}]
+
+
+class InferenceBackendTestMixin:
+    def set_inference_responder(self, responder):
+        self.addCleanup(inference.set_inference_backend, inference.get_inference_backend())
+        inference_backend = inference.StubInferenceBackend(responder)
+        inference.set_inference_backend(inference_backend)
+        return inference_backend
+
+
+class InferenceResultCacheTest(InferenceBackendTestMixin, TestCase):
+    def _get_hit_count(self, text):
+        key = get_inference_key(get_model_name(SENTIMENT_ANALYSIS_ENDPOINT), text)
+        return InferenceResult.objects.get(key=key).hit_count
+
+    def test_error_responses_raise_inference_unavailable_and_are_not_cached(self):
+        self.set_inference_responder(lambda endpoint, inputs: {'error': 'Model is currently loading'})
+        inference_result_cache = InferenceResultCache(maxsize=10, hit_count_flush_size=10)
+
+        with self.assertRaises(InferenceUnavailableException):
+            inference_result_cache.infer(SENTIMENT_ANALYSIS_ENDPOINT, ['Great event'])
+
+        self.assertFalse(InferenceResult.objects.exists())
+
+    def test_hit_counts_are_written_once_enough_hits_are_pending(self):
+        inference_backend = self.set_inference_responder(lambda endpoint, inputs: [POSITIVE_SENTIMENT for _ in inputs])
+        inference_result_cache = InferenceResultCache(maxsize=10, hit_count_flush_size=3)
+        inference_result_cache.infer(SENTIMENT_ANALYSIS_ENDPOINT, ['Great event', 'Nice event'])
+
+        with CaptureQueriesContext(connection) as queries:
+            inference_result_cache.infer(SENTIMENT_ANALYSIS_ENDPOINT, ['Great event', 'Nice event'])
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(self._get_hit_count('Great event'), 0)
+
+        inference_result_cache.infer(SENTIMENT_ANALYSIS_ENDPOINT, ['Great event'])
+        self.assertEqual(len(inference_backend.infer_calls), 1)
+        self.assertEqual(self._get_hit_count('Great event'), 2)
+        self.assertEqual(self._get_hit_count('Nice event'), 1)
+
+
+class ReviewSentimentPipelineTest(InferenceBackendTestMixin, TestCase):
+    def setUp(self):
+        self.initiative = create_initiative(start_date_time=timezone.now() - datetime.timedelta(hours=3))
+        participation = self.initiative.add_participant(User.objects.create_user(user_id='participant'))
+        self.review = ParticipationReview.objects.create(participation=participation, event_rating=5,
+                                                         event_comment='Great event')
+
+    def test_error_responses_leave_the_reviews_pending(self):
+        self.set_inference_responder(lambda endpoint, inputs: {'error': 'Model is currently loading'})
+
+        self.assertEqual(sentiment_pipeline.process_pending_review_sentiments(), 0)
+        self.review.refresh_from_db()
+        self.assertIsNone(self.review.get_sentiment_score())
+
+    def test_pending_reviews_are_scored_once_inference_is_available(self):
+        self.set_inference_responder(lambda endpoint, inputs: {'error': 'Model is currently loading'})
+        sentiment_pipeline.process_pending_review_sentiments()
+
+        self.set_inference_responder(lambda endpoint, inputs: [POSITIVE_SENTIMENT for _ in inputs])
+        self.assertEqual(sentiment_pipeline.process_pending_review_sentiments(), 1)
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.get_sentiment_score(), 1.0)
+
+    def test_rejected_reviews_get_the_neutral_sentiment_score_without_blocking_the_others(self):
+        participation = self.initiative.add_participant(User.objects.create_user(user_id='other-participant'))
+        other_review = ParticipationReview.objects.create(participation=participation, event_rating=4,
+                                                          event_comment='Rejected comment')
+
+        def reject_the_other_comment(endpoint, inputs):
+            if 'Rejected comment' in inputs:
+                raise InferenceRequestRejectedException('Input is too long')
+
+            return [POSITIVE_SENTIMENT for _ in inputs]
+
+        self.set_inference_responder(reject_the_other_comment)
+
+        self.assertEqual(sentiment_pipeline.process_pending_review_sentiments(), 2)
+        self.review.refresh_from_db()
+        other_review.refresh_from_db()
+        self.assertEqual(self.review.get_sentiment_score(), 1.0)
+        self.assertEqual(other_review.get_sentiment_score(), sentiment.NEUTRAL_SENTIMENT_SCORE)
+        self.assertEqual(sentiment_pipeline.process_pending_review_sentiments(), 0)
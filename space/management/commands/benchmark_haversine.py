@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from space.services.haversine import haversine, haversine_vectorized
+import numpy
+import time
+
+
+class Command(BaseCommand):
+    help = 'Compare the scalar haversine loop against the vectorized haversine on random coordinates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def _measure(self, function, repeat):
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            durations.append(time.perf_counter() - start)
+
+        return min(durations)
+
+    def handle(self, *args, **options):
+        random_generator = numpy.random.default_rng(seed=0)
+        latitude, longitude = -6.2, 106.8
+
+        for size in options['sizes']:
+            latitudes = random_generator.uniform(-90, 90, size)
+            longitudes = random_generator.uniform(-180, 180, size)
+            latitude_list, longitude_list = latitudes.tolist(), longitudes.tolist()
+
+            scalar_duration = self._measure(
+                lambda: [
+                    haversine(latitude, longitude, location_latitude, location_longitude)
+                    for location_latitude, location_longitude in zip(latitude_list, longitude_list)
+                ],
+                options['repeat']
+            )
+            vectorized_duration = self._measure(
+                lambda: haversine_vectorized(latitude, longitude, latitudes, longitudes),
+                options['repeat']
+            )
+
+            self.stdout.write(
+                f'{size:>8} locations | scalar {scalar_duration * 1000:9.3f} ms | '
+                f'vectorized {vectorized_duration * 1000:9.3f} ms | '
+                f'speedup {scalar_duration / vectorized_duration:7.1f}x'
+            )
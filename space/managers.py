@@ -0,0 +1,19 @@
+from django.db import models
+from .services.haversine import get_bounding_box
+
+
+class LocationQuerySet(models.QuerySet):
+    def filter_within_bounding_box(self, latitude, longitude, radius):
+        """
+        Narrow down the locations to those inside the bounding box of the circle
+        centered in (latitude, longitude). The filter is served by the coordinate
+        index, the exact distance still has to be checked with haversine.
+        """
+        min_latitude, max_latitude, min_longitude, max_longitude = get_bounding_box(latitude, longitude, radius)
+        locations = self.filter(latitude__range=(min_latitude, max_latitude))
+
+        if min_longitude <= max_longitude:
+            return locations.filter(longitude__range=(min_longitude, max_longitude))
+
+        else:
+            return locations.filter(models.Q(longitude__gte=min_longitude) | models.Q(longitude__lte=max_longitude))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-18 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('space', '0002_location_description'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['latitude', 'longitude'], name='space_locat_latitud_ed914d_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from communalspace.settings import AREA_RADIUS, AREA_BUFFER_RADIUS
 from django.db import models
 from rest_framework import serializers
 from space.services.haversine import haversine
+from .managers import LocationQuerySet
 import uuid
 
 
@@ -12,6 +13,13 @@ class Location(models.Model):
     longitude = models.FloatField()
     description = models.TextField(default=None, null=True)
 
+    objects = LocationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+        ]
+
     def get_name(self):
         return self.name
 
@@ -3,7 +3,6 @@ from communalspace.exceptions import InvalidRequestException
 from communalspace.decorators import catch_exception_and_convert_to_invalid_request_decorator
 from django.core.exceptions import ObjectDoesNotExist
 from . import utils
-from ..models import Location
 
 
 def _get_non_notified_nearby_locations(nearby_locations, user):
@@ -13,14 +12,8 @@ def _get_non_notified_nearby_locations(nearby_locations, user):
 
 @catch_exception_and_convert_to_invalid_request_decorator((ValueError,))
 def handle_get_nearby_non_subscribed_locations(request_data, user):
-    all_locations = Location.objects.all()
     latitude, longitude = utils.parse_coordinate(request_data)
-    nearby_locations = utils.get_nearby_locations(
-        all_locations,
-        latitude,
-        longitude,
-        user.get_preferred_radius()
-    )
+    nearby_locations = utils.get_all_nearby_locations(latitude, longitude, user.get_preferred_radius())
     return _get_non_notified_nearby_locations(nearby_locations, user)
 
 
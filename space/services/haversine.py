@@ -1,10 +1,13 @@
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Sin, Sqrt, Radians
 import math
+import numpy
 
+# Radius in KM
+EARTH_RADIUS = 6371
 
-def haversine(lat1, long1, lat2, long2):
-    # Radius in KM
-    earth_radius = 6371
 
+def haversine(lat1, long1, lat2, long2):
     # Converting degrees to radians
     lat1 = math.radians(lat1)
     lat2 = math.radians(lat2)
@@ -16,4 +19,84 @@ def haversine(lat1, long1, lat2, long2):
 
     a = math.sin(distance_latitude / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(distance_longitude / 2) ** 2
     c = 2 * math.asin(math.sqrt(a))
-    return earth_radius * c
+    return EARTH_RADIUS * c
+
+
+def haversine_vectorized(latitude, longitude, latitudes, longitudes):
+    """
+    Batched version of haversine, computing the distances (in KM) between
+    one coordinate and arrays of coordinates in a single NumPy pass.
+    """
+    latitude = numpy.radians(latitude)
+    longitude = numpy.radians(longitude)
+    latitudes = numpy.radians(numpy.asarray(latitudes, dtype=numpy.float64))
+    longitudes = numpy.radians(numpy.asarray(longitudes, dtype=numpy.float64))
+
+    distance_latitude = latitudes - latitude
+    distance_longitude = longitudes - longitude
+
+    a = (numpy.sin(distance_latitude / 2) ** 2 +
+         numpy.cos(latitude) * numpy.cos(latitudes) * numpy.sin(distance_longitude / 2) ** 2)
+    c = 2 * numpy.arcsin(numpy.sqrt(numpy.clip(a, 0, 1)))
+    return EARTH_RADIUS * c
+
+
+def haversine_expression(latitude, longitude, latitude_field='latitude', longitude_field='longitude'):
+    """
+    Database expression of the haversine distance (in KM) between a coordinate
+    and the coordinate stored in latitude_field and longitude_field,
+    to be used in annotate() and order_by().
+    """
+    latitude_in_radians = math.radians(latitude)
+    longitude_in_radians = math.radians(longitude)
+    field_latitude = Radians(F(latitude_field))
+    field_longitude = Radians(F(longitude_field))
+
+    a = (Power(Sin((field_latitude - Value(latitude_in_radians)) / Value(2.0)), 2) +
+         Value(math.cos(latitude_in_radians)) * Cos(field_latitude) *
+         Power(Sin((field_longitude - Value(longitude_in_radians)) / Value(2.0)), 2))
+
+    # Rounding errors may push a slightly above 1, which is outside the domain of asin
+    return Value(2.0 * EARTH_RADIUS) * ASin(Sqrt(Least(a, Value(1.0), output_field=FloatField())))
+
+
+def get_bounding_box(latitude, longitude, radius):
+    """
+    Compute the latitude/longitude box enclosing every coordinate whose
+    haversine distance to (latitude, longitude) is at most radius (in KM).
+    Returns (min_latitude, max_latitude, min_longitude, max_longitude) in degrees.
+    When the box crosses the antimeridian, min_longitude is greater than max_longitude.
+
+    The formula is adapted from
+    http://janmatuschek.de/LatitudeLongitudeBoundingCoordinates
+    """
+    angular_radius = radius / EARTH_RADIUS
+    latitude_in_radians = math.radians(latitude)
+    min_latitude = latitude_in_radians - angular_radius
+    max_latitude = latitude_in_radians + angular_radius
+
+    if min_latitude <= -math.pi / 2 or max_latitude >= math.pi / 2:
+        # One of the poles is inside the circle, every longitude is reachable
+        return (
+            math.degrees(max(min_latitude, -math.pi / 2)),
+            math.degrees(min(max_latitude, math.pi / 2)),
+            -180.0,
+            180.0,
+        )
+
+    delta_longitude = math.asin(math.sin(angular_radius) / math.cos(latitude_in_radians))
+    min_longitude = math.radians(longitude) - delta_longitude
+    max_longitude = math.radians(longitude) + delta_longitude
+
+    if min_longitude < -math.pi:
+        min_longitude += 2 * math.pi
+
+    if max_longitude > math.pi:
+        max_longitude -= 2 * math.pi
+
+    return (
+        math.degrees(min_latitude),
+        math.degrees(max_latitude),
+        math.degrees(min_longitude),
+        math.degrees(max_longitude),
+    )
@@ -1,7 +1,7 @@
 from communalspace.exceptions import InvalidRequestException
 from numbers import Number
 from ..models import Location
-from . import utils, haversine
+from . import utils
 
 
 def _validate_create_location_request(request_data: dict):
@@ -57,18 +57,4 @@ def handle_get_location_by_id(location_id):
 
 def handle_get_location_by_latitude_longitude(request_data):
     latitude, longitude = utils.parse_coordinate(request_data)
-    all_locations = Location.objects.all()
-    sorted_locations = sorted(
-        all_locations,
-        key=lambda l: haversine.haversine(
-            latitude,
-            longitude,
-            l.latitude,
-            l.longitude)
-    )
-
-    if len(sorted_locations) > 0:
-        return sorted_locations[0]
-
-    else:
-        return None
+    return utils.get_nearest_location(latitude, longitude)
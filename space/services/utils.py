@@ -1,8 +1,14 @@
+from communalspace.settings import NEAREST_LOCATION_INITIAL_SEARCH_RADIUS
 from django.core.exceptions import ObjectDoesNotExist
 from typing import Optional, Tuple
 
-from .haversine import haversine
+from .haversine import haversine_vectorized, EARTH_RADIUS
+from ..managers import LocationQuerySet
 from ..models import Location
+import math
+import numpy
+
+MAXIMUM_EARTH_DISTANCE = EARTH_RADIUS * math.pi
 
 
 def get_space_from_coordinates(latitude: float, longitude: float) -> Optional[Location]:
@@ -24,24 +30,44 @@ def get_space_by_id_or_raise_exception(location_id) -> Optional[Location]:
 
 
 def get_nearby_locations(locations, latitude, longitude, radius_tolerance):
-    nearby_locations = []
-    for location in locations:
-        distance_between_space_and_coordinate = haversine(
-            latitude,
-            longitude,
-            location.latitude,
-            location.longitude
-        )
-
-        if distance_between_space_and_coordinate <= radius_tolerance:
-            nearby_locations.append(location)
-
-    nearby_locations = sorted(
-        nearby_locations,
-        key=lambda x: haversine(latitude, longitude, x.latitude, x.longitude)
+    if isinstance(locations, LocationQuerySet):
+        locations = locations.filter_within_bounding_box(latitude, longitude, radius_tolerance)
+
+    locations = list(locations)
+    distances = haversine_vectorized(
+        latitude,
+        longitude,
+        [location.latitude for location in locations],
+        [location.longitude for location in locations]
     )
 
-    return nearby_locations
+    return [
+        locations[location_index]
+        for location_index in numpy.argsort(distances, kind='stable')
+        if distances[location_index] <= radius_tolerance
+    ]
+
+
+def get_all_nearby_locations(latitude, longitude, radius_tolerance):
+    return get_nearby_locations(Location.objects.all(), latitude, longitude, radius_tolerance)
+
+
+def get_nearest_location(latitude, longitude) -> Optional[Location]:
+    """
+    Find the location closest to the given coordinate by searching bounding
+    boxes of growing radius, so that only the locations around the coordinate
+    are loaded instead of the whole table.
+    """
+    search_radius = NEAREST_LOCATION_INITIAL_SEARCH_RADIUS
+    while True:
+        candidates = get_nearby_locations(Location.objects.all(), latitude, longitude, search_radius)
+        if len(candidates) > 0:
+            return candidates[0]
+
+        if search_radius >= MAXIMUM_EARTH_DISTANCE:
+            return None
+
+        search_radius = min(search_radius * 2, MAXIMUM_EARTH_DISTANCE)
 
 
 def parse_coordinate(lat_long_data) -> Tuple[float, float]:
@@ -1,3 +1,114 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
+from unittest import mock
+from .models import Location
+from .services import utils as space_utils
+from .services.haversine import haversine, haversine_expression, haversine_vectorized
 
-# Create your tests here.
+
+# Including antipodal, polar and antimeridian crossing pairs of coordinates
+COORDINATES = [
+    (-6.2, 106.8), (-6.21, 106.85), (51.5, -0.12), (0, 179.9), (0, -179.9),
+    (89.9, 0), (89.9, 180), (-90, 0), (90, 0), (10, 20), (-10, -160),
+]
+
+
+class HaversineVectorizedTest(SimpleTestCase):
+    def test_vectorized_distances_match_the_scalar_haversine(self):
+        latitudes = [latitude for latitude, _ in COORDINATES]
+        longitudes = [longitude for _, longitude in COORDINATES]
+        for latitude, longitude in COORDINATES:
+            distances = haversine_vectorized(latitude, longitude, latitudes, longitudes)
+
+            self.assertEqual(len(distances), len(COORDINATES))
+            for distance, (other_latitude, other_longitude) in zip(distances, COORDINATES):
+                self.assertAlmostEqual(distance, haversine(latitude, longitude, other_latitude, other_longitude),
+                                       places=6)
+
+    def test_no_coordinates_give_no_distances(self):
+        self.assertEqual(len(haversine_vectorized(0, 0, [], [])), 0)
+
+
+class HaversineExpressionTest(TestCase):
+    def test_database_distances_match_the_scalar_haversine(self):
+        for index, (latitude, longitude) in enumerate(COORDINATES):
+            Location.objects.create(name=f'Location {index}', latitude=latitude, longitude=longitude)
+
+        for latitude, longitude in COORDINATES:
+            locations = Location.objects.annotate(distance=haversine_expression(latitude, longitude))
+            for location in locations:
+                self.assertAlmostEqual(
+                    location.distance,
+                    haversine(latitude, longitude, location.latitude, location.longitude),
+                    places=6
+                )
+
+
+class BoundingBoxTest(TestCase):
+    def _create_locations(self, *coordinates):
+        return [
+            Location.objects.create(name=f'Location {index}', latitude=latitude, longitude=longitude)
+            for index, (latitude, longitude) in enumerate(coordinates)
+        ]
+
+    def _assert_bounding_box_keeps_the_locations_within(self, latitude, longitude, radius, expected_locations):
+        locations_within_radius = {
+            location for location in Location.objects.all()
+            if haversine(latitude, longitude, location.latitude, location.longitude) <= radius
+        }
+        self.assertEqual(locations_within_radius, set(expected_locations))
+
+        locations_in_box = set(Location.objects.filter_within_bounding_box(latitude, longitude, radius))
+        self.assertTrue(locations_within_radius.issubset(locations_in_box))
+        return locations_in_box
+
+    def test_boxes_crossing_the_antimeridian_wrap_around(self):
+        east, west, far_east = self._create_locations((0, 179.9), (0, -179.9), (0, 170))
+
+        locations_in_box = self._assert_bounding_box_keeps_the_locations_within(0, 179.95, 50, [east, west])
+        self.assertNotIn(far_east, locations_in_box)
+
+        locations_in_box = self._assert_bounding_box_keeps_the_locations_within(0, -179.95, 50, [east, west])
+        self.assertNotIn(far_east, locations_in_box)
+
+    def test_boxes_containing_a_pole_span_every_longitude(self):
+        near_side, far_side, south = self._create_locations((89.8, 0), (89.8, 180), (80, 0))
+
+        locations_in_box = self._assert_bounding_box_keeps_the_locations_within(89.9, 0, 100, [near_side, far_side])
+        self.assertNotIn(south, locations_in_box)
+
+    def test_boxes_near_a_pole_cover_the_widened_longitudes(self):
+        inside, = self._create_locations((85, 30))
+
+        self._assert_bounding_box_keeps_the_locations_within(85, 0, 300, [inside])
+
+
+class NearestLocationTest(TestCase):
+    def _get_nearest_location_and_search_radii(self, latitude, longitude):
+        with mock.patch.object(space_utils, 'get_nearby_locations', wraps=space_utils.get_nearby_locations) as search:
+            nearest_location = space_utils.get_nearest_location(latitude, longitude)
+
+        return nearest_location, [call.args[3] for call in search.call_args_list]
+
+    def test_search_radius_doubles_until_a_location_is_found(self):
+        Location.objects.create(name='Far', latitude=0, longitude=0.1)
+        near = Location.objects.create(name='Near', latitude=0, longitude=0.05)
+
+        nearest_location, search_radii = self._get_nearest_location_and_search_radii(0, 0)
+
+        self.assertEqual(nearest_location, near)
+        self.assertEqual(search_radii, [1, 2, 4, 8])
+
+    def test_antipodal_location_is_found(self):
+        antipode = Location.objects.create(name='Antipode', latitude=-10, longitude=-160)
+
+        nearest_location, search_radii = self._get_nearest_location_and_search_radii(10, 20)
+
+        self.assertEqual(nearest_location, antipode)
+        self.assertEqual(search_radii[-1], space_utils.MAXIMUM_EARTH_DISTANCE)
+
+    def test_search_ends_at_the_maximum_earth_distance_without_locations(self):
+        nearest_location, search_radii = self._get_nearest_location_and_search_radii(10, 20)
+
+        self.assertIsNone(nearest_location)
+        self.assertEqual(search_radii[-1], space_utils.MAXIMUM_EARTH_DISTANCE)
+        self.assertEqual(len(search_radii), 16)
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from apscheduler.triggers.interval import IntervalTrigger
+from communalspace.cron import scheduler
+from communalspace.settings import METRICS_REPORT_INTERVAL
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        from communalspace.metrics import METRICS_REPORT_JOB_ID, report_statistics
+        scheduler.add_job(
+            report_statistics,
+            IntervalTrigger(seconds=METRICS_REPORT_INTERVAL),
+            id=METRICS_REPORT_JOB_ID,
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
@@ -1,10 +1,11 @@
+from communalspace.dirty_fields import DirtyFieldsMixin
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from rest_framework import serializers
 from .managers import UserManager
 
 
-class User(AbstractUser):
+class User(DirtyFieldsMixin, AbstractUser):
     username = None
     password = None
     email = None
@@ -43,8 +44,8 @@ class User(AbstractUser):
         return self.initial_location_track_prompt
 
     def set_has_been_prompted_for_location_tracking(self, has_been_prompted):
-        self.has_been_prompted = has_been_prompted
-        self.save()
+        self.initial_location_track_prompt = has_been_prompted
+        self.save(update_fields=['initial_location_track_prompt'])
 
     def get_currently_attended_event(self):
         return self.event_currently_attended
@@ -58,33 +59,42 @@ class User(AbstractUser):
     def is_currently_attending_event(self):
         return self.currently_attending_role is not None
 
-    def set_currently_attended_event(self, event):
-        self.event_currently_attended = event
-        self.save()
+    # Setters write only their own fields: the users handed out by the user cache may be
+    # stale, and saving all their fields would revert the changes made since they were cached.
+    # The attendance and the reward are saved along with the transition that changed them.
 
-    def set_currently_attending_role(self, role):
+    def set_currently_attended_event(self, event, role):
+        self.event_currently_attended = event
         self.currently_attending_role = role
-        self.save()
 
     def remove_currently_attended_event(self):
-        self.set_currently_attended_event(None)
-        self.set_currently_attending_role(None)
+        self.set_currently_attended_event(None, None)
+
+    def save_attendance(self):
+        # Written even when unchanged, as the attendance of a cached user may be stale
+        attendance_fields = ['event_currently_attended', 'currently_attending_role']
+        if self._state.adding:
+            self.save()
+            return
+
+        dirty_fields = [field for field in self.get_dirty_fields() if field not in attendance_fields]
+        self.save(update_fields=attendance_fields + dirty_fields)
 
     def add_reward(self, amount):
-        self.reward_points += amount
-        self.save()
+        # Added by the database, as the points of a cached user may be stale
+        self.reward_points = models.F('reward_points') + amount
 
     def set_full_name(self, full_name):
         self.full_name = full_name
-        self.save()
+        self.save(update_fields=['full_name'])
 
     def set_preferred_radius(self, preferred_radius):
         self.preferred_radius = preferred_radius
-        self.save()
+        self.save(update_fields=['preferred_radius'])
 
     def set_location_track(self, location_track):
         self.location_track = location_track
-        self.save()
+        self.save(update_fields=['location_track'])
 
     def add_to_notified_locations(self, location, is_subscribe):
         existing_notified_location = self._get_notified_location_objects().filter(location=location)
@@ -136,13 +146,13 @@ class User(AbstractUser):
             raise ValueError("Amount of points to be redeemed must not exceed owned points")
 
         self.reward_points -= amount_of_points_to_be_redeemed
-        self.save()
+        self.save(update_fields=['reward_points'])
 
     def reset_monthly_point(self):
         current_point = self.reward_points
         self.previous_month_points = current_point
         self.reward_points = 0
-        self.save()
+        self.save(update_fields=['previous_month_points', 'reward_points'])
 
 
 class UserSerializer(serializers.ModelSerializer):
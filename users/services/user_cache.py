@@ -0,0 +1,54 @@
+from cachetools import TTLCache
+from communalspace.metrics import CacheStatistics, register_statistics
+from communalspace.settings import USER_CACHE_MAXSIZE, USER_CACHE_TIMEOUT
+from . import utils
+import copy
+import threading
+
+
+class UserCache:
+    """
+    Per-process cache of the authenticated users, so that repeated requests
+    of a user do not query the user again. Entries are invalidated by the
+    User signals of the current process and expire after the timeout to pick
+    up changes made by other processes. Queryset updates send no signal, so
+    their callers invalidate the updated users. Callers always receive a copy,
+    so the cached instance is never modified. As the copies may be stale,
+    the User setters only write the fields they change.
+    """
+    def __init__(self, maxsize, timeout):
+        self._lock = threading.Lock()
+        self._users = TTLCache(maxsize=maxsize, ttl=timeout)
+        self.statistics = CacheStatistics()
+
+    def get_or_create_user_by_id(self, user_id):
+        with self._lock:
+            user = self._users.get(user_id)
+
+        if user is not None:
+            self.statistics.record_hit()
+            return copy.copy(user)
+
+        self.statistics.record_miss()
+        user = utils.get_or_create_user_by_id(user_id)
+        with self._lock:
+            self._users[user_id] = copy.copy(user)
+
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def invalidate_many(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache(USER_CACHE_MAXSIZE, USER_CACHE_TIMEOUT)
+register_statistics('user_cache', user_cache.statistics.get_statistics)
@@ -3,20 +3,20 @@ from users.models import User
 
 
 def get_or_create_user_by_id(user_id):
-    matching_user = User.objects.filter(user_id=user_id)
+    matching_user = User.objects.filter(user_id=user_id).first()
 
-    if len(matching_user):
-        return matching_user[0]
+    if matching_user is not None:
+        return matching_user
 
     else:
         return User.objects.create_user(user_id=user_id)
 
 
 def get_user_by_id_or_raise_exception(user_id):
-    matching_user = User.objects.filter(user_id=user_id)
+    matching_user = User.objects.filter(user_id=user_id).first()
 
-    if len(matching_user):
-        return matching_user[0]
+    if matching_user is not None:
+        return matching_user
 
     else:
         raise ObjectDoesNotExist(f'User with id {user_id} does not exist')
@@ -1,3 +1,140 @@
-from django.test import TestCase
+from communalspace.firebase_admin import firebase as firebase_utils
+from communalspace.firebase_admin.identity import FakeAuthBackend, FirebaseIdentity, FirebaseIdentityGateway
+from django.core.exceptions import ObjectDoesNotExist
+from django.test import SimpleTestCase, TestCase
+from unittest import mock
+from users.models import User
+import copy
 
-# Create your tests here.
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class FirebaseIdentityGatewayTest(SimpleTestCase):
+    TIMEOUT = 300
+    NEGATIVE_TIMEOUT = 60
+
+    def setUp(self):
+        self.identities = [
+            FirebaseIdentity(f'user-{index}', f'user-{index}@mail.com', None)
+            for index in range(250)
+        ]
+        self.backend = FakeAuthBackend(self.identities)
+        self.timer = FakeTimer()
+        self.gateway = FirebaseIdentityGateway(
+            self.backend,
+            maxsize=1000,
+            timeout=self.TIMEOUT,
+            negative_timeout=self.NEGATIVE_TIMEOUT,
+            batch_size=100,
+            timer=self.timer
+        )
+
+    def test_uncached_users_are_fetched_in_batches_of_100(self):
+        user_ids = [identity.user_id for identity in self.identities]
+        identities = self.gateway.get_identities(user_ids)
+
+        self.assertEqual([len(call) for call in self.backend.get_users_calls], [100, 100, 50])
+        self.assertEqual(identities['user-123'].email, 'user-123@mail.com')
+        self.assertEqual(len(identities), 250)
+
+    def test_duplicated_user_ids_are_fetched_once(self):
+        self.gateway.get_identities(['user-1', 'user-1', 'user-2'])
+        self.assertEqual(self.backend.get_users_calls, [['user-1', 'user-2']])
+
+    def test_cached_users_are_not_fetched_again_before_the_timeout(self):
+        self.gateway.get_identities(['user-1', 'user-2'])
+        self.timer.now = self.TIMEOUT - 1
+        identities = self.gateway.get_identities(['user-1', 'user-2', 'user-3'])
+
+        self.assertEqual(self.backend.get_users_calls, [['user-1', 'user-2'], ['user-3']])
+        self.assertEqual(identities['user-2'].email, 'user-2@mail.com')
+
+    def test_cached_users_are_fetched_again_after_the_timeout(self):
+        self.gateway.get_identity('user-1')
+        self.timer.now = self.TIMEOUT + 1
+        self.gateway.get_identity('user-1')
+
+        self.assertEqual(self.backend.get_users_calls, [['user-1'], ['user-1']])
+
+    def test_missing_users_are_cached_for_the_negative_timeout(self):
+        self.assertIsNone(self.gateway.get_identity('missing'))
+        self.timer.now = self.NEGATIVE_TIMEOUT - 1
+        self.assertIsNone(self.gateway.get_identity('missing'))
+        self.assertEqual(self.backend.get_users_calls, [['missing']])
+
+        self.timer.now = self.NEGATIVE_TIMEOUT + 1
+        self.backend.identities['missing'] = FirebaseIdentity('missing', None, '+6281234')
+        self.assertEqual(self.gateway.get_identity('missing').get_email_or_phone_number(), '+6281234')
+        self.assertEqual(self.backend.get_users_calls, [['missing'], ['missing']])
+
+    def test_invalidated_users_are_fetched_again(self):
+        self.gateway.get_identity('user-1')
+        self.gateway.invalidate('user-1')
+        self.gateway.get_identity('user-1')
+
+        self.assertEqual(self.backend.get_users_calls, [['user-1'], ['user-1']])
+
+    def test_single_lookup_of_a_missing_user_raises_object_does_not_exist(self):
+        with mock.patch.object(firebase_utils, 'identity_gateway', self.gateway):
+            self.assertEqual(firebase_utils.get_email_or_phone_number_from_id('user-1'), 'user-1@mail.com')
+            with self.assertRaises(ObjectDoesNotExist):
+                firebase_utils.get_email_or_phone_number_from_id('missing')
+
+    def test_batched_lookups_map_missing_users_to_none(self):
+        with mock.patch.object(firebase_utils, 'identity_gateway', self.gateway):
+            user_data = firebase_utils.embed_emails_to_user_data([{'user_id': 'user-1'}, {'user_id': 'missing'}])
+
+        self.assertEqual(user_data, [
+            {'user_id': 'user-1', 'email': 'user-1@mail.com'},
+            {'user_id': 'missing', 'email': None},
+        ])
+        self.assertEqual(self.backend.get_users_calls, [['user-1', 'missing']])
+
+
+class StaleUserWriteTest(TestCase):
+    def setUp(self):
+        User.objects.create_user(user_id='user')
+        # Loaded before the changes of the other request, as a copy handed out by the user cache
+        self.stale_user = User.objects.get(pk='user')
+
+        other_request_user = User.objects.get(pk='user')
+        other_request_user.add_reward(5)
+        other_request_user.save_dirty_fields()
+
+    def test_profile_setters_do_not_revert_the_other_fields(self):
+        self.stale_user.set_full_name('Full Name')
+        self.stale_user.set_preferred_radius(500)
+        self.stale_user.set_location_track(False)
+
+        user = User.objects.get(pk='user')
+        self.assertEqual(user.get_reward_points(), 5)
+        self.assertEqual(user.get_full_name(), 'Full Name')
+        self.assertEqual(user.get_preferred_radius(), 500)
+
+    def test_rewards_are_added_to_the_points_in_the_database(self):
+        self.stale_user.add_reward(1)
+        self.stale_user.save_dirty_fields()
+
+        self.assertEqual(self.stale_user.get_reward_points(), 6)
+        self.assertEqual(User.objects.get(pk='user').get_reward_points(), 6)
+        self.assertEqual(self.stale_user.get_dirty_fields(), {})
+
+
+class CopiedUserDirtyFieldsTest(TestCase):
+    def test_saving_a_copy_does_not_change_the_loaded_values_of_the_original(self):
+        User.objects.create_user(user_id='user')
+        user = User.objects.get(pk='user')
+        copied_user = copy.copy(user)
+
+        copied_user.set_full_name('Full Name')
+        copied_user.add_reward(5)
+        copied_user.save_dirty_fields()
+
+        self.assertEqual(user.get_dirty_fields(), {})
+        self.assertEqual(copied_user.get_dirty_fields(), {})